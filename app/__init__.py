@@ -1,8 +1,6 @@
 # app/__init__.py
 
-from .app import HumeSim
 from .config_loader import load_config
-from .screen import SimScreen
 from .equations import (
     eq_output,
     eq_quantity,
@@ -34,3 +32,16 @@ __all__ = [
     "eq_inflation",
 ]
 
+# The Textual app and screen are imported on first access, so that importing
+# the package (e.g. for the headless CLI) does not pull in Textual
+_LAZY = {"HumeSim": ".app", "SimScreen": ".screen"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
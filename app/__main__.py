@@ -1,7 +1,7 @@
 # app/__main__.py
-from .app import HumeSim
+import sys
 
-if __name__ == "__main__":
-    app = HumeSim()
-    app.run()
+from .cli import main
 
+if __name__ == "__main__":
+    sys.exit(main())
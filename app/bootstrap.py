@@ -0,0 +1,272 @@
+# app/bootstrap.py
+
+"""
+Block-bootstrap confidence intervals for the moments and correlation tables.
+
+Periods of a run are autocorrelated, so resampling single periods would
+understate the sampling error. The circular block bootstrap (Politis and
+Romano) resamples blocks of `block` consecutive periods instead, wrapping
+around at the end so every period is equally likely to be drawn. A
+replicate is `ceil(n / block)` blocks with uniform random starts, the last
+one cut short so the replicate has exactly n periods.
+
+Every statistic of the tables is a function of a few power sums (sums of
+x, x², x³, x⁴ per variable and of x_i x_j per pair), and the power sums of
+a replicate are the sums over its blocks. So rather than materializing the
+resampled series, the history is streamed in fixed segments: each segment
+computes cumulative power sums once and gathers the block sums of every
+block starting in it, vectorized over all replicates. Segments are
+independent tasks for a process pool, submitted a few at a time so only
+those in flight are copied, and their sums are added in segment order, so
+results are bit-identical for a given seed whatever the number of
+workers. Values are centred on the full-sample mean first, which keeps the
+power sums well conditioned.
+
+Intervals are percentile intervals of the replicate statistics.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+
+from .ensemble import process_pool
+from .history import ForkedHistory, History
+from .instrument import INSTRUMENT
+from .results import MOMENT_FIELDS, CorrelationMatrix, MomentsTable
+
+DEFAULT_REPLICATES = 1000
+DEFAULT_LEVEL = 0.95
+SEGMENT_ROWS = 16_384  # Periods per task; fixed so the split is worker-independent
+GATHER_ROWS = 8192     # Blocks gathered at once within a task, bounding its memory
+IN_FLIGHT = 2          # Segments submitted ahead per worker, bounding the copies in transit
+
+
+def default_block(n: int) -> int:
+    """Block length n^(1/3), the usual rate for variance-type statistics."""
+    return max(1, int(round(n ** (1 / 3))))
+
+
+@dataclass(frozen=True)
+class BootstrapIntervals:
+    """
+    Lower and upper bounds of `level` confidence intervals for every entry
+    of the moments and correlation tables over `n` periods, from `replicates`
+    circular block-bootstrap replicates with blocks of `block` periods.
+    """
+
+    keys: List[str]
+    n: int
+    replicates: int
+    block: int
+    level: float
+    seed: int
+    moments_low: MomentsTable
+    moments_high: MomentsTable
+    correlations_low: CorrelationMatrix
+    correlations_high: CorrelationMatrix
+
+    def moment_rows(self) -> List[Dict[str, float]]:
+        """One dict per variable and moment: {"variable", "statistic", "low", "high"}."""
+        return [
+            {"variable": key, "statistic": name, "low": low, "high": high}
+            for name in MOMENT_FIELDS
+            for key, low, high in zip(
+                self.keys, getattr(self.moments_low, name).tolist(), getattr(self.moments_high, name).tolist()
+            )
+        ]
+
+    def correlation_rows(self) -> List[Dict[str, float]]:
+        """One dict per pair of distinct variables: {"variable_1", "variable_2", "low", "high"}."""
+        i, j = np.triu_indices(len(self.keys), 1)
+        return [
+            {"variable_1": self.keys[a], "variable_2": self.keys[b], "low": low, "high": high}
+            for a, b, low, high in zip(
+                i.tolist(), j.tolist(),
+                self.correlations_low.values[i, j].tolist(), self.correlations_high.values[i, j].tolist(),
+            )
+        ]
+
+    def metadata(self) -> Dict[str, float]:
+        return {"replicates": self.replicates, "block": self.block, "level": self.level, "seed": self.seed}
+
+
+def _power_sums(rows: np.ndarray) -> np.ndarray:
+    """Per period: x, x², x³, x⁴ of every variable, then x_i x_j of every pair i < j."""
+    i, j = np.triu_indices(rows.shape[1], 1)
+    x2 = rows * rows
+    return np.concatenate([rows, x2, x2 * rows, x2 * x2, rows[:, i] * rows[:, j]], axis=1)
+
+
+def _segment_sums(
+    rows: np.ndarray,
+    replicates: int,
+    reps: np.ndarray,
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+) -> np.ndarray:
+    """
+    Power sums of the blocks starting in one segment, added up per replicate.
+
+    Args:
+        rows: The segment's centred periods followed by the `block - 1`
+            periods after it (wrapping around to the start of the history).
+        replicates (int): Number of replicates.
+        reps, offsets, lengths: Replicate, start within the segment and
+            length of every block starting in it, ordered by replicate.
+
+    Returns:
+        np.ndarray: (replicates, power sums) array.
+    """
+    powers = _power_sums(rows)
+    cumulative = np.zeros((len(powers) + 1, powers.shape[1]))
+    np.cumsum(powers, axis=0, out=cumulative[1:])
+
+    out = np.zeros((replicates, powers.shape[1]))
+    for start in range(0, len(reps), GATHER_ROWS):
+        part = slice(start, start + GATHER_ROWS)
+        sums = cumulative[offsets[part] + lengths[part]] - cumulative[offsets[part]]
+        present, first = np.unique(reps[part], return_index=True)
+        out[present] += np.add.reduceat(sums, first, axis=0)
+    return out
+
+
+def _statistics(sums: np.ndarray, n: int, shift: np.ndarray) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """Moments (replicates, variables) and correlations (replicates, k, k) from power sums of centred values."""
+    k = len(shift)
+    a1, a2, a3, a4 = (sums[:, p * k:(p + 1) * k] / n for p in range(4))
+    variance = a2 - a1 * a1
+    m3 = a3 - 3 * a1 * a2 + 2 * a1 ** 3
+    m4 = a4 - 4 * a1 * a3 + 6 * a1 * a1 * a2 - 3 * a1 ** 4
+
+    positive = variance > 0
+    moments = {
+        "mean": shift + a1,
+        "std_dev": np.sqrt(np.maximum(variance, 0.0)),
+        "variance": variance,
+        "skewness": np.divide(m3, variance ** 1.5, out=np.zeros_like(m3), where=positive),
+        "kurtosis": np.divide(m4, variance * variance, out=np.full_like(m4, 3.0), where=positive) - 3.0,
+    }
+
+    i, j = np.triu_indices(k, 1)
+    cov = sums[:, 4 * k:] / n - a1[:, i] * a1[:, j]
+    denom = np.sqrt(np.maximum(variance[:, i] * variance[:, j], 0.0))
+    corr = np.clip(np.divide(cov, denom, out=np.zeros_like(cov), where=denom > 0), -1.0, 1.0)
+    correlations = np.zeros((len(sums), k, k))
+    correlations[:, i, j] = corr
+    correlations[:, j, i] = corr
+    correlations[:, np.arange(k), np.arange(k)] = np.where(positive, 1.0, 0.0)
+    return moments, correlations
+
+
+def bootstrap(
+    history: History | ForkedHistory,
+    replicates: int = DEFAULT_REPLICATES,
+    block: int | None = None,
+    level: float = DEFAULT_LEVEL,
+    seed: int | None = None,
+    workers: int = 1,
+) -> BootstrapIntervals:
+    """
+    Circular block-bootstrap intervals for the moments and correlations of a history.
+
+    Args:
+        history (History | ForkedHistory): The periods; needs at least two.
+        replicates (int): Number of bootstrap replicates.
+        block (int | None): Periods per block, at most the number of
+            periods; `default_block(n)` if omitted.
+        level (float): Confidence level of the intervals, e.g. 0.95.
+        seed (int | None): Seed of the block starts; a fresh one is drawn
+            (and recorded in the result) if omitted.
+        workers (int): Worker processes; 1 runs in the calling process.
+
+    Returns:
+        BootstrapIntervals: Interval bounds for every table entry.
+
+    Raises:
+        ValueError: If there are fewer than two periods or an argument is out of range.
+    """
+    n = len(history)
+    if n < 2:
+        raise ValueError("Bootstrap intervals need at least two periods.")
+    if replicates < 2:
+        raise ValueError(f"Bootstrap intervals need at least two replicates, got {replicates}")
+    if not 0 < level < 1:
+        raise ValueError(f"The confidence level must be between 0 and 1, got {level}")
+    block = min(block or default_block(n), n)
+    if block < 1:
+        raise ValueError(f"The block length must be positive, got {block}")
+
+    keys = list(history.keys)
+    k = len(keys)
+    seq = np.random.SeedSequence(seed)
+
+    with INSTRUMENT.time("statistics"):
+        # Block starts for all replicates at once; the last block of each is cut to `last` periods
+        blocks = -(-n // block)
+        last = n - (blocks - 1) * block
+        starts = np.random.default_rng(seq).integers(0, n, size=(replicates, blocks))
+
+        segments = -(-n // SEGMENT_ROWS)
+        owner = (starts.ravel() // SEGMENT_ROWS).astype(np.uint16 if segments <= 2**16 else np.int64)
+        order = np.argsort(owner, kind="stable")  # By segment, replicate-major within each
+        bounds = np.searchsorted(owner[order], np.arange(segments + 1))
+
+        shift = np.zeros(k)
+        for rows in history.iter_blocks(SEGMENT_ROWS):
+            shift += rows.sum(axis=0)
+        shift /= n
+
+    def task(s: int) -> tuple:
+        a, b = s * SEGMENT_ROWS, min((s + 1) * SEGMENT_ROWS, n)
+        rows = history.rows(a, min(b + block - 1, n))
+        if b + block - 1 > n:
+            rows = np.concatenate([rows, history.rows(0, b + block - 1 - n)])
+        picked = order[bounds[s]:bounds[s + 1]]
+        lengths = np.where(picked % blocks == blocks - 1, last, block)
+        return rows - shift, replicates, picked // blocks, starts.ravel()[picked] - a, lengths
+
+    def pooled(pool) -> Iterator[np.ndarray]:
+        """Segment sums in order, with at most IN_FLIGHT segments per worker submitted ahead."""
+        pending = deque()
+        for s in range(segments):
+            pending.append(pool.submit(_segment_sums, *task(s)))
+            if len(pending) >= IN_FLIGHT * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    sums = np.zeros((replicates, 4 * k + k * (k - 1) // 2))
+    pool = process_pool(workers) if workers > 1 and segments > 1 else None
+    try:
+        with INSTRUMENT.time("statistics"):
+            if pool is not None:
+                parts = pooled(pool)
+            else:
+                parts = (_segment_sums(*task(s)) for s in range(segments))
+            # Added in segment order, which is fixed by the history length alone
+            for part in parts:
+                sums += part
+
+            moments, correlations = _statistics(sums, n, shift)
+            tail = (1 - level) / 2
+            # NaN periods (a diverged path) make the affected bounds NaN, like the tables themselves
+            low = {name: np.quantile(values, tail, axis=0) for name, values in moments.items()}
+            high = {name: np.quantile(values, 1 - tail, axis=0) for name, values in moments.items()}
+            corr_low, corr_high = np.quantile(correlations, [tail, 1 - tail], axis=0)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return BootstrapIntervals(
+        keys=keys,
+        n=n,
+        replicates=replicates,
+        block=block,
+        level=level,
+        seed=seq.entropy,
+        moments_low=MomentsTable(keys, n, **low),
+        moments_high=MomentsTable(keys, n, **high),
+        correlations_low=CorrelationMatrix(keys, n, corr_low),
+        correlations_high=CorrelationMatrix(keys, n, corr_high),
+    )
@@ -0,0 +1,285 @@
+# app/checkpoint.py
+
+"""
+Checkpoints of a running simulation.
+
+A checkpoint is one binary file: a short prefix, two header slots and the
+history. A header holds, as JSON, the parameters, shock settings, RNG state,
+state vector, statistics accumulators and the number of periods recorded.
+The history follows as raw float64 columns, each with room to grow, so it
+can be memory-mapped column by column. Resuming restores the engine and
+accumulators exactly, so a resumed run continues bit-identically to an
+uninterrupted one, and forks the mapped history instead of reading it.
+
+Repeated checkpoints of a growing run go through a `CheckpointWriter`: it
+writes the new periods into the free room of each column and then the new
+header into the older slot, so a crash at any point leaves the previous
+checkpoint readable. The file is rewritten with twice the room only once the
+room is used up, which keeps the total cost of saving every m periods linear
+in the length of the run rather than quadratic.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence
+import json
+import os
+import struct
+import zlib
+import numpy as np
+
+from .engine import MODEL_VERSION, OUTPUT_KEYS, VARIABLE_KEYS, Engine
+from .history import INITIAL_CAPACITY, ForkedHistory, History
+from .results import SimulationResults
+from .stats import Comoments, Moments
+
+MAGIC = b"HUMECKPT"
+FORMAT_VERSION = 2
+_PAGE = 4096  # Slots and columns start on page boundaries, for efficient memory mapping
+_PREFIX = struct.Struct("<8sIIQ")  # magic, format version, slot size, history capacity
+_SLOT = struct.Struct("<QII")  # sequence number, header length, CRC-32 of the header
+_ARRAYS = ["state", "moments.mean", "moments.m2", "moments.m3", "moments.m4", "comoments.mean", "comoments.c"]
+DEFAULT_CHECKPOINT_PATH = Path.home() / ".cache" / "hume-sim" / "checkpoint.ckpt"
+
+
+class CheckpointError(ValueError):
+    """Raised for a missing, corrupt or incompatible checkpoint."""
+
+
+def _paged(offset: int) -> int:
+    return -(-offset // _PAGE) * _PAGE
+
+
+def _header(engine: Engine, results: SimulationResults) -> bytes:
+    arrays = [
+        engine.state,
+        results.moments_acc.mean,
+        results.moments_acc.m2,
+        results.moments_acc.m3,
+        results.moments_acc.m4,
+        results.comoments.mean,
+        results.comoments.c,
+    ]
+    header = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "model": MODEL_VERSION,
+        "variables": VARIABLE_KEYS,
+        "keys": results.keys,
+        "steps": engine.steps,
+        "params": engine.params,
+        "shocks": engine.shocks,
+        "rng": engine.rng.bit_generator.state,
+        "moments.n": results.moments_acc.n,
+        "comoments.n": results.comoments.n,
+        "periods": results.n,
+        # JSON writes floats with repr, which reads back bit-identically
+        **{name: np.asarray(array, dtype=float).tolist() for name, array in zip(_ARRAYS, arrays)},
+    }
+    return json.dumps(header).encode()
+
+
+def _write_slot(f, slot_size: int, seq: int, header: bytes) -> None:
+    """Write a header into the slot of sequence number `seq`; the two slots alternate."""
+    f.seek(_PAGE + (seq % 2) * slot_size)
+    f.write(_SLOT.pack(seq, len(header), zlib.crc32(header)) + header)
+
+
+def _write_columns(f, slot_size: int, capacity: int, blocks: List[np.ndarray], start: int) -> None:
+    """Write row `blocks`, which continue the history at period `start`, into its columns."""
+    data_start = _PAGE + 2 * slot_size
+    for j in range(blocks[0].shape[1] if blocks else 0):
+        f.seek(data_start + (j * capacity + start) * 8)
+        for block in blocks:
+            f.write(np.asarray(block[:, j], dtype="<f8").tobytes())
+
+
+def _write_file(path: Path, header: bytes, history: History | ForkedHistory, capacity: int) -> int:
+    """Write a complete checkpoint atomically, with room for `capacity` periods; returns the slot size."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    slot_size = _paged(_SLOT.size + 2 * len(header))  # Room for later headers to grow a little
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, slot_size, capacity))
+        _write_slot(f, slot_size, 1, header)
+        _write_columns(f, slot_size, capacity, list(history.iter_blocks()), 0)
+        # Extending by truncation leaves the free room of the columns as holes, not written zeros
+        f.truncate(_PAGE + 2 * slot_size + capacity * len(history.keys) * 8)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return slot_size
+
+
+def save_checkpoint(path: str | Path, engine: Engine, results: SimulationResults) -> Path:
+    """
+    Write the engine and results to `path`, atomically: an existing
+    checkpoint is replaced only once the new one is complete.
+
+    Returns:
+        Path: The checkpoint file.
+    """
+    path = Path(path)
+    _write_file(path, _header(engine, results), results.history, results.n)
+    return path
+
+
+class CheckpointWriter:
+    """
+    Repeated checkpoints of one run to `path`. The first save writes the
+    whole file; later ones write only the periods added since the previous
+    save, until the room in the file is used up.
+
+    The run's history must only grow between saves; use a new writer for a
+    new, reset or resumed run.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._history: History | ForkedHistory | None = None
+        self._periods = 0
+        self._seq = 0
+        self._layout: tuple[int, int, int] | None = None  # Slot size, capacity and inode of the file
+
+    def _can_append(self, history: History | ForkedHistory, header: bytes) -> bool:
+        if self._layout is None or history is not self._history:
+            return False
+        slot_size, capacity, inode = self._layout
+        if not self._periods <= len(history) <= capacity or _SLOT.size + len(header) > slot_size:
+            return False
+        try:
+            return self.path.stat().st_ino == inode  # Not replaced by another save meanwhile
+        except OSError:
+            return False
+
+    def save(self, engine: Engine, results: SimulationResults) -> Path:
+        """
+        Save a checkpoint of the engine and results. Either the new
+        checkpoint or the previous one is readable at any point.
+
+        Returns:
+            Path: The checkpoint file.
+        """
+        history, header = results.history, _header(engine, results)
+        if self._can_append(history, header):
+            slot_size, capacity, _ = self._layout
+            with self.path.open("r+b") as f:
+                _write_columns(f, slot_size, capacity, [history.rows(self._periods, results.n)], self._periods)
+                f.flush()
+                os.fsync(f.fileno())
+                # Only now switch to the new periods, overwriting the older slot
+                self._seq += 1
+                _write_slot(f, slot_size, self._seq, header)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            capacity = max(2 * results.n, INITIAL_CAPACITY)
+            slot_size = _write_file(self.path, header, history, capacity)
+            self._layout = (slot_size, capacity, self.path.stat().st_ino)
+            self._seq = 1
+        self._history, self._periods = history, results.n
+        return self.path
+
+
+@dataclass
+class Checkpoint:
+    """
+    A loaded checkpoint. `arrays` holds the state vector and accumulators,
+    and the history as a read-only memory map into the file.
+    """
+
+    path: Path
+    header: dict
+    arrays: Dict[str, np.ndarray]
+
+    @property
+    def steps(self) -> int:
+        return self.header["steps"]
+
+    def engine(self) -> Engine:
+        """An engine continuing exactly where the checkpointed one stopped."""
+        state = dict(zip(self.header["variables"], self.arrays["state"].tolist()))
+        engine = Engine(state, self.header["params"], self.header["shocks"])
+        engine.rng.bit_generator.state = self.header["rng"]
+        engine.steps = self.header["steps"]
+        return engine
+
+    def results(
+        self,
+        windows: Sequence[int] = (),
+        spill_bytes: int | None = None,
+        spill_dir: str | Path | None = None,
+    ) -> SimulationResults:
+        """
+        The checkpointed history and statistics. The history forks the
+        memory-mapped periods, so they are neither read nor copied up front;
+        new periods go to a buffer of its own, which spills as set by
+        `spill_bytes` and `spill_dir` (see `History`). Rolling `windows` are
+        recomputed from the latest periods.
+        """
+        keys = self.header["keys"]
+        periods = self.arrays["history"]
+        results = SimulationResults(keys, windows=windows)
+        results.history = ForkedHistory(History.wrap(periods, keys), len(periods), spill_bytes, spill_dir)
+
+        moments = Moments(len(keys))
+        moments.n = self.header["moments.n"]
+        for name in ("mean", "m2", "m3", "m4"):
+            setattr(moments, name, np.array(self.arrays[f"moments.{name}"]))
+        comoments = Comoments(len(keys))
+        comoments.n = self.header["comoments.n"]
+        comoments.mean = np.array(self.arrays["comoments.mean"])
+        comoments.c = np.array(self.arrays["comoments.c"])
+        results.moments_acc, results.comoments = moments, comoments
+        results.rebuild_windows()
+        return results
+
+
+def load_checkpoint(path: str | Path) -> Checkpoint:
+    """
+    Open a checkpoint, taking the newer of its two headers that is intact,
+    and memory-map its history.
+
+    Raises:
+        CheckpointError: If the file is not a checkpoint, is corrupt or
+            truncated, or was written by a different model version.
+    """
+    path = Path(path)
+    try:
+        with path.open("rb") as f:
+            magic, version, slot_size, capacity = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise CheckpointError(f"{path} is not a checkpoint file")
+            if version != FORMAT_VERSION:
+                raise CheckpointError(f"Unsupported checkpoint format version {version}")
+            header, latest = None, 0
+            for slot in range(2):
+                f.seek(_PAGE + slot * slot_size)
+                seq, length, crc = _SLOT.unpack(f.read(_SLOT.size))
+                if seq > latest and 0 < length <= slot_size - _SLOT.size:
+                    data = f.read(length)
+                    if zlib.crc32(data) == crc:
+                        header, latest = json.loads(data), seq
+    except (OSError, struct.error, json.JSONDecodeError) as e:
+        raise CheckpointError(f"Cannot read checkpoint {path}: {e}")
+    if header is None:
+        raise CheckpointError(f"Checkpoint {path} is corrupt")
+
+    if header["model"] != MODEL_VERSION:
+        raise CheckpointError(
+            f"Checkpoint {path} was written by another model version ({header['model']}, now {MODEL_VERSION})"
+        )
+    if header["keys"] != OUTPUT_KEYS or header["variables"] != VARIABLE_KEYS:
+        raise CheckpointError(f"Checkpoint {path} has different variables")
+
+    k, periods = len(header["keys"]), header["periods"]
+    data_start = _PAGE + 2 * slot_size
+    if periods > capacity or data_start + capacity * k * 8 > path.stat().st_size:
+        raise CheckpointError(f"Checkpoint {path} is truncated")
+    arrays = {name: np.array(header[name], dtype=float) for name in _ARRAYS}
+    if periods:
+        columns = np.memmap(path, dtype="<f8", mode="r", offset=data_start, shape=(capacity, k), order="F")
+        arrays["history"] = columns[:periods]
+    else:
+        arrays["history"] = np.empty((0, k), order="F")
+    return Checkpoint(path, header, arrays)
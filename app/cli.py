@@ -0,0 +1,293 @@
+# app/cli.py
+
+"""
+Command-line entry point.
+
+    python -m app                      # the TUI
+    python -m app run --steps 100000 --seed 1 --out results.npz
+    python -m app run --steps 100000 --checkpoint run.ckpt --checkpoint-every 10000
+    python -m app run --steps 100000 --resume run.ckpt --out results.npz
+    python -m app ensemble --steps 500 --paths 10000 --workers 8 --out ensemble.npz
+    python -m app sweep --set alpha=0.25:0.40:4 --set delta=0.03,0.05 --out sweep.csv
+    python -m app serve --port 8765
+
+The headless commands import only the engine and the exporter; Textual is
+imported when the TUI is started, so batch jobs start quickly and need no
+terminal.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from .config_loader import CONFIG_PATH, SimConfig, get_config
+from .sampling import SAMPLERS
+
+RUN_BLOCK_SIZE = 100_000  # Periods simulated and recorded at a time
+
+
+def _load_config(path: Path | None) -> SimConfig:
+    try:
+        return get_config(path or CONFIG_PATH)
+    except (FileNotFoundError, ValueError) as e:
+        if path is not None:
+            raise SystemExit(f"error: {e}")
+        return SimConfig()
+
+
+def _positive(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+    return value
+
+
+def _echo(args: argparse.Namespace, message: str) -> None:
+    if not args.quiet:
+        print(message, file=sys.stderr)
+
+
+def cmd_tui(args: argparse.Namespace) -> int:
+    from .app import HumeSim
+
+    HumeSim().run()
+    return 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    from .checkpoint import CheckpointError, CheckpointWriter, load_checkpoint
+    from .engine import OUTPUT_KEYS, Condition, Engine
+    from .history import History
+    from .results import SimulationResults
+    from .bootstrap import bootstrap
+    from .timeseries import analyze
+    from .utils.exporter import EXPORT_FORMATS, export_simulation, format_for_path, write_results
+
+    config = _load_config(args.config)
+    try:
+        condition = Condition.parse(args.until) if args.until else None
+        fmt = args.format or (format_for_path(args.out) if args.out else None)
+    except ValueError as e:
+        raise SystemExit(f"error: {e}")
+    if fmt is not None and fmt not in EXPORT_FORMATS:
+        raise SystemExit(f"error: unknown format '{fmt}', expected one of {EXPORT_FORMATS}")
+    if args.resume and (args.steady or args.seed is not None):
+        raise SystemExit("error: --resume continues the saved state and random stream; drop --steady and --seed")
+
+    spill_bytes = int(config.spill_mb * 2**20) if config.spill_mb else None
+    if args.resume:
+        try:
+            checkpoint = load_checkpoint(args.resume)
+        except CheckpointError as e:
+            raise SystemExit(f"error: {e}")
+        engine = checkpoint.engine()
+        results = checkpoint.results(config.windows, spill_bytes, config.spill_dir)
+        _echo(args, f"Resumed {results.n} periods from {args.resume}")
+    else:
+        state = dict(config.defaults)
+        if args.steady:
+            from .steady_state import solve
+
+            state = solve(state, config.parameters, config.shocks).state
+        engine = Engine(state, config.parameters, config.shocks, seed=args.seed)
+        history = History(OUTPUT_KEYS, spill_bytes=spill_bytes, spill_dir=config.spill_dir)
+        results = SimulationResults(OUTPUT_KEYS, history, config.windows)
+
+    interval = args.checkpoint_every if args.checkpoint_every is not None else config.checkpoint_interval
+    writer = CheckpointWriter(args.checkpoint) if args.checkpoint else None
+    done, met, saved = 0, False, 0
+    while done < args.steps and not met:
+        n = min(RUN_BLOCK_SIZE, args.steps - done)
+        if args.checkpoint and interval:
+            n = min(n, interval - (done - saved))
+        if condition is None:
+            rows = engine.run(n)
+        else:
+            rows, met = engine.run_until(condition, n)
+        results.append(rows)
+        done += len(rows)
+        if writer and interval and done - saved >= interval:
+            writer.save(engine, results)
+            saved = done
+    if writer:
+        writer.save(engine, results)
+        _echo(args, f"Checkpoint of {results.n} periods → {args.checkpoint}")
+
+    outcome = f", condition {condition} {'met' if met else 'not met'}" if condition else ""
+    if args.out or not args.checkpoint:
+        metadata = {"seed": args.seed, "parameters": engine.params, "shocks": engine.shocks}
+        intervals = None
+        wanted = (args.intervals or config.export_bootstrap) and config.bootstrap_replicates
+        if wanted and results.n >= 2 and (fmt or config.export_format) != "npy":
+            intervals = bootstrap(
+                results.history, config.bootstrap_replicates, config.bootstrap_block,
+                config.bootstrap_level, config.bootstrap_seed, workers=os.cpu_count() or 1,
+            )
+        if args.out:
+            timeseries = None
+            if results.n >= 2 and fmt != "npy":
+                timeseries = analyze(
+                    results.history, config.timeseries_max_lag, config.timeseries_pairs, config.timeseries_segment
+                )
+            path = write_results(
+                results, args.out, fmt, compressed=config.export_compress, metadata=metadata,
+                timeseries=timeseries, intervals=intervals,
+            )
+        else:
+            path = export_simulation(results, fmt=fmt, metadata=metadata, intervals=intervals)
+        _echo(args, f"Ran {done} steps{outcome} → {path}")
+    else:
+        _echo(args, f"Ran {done} steps{outcome}")
+    return 0
+
+
+def cmd_ensemble(args: argparse.Namespace) -> int:
+    from .ensemble import run_ensemble
+    from .utils.exporter import format_for_path, write_ensemble
+
+    config = _load_config(args.config)
+    if args.out:
+        try:
+            format_for_path(args.out)
+        except ValueError as e:
+            raise SystemExit(f"error: {e}")
+
+    try:
+        result = run_ensemble(
+            config.defaults, config.parameters, config.shocks,
+            args.steps, args.paths, seed=args.seed if args.seed is not None else config.sampling_seed,
+            workers=args.workers, sampler=args.sampler or config.sampler,
+        )
+    except ValueError as e:
+        raise SystemExit(f"error: {e}")
+    _echo(
+        args,
+        f"Ensemble: {result.paths} paths × {result.steps} periods, {result.diverged} diverged, "
+        f"seed {result.seed}, {result.sampler} sampler",
+    )
+    if args.out:
+        write_ensemble(result, args.out, metadata={"parameters": dict(config.parameters), "shocks": dict(config.shocks)})
+        _echo(args, f"Saved to {args.out}")
+    else:
+        for row in result.moments.rows():
+            print(f"{row['variable']:8} mean={row['mean']:.6g} std={row['std_dev']:.6g}")
+    return 0
+
+
+def cmd_sweep(args: argparse.Namespace) -> int:
+    from .sweep import SweepCache, parse_axis, run_sweep
+    from .utils.exporter import export_sweep, write_sweep_csv
+
+    config = _load_config(args.config)
+    axes = {}
+    for spec in args.set:
+        key, sep, values = spec.partition("=")
+        if not sep:
+            raise SystemExit(f"error: expected KEY=VALUES in --set, got '{spec}'")
+        try:
+            axes[key.strip()] = parse_axis(values)
+        except ValueError as e:
+            raise SystemExit(f"error: {e}")
+
+    cache = None if args.no_cache else SweepCache(args.cache_dir or config.sweep_cache_dir)
+    try:
+        sweep = run_sweep(
+            config.defaults, config.parameters, config.shocks, axes,
+            args.steps, args.paths, seed=args.seed if args.seed is not None else config.sampling_seed,
+            workers=args.workers, cache=cache,
+            sampler=args.sampler or config.sampler,
+        )
+    except ValueError as e:
+        raise SystemExit(f"error: {e}")
+
+    path = write_sweep_csv(sweep, args.out) if args.out else export_sweep(sweep)
+    _echo(
+        args,
+        f"Sweep: {len(sweep.points)} points ({sweep.cached} cached), seed {sweep.seed}, "
+        f"{sweep.sampler} sampler → {path}",
+    )
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from .server import serve
+
+    config = _load_config(args.config)
+    serve(config, args.host, args.port, args.socket, args.workers, log=lambda message: _echo(args, message))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app", description="Hume model simulator.")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", type=Path, help="Config file (default: app/config.toml)")
+    common.add_argument("--seed", type=int, help="Random seed")
+    common.add_argument("-q", "--quiet", action="store_true", help="No progress messages")
+
+    tui = commands.add_parser("tui", help="Start the terminal UI (the default)")
+    tui.set_defaults(func=cmd_tui)
+
+    run = commands.add_parser("run", parents=[common], help="Simulate one path and export it")
+    run.add_argument("--steps", type=_positive, required=True, help="Number of periods (upper limit with --until)")
+    run.add_argument("--until", help="Stop once a condition holds, e.g. 'K > 10'")
+    run.add_argument("--steady", action="store_true", help="Start at the deterministic steady state")
+    run.add_argument("--resume", type=Path, metavar="CHECKPOINT", help="Continue the run saved in a checkpoint")
+    run.add_argument("--checkpoint", type=Path, help="Save a checkpoint here at the end (and periodically)")
+    run.add_argument(
+        "--checkpoint-every", type=_positive, metavar="N",
+        help="Periods between checkpoints (default: [checkpoint] interval; 0 there = only at the end)",
+    )
+    run.add_argument(
+        "--out", type=Path,
+        help="Output file; the format follows the suffix (.csv, .npz, .npy). Omitted with --checkpoint, nothing is exported",
+    )
+    run.add_argument("--format", help="Export format: csv, tidy-csv, npz or npy")
+    run.add_argument(
+        "--intervals", action="store_true",
+        help="Add bootstrap intervals ([bootstrap]) to the export; default: [export] bootstrap",
+    )
+    run.set_defaults(func=cmd_run)
+
+    ensemble = commands.add_parser("ensemble", parents=[common], help="Run a Monte Carlo ensemble")
+    ensemble.add_argument("--steps", type=_positive, required=True, help="Periods per path")
+    ensemble.add_argument("--paths", type=_positive, required=True, help="Number of paths")
+    ensemble.add_argument("--workers", type=_positive, default=os.cpu_count() or 1, help="Worker processes")
+    ensemble.add_argument("--sampler", choices=SAMPLERS, help="Shock sampler (default: [sampling] sampler)")
+    ensemble.add_argument("--out", type=Path, help="Output file (.csv or .npz); prints the moments if omitted")
+    ensemble.set_defaults(func=cmd_ensemble)
+
+    sweep = commands.add_parser("sweep", parents=[common], help="Run an ensemble per point of a parameter grid")
+    sweep.add_argument(
+        "--set", action="append", required=True, metavar="KEY=VALUES",
+        help="Swept values, 'start:stop:num' or 'a,b,c', e.g. alpha=0.25:0.40:4; repeat for more axes",
+    )
+    sweep.add_argument("--steps", type=_positive, required=True, help="Periods per path")
+    sweep.add_argument("--paths", type=_positive, required=True, help="Paths per grid point")
+    sweep.add_argument("--workers", type=_positive, default=os.cpu_count() or 1, help="Worker processes")
+    sweep.add_argument("--sampler", choices=SAMPLERS, help="Shock sampler (default: [sampling] sampler)")
+    sweep.add_argument("--cache-dir", type=Path, help="Grid point cache (default: [sweep] cache-dir)")
+    sweep.add_argument("--no-cache", action="store_true", help="Neither read nor write the cache; it only hits with a fixed --seed or [sampling] seed")
+    sweep.add_argument("--out", type=Path, help="Output stem; writes <stem>-moments.csv and <stem>-correlations.csv")
+    sweep.set_defaults(func=cmd_sweep)
+
+    serve = commands.add_parser("serve", help="Serve run, ensemble, sweep and IRF requests as JSON over HTTP")
+    serve.add_argument("--config", type=Path, help="Config file (default: app/config.toml)")
+    serve.add_argument("--host", help="Listen address (default: [server] host)")
+    serve.add_argument("--port", type=int, help="Port, 0 for any free one (default: [server] port)")
+    serve.add_argument("--socket", type=Path, help="Listen on this Unix socket instead of a port")
+    serve.add_argument("--workers", type=_positive, default=os.cpu_count() or 1, help="Worker processes for ensembles and sweeps")
+    serve.add_argument("-q", "--quiet", action="store_true", help="No messages")
+    serve.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return cmd_tui(args)
+    return args.func(args)
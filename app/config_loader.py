@@ -1,23 +1,304 @@
 # app/config_loader.py
 
+from dataclasses import dataclass, field
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+import logging
 import tomllib
 
+from .engine import OUTPUT_KEYS
+from .sampling import check_sampler
+
 CONFIG_PATH = Path(__file__).parent / "config.toml"
+EXPORT_FORMATS = ("csv", "tidy-csv", "npz", "npy")
+
+# Hardcoded fallback defaults
+FALLBACK_DEFAULTS = {
+    "defaults": {
+        "Y": 1.0, "C": 0.6, "I": 0.4, "K": 5.0, "r": 0.03, "s": 0.2, "p": 0.05,
+        "theta": 0.5, "M": 1.0, "P": 1.0, "pi": 0.0, "K_last": 5.0, "P_last": 1.0,
+    },
+    "parameters": {
+        "alpha": 0.33, "beta": 0.96, "delta": 0.05, "gamma": 0.004, "sigma": 1.0,
+    },
+    "shocks": {
+        "A-mean": 1.0, "A-stderr": 0.01,
+        "D-mean": 1.0, "D-stderr": 0.02,
+    },
+}
+
+# path -> ((mtime_ns, size), raw dict, SimConfig or None until first requested)
+_cache: dict[Path, tuple[tuple[int, int], dict, "SimConfig | None"]] = {}
+_last_valid: dict[Path, "SimConfig"] = {}  # path -> config last validated from it
+_reported: dict[Path, str] = {}  # path -> fallback error last logged
+_log = logging.getLogger(__name__)
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
 
 def load_config(path: Path = CONFIG_PATH) -> dict:
     """
     Load and return the TOML config as a dictionary.
-    
+
+    The file is only re-parsed when its modification time or size changes;
+    otherwise the cached dict is returned, so treat it as read-only.
+
     Args:
         path (Path): Path to the TOML config file.
 
     Returns:
         dict: Parsed config.
     """
+    path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
 
+    stamp = _stamp(path)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
     with open(path, "rb") as f:
-        return tomllib.load(f)
+        raw = tomllib.load(f)
+    _cache[path] = (stamp, raw, None)
+    return raw
+
+
+def _numbers(raw: dict, table: str) -> Mapping[str, float]:
+    """Merge a numeric config table over its fallback values, validating keys and types."""
+    values = dict(FALLBACK_DEFAULTS[table])
+    section = raw.get(table, {})
+    if not isinstance(section, dict):
+        raise ValueError(f"[{table}] must be a table")
+    for key, value in section.items():
+        if key not in values:
+            raise ValueError(f"[{table}] unknown key '{key}', expected one of {list(values)}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"[{table}] {key} must be a number, got {value!r}")
+        values[key] = float(value)
+    return MappingProxyType(values)
+
+
+@dataclass(frozen=True)
+class SimConfig:
+    """
+    Validated configuration. Missing values fall back to `FALLBACK_DEFAULTS`
+    (model values) or to the defaults below (everything else).
+    """
+
+    defaults: Mapping[str, float] = field(default_factory=lambda: MappingProxyType(dict(FALLBACK_DEFAULTS["defaults"])))
+    parameters: Mapping[str, float] = field(default_factory=lambda: MappingProxyType(dict(FALLBACK_DEFAULTS["parameters"])))
+    shocks: Mapping[str, float] = field(default_factory=lambda: MappingProxyType(dict(FALLBACK_DEFAULTS["shocks"])))
+    spill_mb: float | None = None
+    spill_dir: str | None = None
+    export_path: str | None = None
+    export_format: str = "csv"
+    export_compress: bool = True
+    export_stream: bool = False
+    export_bootstrap: bool = False
+    watch: bool = False
+    watch_interval: float = 1.0
+    sweep_cache_dir: str | None = None
+    windows: tuple[int, ...] = (50, 200, 1000)
+    timeseries_max_lag: int = 40
+    timeseries_segment: int = 256
+    timeseries_pairs: tuple[tuple[str, str], ...] = (("K", "r"), ("K", "P"), ("r", "P"))
+    bootstrap_replicates: int = 1000
+    bootstrap_block: int | None = None
+    bootstrap_level: float = 0.95
+    bootstrap_seed: int | None = None
+    sampler: str = "standard"
+    sampling_seed: int | None = None
+    chart_keys: tuple[str, ...] = ("Y", "K", "r", "P")
+    chart_height: int = 4
+    server_host: str = "127.0.0.1"
+    server_port: int = 8765
+    server_batch_window: float = 0.005
+    server_max_batch: int = 256
+    server_cache_size: int = 256
+    server_max_steps: int = 1_000_000
+    checkpoint_path: str | None = None
+    checkpoint_interval: int = 0
+    log_level: str = "info"
+    instrument: bool = True
 
+    @classmethod
+    def from_dict(cls, raw: dict) -> "SimConfig":
+        history = raw.get("history", {})
+        export = raw.get("export", {})
+        app = raw.get("app", {})
+        sweep = raw.get("sweep", {})
+        checkpoint = raw.get("checkpoint", {})
+        statistics = raw.get("statistics", {})
+        timeseries = raw.get("timeseries", {})
+        chart = raw.get("chart", {})
+        server = raw.get("server", {})
+        sampling = raw.get("sampling", {})
+        bootstrap = raw.get("bootstrap", {})
+        spill_mb = history.get("spill-mb")
+        export_format = export.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"[export] format must be one of {list(EXPORT_FORMATS)}, got {export_format!r}")
+        if spill_mb is not None and (isinstance(spill_mb, bool) or not isinstance(spill_mb, (int, float))):
+            raise ValueError(f"[history] spill-mb must be a number, got {spill_mb!r}")
+        log_level = app.get("log-level", "info")
+        if log_level not in ("info", "debug"):
+            raise ValueError(f"[app] log-level must be 'info' or 'debug', got {log_level!r}")
+        interval = app.get("watch-interval", 1.0)
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError(f"[app] watch-interval must be a positive number, got {interval!r}")
+        windows = statistics.get("windows", [50, 200, 1000])
+        if not isinstance(windows, list) or any(
+            isinstance(w, bool) or not isinstance(w, int) or w <= 0 for w in windows
+        ):
+            raise ValueError(f"[statistics] windows must be a list of positive integers, got {windows!r}")
+        for name in ("max-lag", "segment"):
+            value = timeseries.get(name, 1)
+            if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+                raise ValueError(f"[timeseries] {name} must be a positive integer, got {value!r}")
+        pairs = timeseries.get("pairs", [["K", "r"], ["K", "P"], ["r", "P"]])
+        if not isinstance(pairs, list) or any(
+            not isinstance(p, list) or len(p) != 2 or not all(isinstance(v, str) for v in p) for p in pairs
+        ):
+            raise ValueError(f"[timeseries] pairs must be a list of [x, y] variable names, got {pairs!r}")
+        unknown = [v for pair in pairs for v in pair if v not in OUTPUT_KEYS]
+        if unknown:
+            raise ValueError(f"[timeseries] pairs: unknown variable '{unknown[0]}', expected one of {OUTPUT_KEYS}")
+        for name, minimum in (("replicates", 0), ("block", 0), ("seed", 0)):
+            value = bootstrap.get(name, minimum)
+            if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+                raise ValueError(f"[bootstrap] {name} must be an integer >= {minimum}, got {value!r}")
+        if bootstrap.get("replicates") == 1:
+            raise ValueError("[bootstrap] replicates must be 0 (off) or at least 2, got 1")
+        level = bootstrap.get("level", 0.95)
+        if isinstance(level, bool) or not isinstance(level, (int, float)) or not 0 < level < 1:
+            raise ValueError(f"[bootstrap] level must be a number between 0 and 1, got {level!r}")
+        sampler = sampling.get("sampler", "standard")
+        try:
+            check_sampler(sampler)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"[sampling] sampler: {e}")
+        sampling_seed = sampling.get("seed", 0)
+        if isinstance(sampling_seed, bool) or not isinstance(sampling_seed, int) or sampling_seed < 0:
+            raise ValueError(f"[sampling] seed must be a non-negative integer, got {sampling_seed!r}")
+        chart_keys = chart.get("keys", ["Y", "K", "r", "P"])
+        if not isinstance(chart_keys, list) or not all(isinstance(k, str) for k in chart_keys):
+            raise ValueError(f"[chart] keys must be a list of variable names, got {chart_keys!r}")
+        unknown = [k for k in chart_keys if k not in OUTPUT_KEYS]
+        if unknown:
+            raise ValueError(f"[chart] keys: unknown variable '{unknown[0]}', expected one of {OUTPUT_KEYS}")
+        chart_height = chart.get("height", 4)
+        if isinstance(chart_height, bool) or not isinstance(chart_height, int) or chart_height <= 0:
+            raise ValueError(f"[chart] height must be a positive integer, got {chart_height!r}")
+        for name, minimum in (("port", 0), ("max-batch", 1), ("cache-size", 0), ("max-steps", 1)):
+            value = server.get(name, minimum)
+            if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+                raise ValueError(f"[server] {name} must be an integer >= {minimum}, got {value!r}")
+        batch_window = server.get("batch-window-ms", 5)
+        if isinstance(batch_window, bool) or not isinstance(batch_window, (int, float)) or batch_window < 0:
+            raise ValueError(f"[server] batch-window-ms must be a non-negative number, got {batch_window!r}")
+        checkpoint_interval = checkpoint.get("interval", 0)
+        if isinstance(checkpoint_interval, bool) or not isinstance(checkpoint_interval, int) or checkpoint_interval < 0:
+            raise ValueError(f"[checkpoint] interval must be a non-negative integer, got {checkpoint_interval!r}")
+
+        return cls(
+            defaults=_numbers(raw, "defaults"),
+            parameters=_numbers(raw, "parameters"),
+            shocks=_numbers(raw, "shocks"),
+            spill_mb=float(spill_mb) if spill_mb else None,
+            spill_dir=history.get("spill-dir") or None,
+            export_path=export.get("path") or None,
+            export_format=export_format,
+            export_compress=bool(export.get("compress", True)),
+            export_stream=bool(export.get("stream", False)),
+            export_bootstrap=bool(export.get("bootstrap", False)),
+            watch=bool(app.get("watch-config", False)),
+            watch_interval=float(interval),
+            sweep_cache_dir=sweep.get("cache-dir") or None,
+            windows=tuple(sorted(set(windows))),
+            timeseries_max_lag=timeseries.get("max-lag", 40),
+            timeseries_segment=timeseries.get("segment", 256),
+            timeseries_pairs=tuple((x, y) for x, y in pairs),
+            bootstrap_replicates=bootstrap.get("replicates", 1000),
+            bootstrap_block=bootstrap.get("block") or None,
+            bootstrap_level=float(level),
+            bootstrap_seed=bootstrap.get("seed") or None,
+            sampler=sampler,
+            sampling_seed=sampling_seed or None,
+            chart_keys=tuple(chart_keys),
+            chart_height=chart_height,
+            server_host=server.get("host") or "127.0.0.1",
+            server_port=server.get("port", 8765),
+            server_batch_window=batch_window / 1000,
+            server_max_batch=server.get("max-batch", 256),
+            server_cache_size=server.get("cache-size", 256),
+            server_max_steps=server.get("max-steps", 1_000_000),
+            checkpoint_path=checkpoint.get("path") or None,
+            checkpoint_interval=checkpoint_interval,
+            log_level=log_level,
+            instrument=bool(app.get("instrument", True)),
+        )
+
+
+def get_config(path: Path = CONFIG_PATH) -> SimConfig:
+    """
+    Return the validated config, parsing and validating the file only when
+    it has changed since the last call.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If a value has the wrong type.
+    """
+    path = Path(path)
+    raw = load_config(path)
+    stamp, _, config = _cache[path]
+    if config is None:
+        config = SimConfig.from_dict(raw)
+        _cache[path] = (stamp, raw, config)
+        _last_valid[path] = config
+    return config
+
+
+class ConfigWatcher:
+    """
+    Polls a config file for changes. `poll()` returns the new validated config
+    once after each change and None otherwise; invalid edits raise ValueError
+    and are reported again only after the next change.
+    """
+
+    def __init__(self, path: Path = CONFIG_PATH) -> None:
+        self.path = Path(path)
+        self._stamp = _stamp(self.path) if self.path.exists() else None
+
+    def poll(self) -> SimConfig | None:
+        if not self.path.exists():
+            return None
+        stamp = _stamp(self.path)
+        if stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        return get_config(self.path)
+
+
+def get_config_or_default(path: Path = CONFIG_PATH) -> SimConfig:
+    """
+    Like `get_config`, but if the file is missing or invalid fall back to the
+    config last loaded from it, or to `SimConfig()` if there is none, so a
+    bad edit does not switch a running session back to the defaults. Each
+    new error is logged once.
+    """
+    path = Path(path)
+    try:
+        config = get_config(path)
+    except (FileNotFoundError, ValueError) as e:
+        if _reported.get(path) != str(e):
+            _reported[path] = str(e)
+            fallback = "the last valid settings" if path in _last_valid else "the defaults"
+            _log.warning("Config %s not loaded, using %s: %s", path, fallback, e)
+        return _last_valid.get(path, SimConfig())
+    _reported.pop(path, None)
+    return config
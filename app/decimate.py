@@ -0,0 +1,182 @@
+# app/decimate.py
+
+"""
+Shape-preserving decimation of long series for charts.
+
+A chart column stands for many periods. Drawing the minimum and maximum of
+each column keeps spikes and the envelope of the path visible, where
+averaging or picking every n-th period would hide them. Extremes also merge:
+those of two adjacent buckets are the extremes of their union. So a
+`DecimationCache` keeps a pyramid of levels, level l holding the extremes of
+buckets of `BASE_BUCKET * 2**l` periods:
+
+- Appending periods only updates the last buckets of each level.
+- A view of any range at any width is assembled from the coarsest level whose
+  buckets are still a small fraction of a column, so zooming and redrawing
+  cost O(width), independent of the length of the history.
+
+Column edges of a view are rounded to that level's bucket boundaries, so a
+column may cover up to 1/OVERSAMPLE of a column's periods more or less than
+its neighbours; short ranges are decimated from the raw periods exactly.
+"""
+
+from dataclasses import dataclass
+from typing import List
+import numpy as np
+
+from .history import ForkedHistory, History
+
+BASE_BUCKET = 32  # Periods per bucket of the finest level
+OVERSAMPLE = 4    # Minimum buckets per chart column
+
+
+@dataclass(frozen=True)
+class Decimated:
+    """
+    Per-column extremes of periods `start` to `stop`, arrays of shape
+    (columns, variables). With fewer periods than columns, each column is
+    one period and `low` equals `high`.
+    """
+
+    keys: List[str]
+    start: int
+    stop: int
+    low: np.ndarray
+    high: np.ndarray
+
+    @property
+    def columns(self) -> int:
+        return len(self.low)
+
+    @property
+    def periods_per_column(self) -> float:
+        return (self.stop - self.start) / max(self.columns, 1)
+
+
+class _Level:
+    """Bucket extremes of one level, in buffers grown geometrically."""
+
+    def __init__(self, bucket: int, k: int) -> None:
+        self.bucket = bucket
+        self.n = 0  # Buckets, the last one possibly partial
+        self.low = np.empty((16, k))
+        self.high = np.empty((16, k))
+
+    def write(self, start: int, low: np.ndarray, high: np.ndarray) -> None:
+        """Overwrite buckets from `start` on (the partial last one is rewritten)."""
+        end = start + len(low)
+        if end > len(self.low):
+            capacity = len(self.low)
+            while capacity < end:
+                capacity *= 2
+            for name in ("low", "high"):
+                buf = np.empty((capacity, self.low.shape[1]))
+                buf[:self.n] = getattr(self, name)[:self.n]
+                setattr(self, name, buf)
+        self.low[start:end] = low
+        self.high[start:end] = high
+        self.n = end
+
+
+def _pairs(values: np.ndarray, reduce: np.ufunc) -> np.ndarray:
+    """Combine rows 2i and 2i + 1; an odd last row stands alone."""
+    return reduce.reduceat(values, np.arange(0, len(values), 2), axis=0)
+
+
+class DecimationCache:
+    """
+    Multi-resolution min/max cache of a history.
+
+    Call `update()` after periods were appended; it reads only the new
+    periods (and the partial bucket before them). A cleared history, or a
+    different one, rebuilds the cache. NaN periods (a diverged path) are
+    ignored in the extremes.
+
+    Args:
+        history (History | ForkedHistory): The history to decimate.
+    """
+
+    def __init__(self, history: History | ForkedHistory) -> None:
+        self.history = history
+        self.keys = list(history.keys)
+        self.reset()
+
+    def reset(self) -> None:
+        self.n = 0
+        self.levels: List[_Level] = []
+
+    def update(self, history: History | ForkedHistory | None = None) -> None:
+        """Take in the periods appended since the last update, or switch to `history`."""
+        if history is not None and history is not self.history:
+            self.history = history
+            self.keys = list(history.keys)
+            self.reset()
+        n = self.history.n
+        if n < self.n:
+            self.reset()
+        if n == self.n:
+            return
+
+        # Finest level from the raw periods, starting at the bucket the old end fell into
+        first = self.n // BASE_BUCKET
+        rows = self.history.rows(first * BASE_BUCKET, n)
+        if not self.levels:
+            self.levels.append(_Level(BASE_BUCKET, len(self.keys)))
+        starts = np.arange(0, len(rows), BASE_BUCKET)
+        self.levels[0].write(first, np.fmin.reduceat(rows, starts, axis=0), np.fmax.reduceat(rows, starts, axis=0))
+
+        # Coarser levels from pairs of the level below, until one bucket covers everything
+        level = 1
+        while self.levels[level - 1].n > 1:
+            below = self.levels[level - 1]
+            if level == len(self.levels):
+                self.levels.append(_Level(below.bucket * 2, len(self.keys)))
+            first = self.n // self.levels[level].bucket
+            self.levels[level].write(
+                first,
+                _pairs(below.low[2 * first:below.n], np.fmin),
+                _pairs(below.high[2 * first:below.n], np.fmax),
+            )
+            level += 1
+        self.n = n
+
+    def view(self, start: int, stop: int, width: int) -> Decimated:
+        """
+        Extremes of periods `start` to `stop` in at most `width` columns.
+
+        Args:
+            start (int): First period, clipped to the cached periods.
+            stop (int): End period (exclusive), clipped likewise.
+            width (int): Number of columns, e.g. the chart width in cells.
+
+        Returns:
+            Decimated: Per-column extremes. `start` and `stop` are those
+            actually covered, rounded to bucket boundaries for long ranges.
+        """
+        stop = min(max(stop, 0), self.n)
+        start = min(max(start, 0), stop)
+        width = max(width, 1)
+        span = stop - start
+
+        level = next(
+            (lv for lv in reversed(self.levels) if lv.bucket * OVERSAMPLE * width <= span), None
+        )
+        if level is None:
+            rows = self.history.rows(start, stop)
+            if span <= width:
+                return Decimated(self.keys, start, stop, rows, rows)
+            edges = np.arange(width) * span // width
+            return Decimated(
+                self.keys, start, stop, np.fmin.reduceat(rows, edges, axis=0), np.fmax.reduceat(rows, edges, axis=0)
+            )
+
+        first = start // level.bucket
+        end = -(-stop // level.bucket)
+        edges = np.arange(width) * (end - first) // width
+        return Decimated(
+            self.keys,
+            first * level.bucket,
+            min(end * level.bucket, self.n),
+            np.fmin.reduceat(level.low[first:end], edges, axis=0),
+            np.fmax.reduceat(level.high[first:end], edges, axis=0),
+        )
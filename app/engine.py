@@ -0,0 +1,237 @@
+# app/engine.py
+
+"""
+Headless simulation engine for the Hume model.
+
+The engine holds the model state in a NumPy vector and advances it any number
+of periods in one call, without touching Textual. The TUI is a thin client
+that pushes user edits in and renders the rows that come out.
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping
+import re
+import numpy as np
+
+from .instrument import INSTRUMENT
+from .model import HUME_MODEL
+
+if TYPE_CHECKING:
+    from .irf import Impulse, IRFResult
+
+VARIABLE_KEYS = list(HUME_MODEL.states)
+PARAMETER_KEYS = list(HUME_MODEL.parameters)
+SHOCK_KEYS = ["A-mean", "A-stderr", "D-mean", "D-stderr"]
+
+# Columns produced by one period, in the order listed in the model spec
+OUTPUT_KEYS = list(HUME_MODEL.outputs)
+
+_STATE_INDEX = {key: i for i, key in enumerate(VARIABLE_KEYS)}
+_OUTPUT_TO_STATE = np.array([_STATE_INDEX[key] for key in OUTPUT_KEYS])
+
+# simulate(state, params, A, D, out): advance the model once per shock pair
+# and write every period into `out`. Compiled once from the model spec.
+#
+# Works on scalars for a single path and on equally shaped arrays for a
+# batch of paths; `out` is then (T, len(OUTPUT_KEYS)) or
+# (T, len(OUTPUT_KEYS), paths) respectively. `state` needs the lagged
+# inputs (K, s, M, K_last, P_last), `params` the model parameters.
+simulate = HUME_MODEL.compile()
+MODEL_VERSION = HUME_MODEL.version()
+UNTIL_FIRST_BLOCK = 1000  # Periods in the first block run_until checks; later blocks double
+
+
+_OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+_CONDITION_RE = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(\S+)\s*$")
+
+
+class Condition:
+    """
+    A stopping rule of the form `<variable> <operator> <value>`, e.g. "K > 10".
+    """
+
+    def __init__(self, key: str, op: str, value: float) -> None:
+        if key not in OUTPUT_KEYS:
+            raise ValueError(f"Unknown variable in condition: '{key}'")
+        if op not in _OPERATORS:
+            raise ValueError(f"Unknown operator in condition: '{op}'")
+        self.key = key
+        self.op = op
+        self.value = float(value)
+        self._column = OUTPUT_KEYS.index(key)
+
+    @classmethod
+    def parse(cls, text: str) -> "Condition":
+        match = _CONDITION_RE.match(text)
+        if not match:
+            raise ValueError(f"Cannot parse condition '{text}', expected e.g. 'K > 10'")
+        key, op, value = match.groups()
+        try:
+            return cls(key, op, float(value))
+        except ValueError as e:
+            raise ValueError(f"Cannot parse condition '{text}': {e}")
+
+    def __str__(self) -> str:
+        return f"{self.key} {self.op} {self.value:g}"
+
+    def first(self, rows: np.ndarray) -> int:
+        """Index of the first row meeting the condition, or -1."""
+        hits = np.flatnonzero(_OPERATORS[self.op](rows[:, self._column], self.value))
+        return int(hits[0]) if len(hits) else -1
+
+
+def draw_shocks(
+    rng: np.random.Generator, shocks: Mapping[str, float], n: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Draw `n` periods of (A, D) shocks from `rng` in one vectorized call.
+
+    Draws are interleaved A, D per period, so splitting a run into blocks
+    consumes the generator exactly like a single call of the full length.
+    """
+    z = rng.standard_normal((n, 2))
+    A = shocks["A-mean"] + shocks["A-stderr"] * z[:, 0]
+    D = shocks["D-mean"] + shocks["D-stderr"] * z[:, 1]
+    return A, D
+
+
+class Engine:
+    """
+    Single-path simulation of the Hume model.
+
+    State, parameters and shock settings are kept at full float64 precision.
+    Shocks are drawn from the engine's own generator in vectorized blocks, so
+    running 10 periods at once or 10 times one period yields the same path.
+    """
+
+    def __init__(
+        self,
+        state: Mapping[str, float],
+        params: Mapping[str, float],
+        shocks: Mapping[str, float],
+        seed: int | np.random.SeedSequence | None = None,
+    ) -> None:
+        self.state = np.array([float(state[key]) for key in VARIABLE_KEYS])
+        self.params = {key: float(params[key]) for key in PARAMETER_KEYS}
+        self.shocks = {key: float(shocks[key]) for key in SHOCK_KEYS}
+        self.rng = np.random.default_rng(seed)
+        self.steps = 0
+
+    def __getitem__(self, key: str) -> float:
+        return float(self.state[_STATE_INDEX[key]])
+
+    def state_dict(self) -> Dict[str, float]:
+        return dict(zip(VARIABLE_KEYS, self.state.tolist()))
+
+    def copy(self) -> "Engine":
+        """An independent engine in the same state that draws the same shocks from here on."""
+        engine = Engine(self.state_dict(), self.params, self.shocks)
+        engine.rng.bit_generator.state = self.rng.bit_generator.state
+        engine.steps = self.steps
+        return engine
+
+    def update(self, values: Mapping[str, float]) -> None:
+        """
+        Overwrite state variables, parameters or shock settings by name.
+        """
+        for key, value in values.items():
+            if key in _STATE_INDEX:
+                self.state[_STATE_INDEX[key]] = float(value)
+            elif key in self.params:
+                self.params[key] = float(value)
+            elif key in self.shocks:
+                self.shocks[key] = float(value)
+            else:
+                raise KeyError(f"Unknown model key: '{key}'")
+
+    def run(self, n: int) -> np.ndarray:
+        """
+        Advance the model `n` periods.
+
+        Returns:
+            np.ndarray: Array of shape (n, len(OUTPUT_KEYS)), one row per period.
+        """
+        out = np.empty((n, len(OUTPUT_KEYS)))
+        if n <= 0:
+            return out
+
+        # NumPy scalars rather than Python floats, so a path that diverges
+        # (e.g. K < 0 under K**alpha) turns into NaN instead of complex numbers
+        with INSTRUMENT.time("sampling"):
+            A, D = draw_shocks(self.rng, self.shocks, n)
+        with INSTRUMENT.time("equations"), np.errstate(invalid="ignore", divide="ignore"):
+            simulate(dict(zip(VARIABLE_KEYS, self.state)), self.params, A, D, out)
+        INSTRUMENT.count("steps", n)
+
+        self.state[_OUTPUT_TO_STATE] = out[-1]
+        self.steps += n
+        return out
+
+    def run_until(self, condition: Condition, max_steps: int) -> tuple[np.ndarray, bool]:
+        """
+        Advance until `condition` holds, but at most `max_steps` periods.
+
+        Periods are computed in blocks that start at `UNTIL_FIRST_BLOCK`
+        periods and double in size, so an early match costs a small block. On
+        a match the engine is rewound to just after the first matching period,
+        so the path is the same as when stepping one period at a time.
+
+        Returns:
+            tuple[np.ndarray, bool]: The rows up to and including the matching
+            period, and whether the condition was met.
+        """
+        blocks, done, size = [], 0, UNTIL_FIRST_BLOCK
+        while done < max_steps:
+            n = min(size, max_steps - done)
+            rng_state = self.rng.bit_generator.state
+            rows = self.run(n)
+            hit = condition.first(rows)
+            if hit >= 0:
+                discarded = n - (hit + 1)
+                self.rng.bit_generator.state = rng_state
+                draw_shocks(self.rng, self.shocks, hit + 1)
+                self.state[_OUTPUT_TO_STATE] = rows[hit]
+                self.steps -= discarded
+                INSTRUMENT.count("steps", -discarded)
+                blocks.append(rows[:hit + 1])
+                break
+            blocks.append(rows)
+            done += n
+            size *= 2
+        else:
+            hit = -1
+        if len(blocks) == 1:
+            return blocks[0], hit >= 0
+        return np.concatenate(blocks) if blocks else np.empty((0, len(OUTPUT_KEYS))), hit >= 0
+
+    def impulse_response(
+        self,
+        impulses: Iterable["Impulse"],
+        horizon: int,
+        paths: int = 1,
+        deterministic: bool = False,
+        sampler: str = "standard",
+    ) -> "IRFResult":
+        """
+        Impulse responses from the current state and settings; see
+        `app.irf.impulse_response`. The shared draws are seeded from the
+        engine's generator, so this advances it but not the state.
+        """
+        from .irf import impulse_response  # app.irf builds on this module
+
+        seed = int(self.rng.integers(2**63))
+        return impulse_response(
+            self.state_dict(), self.params, self.shocks, list(impulses), horizon, paths, seed, deterministic, sampler
+        )
+
+    def step(self) -> Dict[str, float]:
+        """
+        Advance one period and return its values keyed by `OUTPUT_KEYS`.
+        """
+        return dict(zip(OUTPUT_KEYS, self.run(1)[0].tolist()))
@@ -0,0 +1,199 @@
+# app/ensemble.py
+
+"""
+Monte Carlo ensembles of independent model paths.
+
+Every path gets its own child stream spawned from one master seed, and paths
+are simulated in fixed-size batches as (paths, T) arrays. Batches may be
+spread over a process pool, but the batch layout never depends on the number
+of workers, so results are bit-identical for a given seed. The shocks come
+from one of the samplers of `app.sampling` (antithetic pairs or quasi-Monte
+Carlo reach the same precision with fewer paths).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Mapping
+import multiprocessing
+import numpy as np
+
+from .engine import OUTPUT_KEYS, VARIABLE_KEYS, simulate
+from .results import CorrelationMatrix, MomentsTable
+from .sampling import check_sampler, path_normals
+from .stats import Comoments, Moments
+
+CHUNK_SIZE = 256  # Paths per batch; fixed so the split is worker-independent (and even, for antithetic pairs)
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    A pool of `workers` processes that is safe to start from a thread.
+
+    Pools are started from the TUI's worker threads and the server's
+    executor, while other threads run. Forking such a process can deadlock
+    on locks held by the other threads, so workers are started by a fork
+    server (a clean single-threaded process) where available, else spawned.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+@dataclass
+class EnsembleResult:
+    """Cross-path statistics of an ensemble run."""
+
+    keys: List[str]
+    seed: int
+    paths: int                   # Paths completed so far
+    steps: int
+    diverged: int                # Paths dropped because they turned NaN
+    mean: np.ndarray             # (steps, k) cross-path mean per period
+    std: np.ndarray              # (steps, k) cross-path std. dev. per period
+    moments: MomentsTable        # Pooled over paths and periods
+    correlations: CorrelationMatrix
+    data: np.ndarray | None = field(default=None, repr=False)  # (paths, steps, k)
+    sampler: str = "standard"
+
+
+def _run_chunk(
+    state: Dict[str, float],
+    params: Dict[str, float],
+    shocks: Dict[str, float],
+    steps: int,
+    seeds: List[np.random.SeedSequence],
+    keep_paths: bool = False,
+    sampler: str = "standard",
+    start: int = 0,
+    total: int = 0,
+    scramble: np.random.SeedSequence | None = None,
+) -> tuple[np.ndarray | None, Moments, Moments, Comoments]:
+    """
+    Simulate one batch of paths, paths `start` onwards of `total`.
+
+    Returns its pooled moments, per-period moments and pooled co-moments over
+    the paths that stayed finite, plus the (paths, steps, k) batch itself if
+    `keep_paths` is set.
+    """
+    z = path_normals(sampler, seeds, start, total or len(seeds), steps, scramble)
+    A = shocks["A-mean"] + shocks["A-stderr"] * z[:, 0, :]
+    D = shocks["D-mean"] + shocks["D-stderr"] * z[:, 1, :]
+
+    initial = {key: np.full(len(seeds), value) for key, value in state.items()}
+    out = np.empty((steps, len(OUTPUT_KEYS), len(seeds)))
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        simulate(initial, params, A, D, out)
+    data = out.transpose(2, 0, 1)
+
+    kept = data[np.isfinite(data).all(axis=(1, 2))]
+    rows = kept.reshape(-1, len(OUTPUT_KEYS))
+    stats = Moments.from_array(rows), Moments.from_array(kept), Comoments.from_array(rows)
+    return (data if keep_paths else None, *stats)
+
+
+def iter_ensemble(
+    state: Mapping[str, float],
+    params: Mapping[str, float],
+    shocks: Mapping[str, float],
+    steps: int,
+    paths: int,
+    seed: int | None = None,
+    workers: int = 1,
+    keep_paths: bool = False,
+    sampler: str = "standard",
+) -> Iterator[EnsembleResult]:
+    """
+    Run an ensemble batch by batch, yielding the merged result so far after
+    each batch. The last result yielded is the complete ensemble; closing the
+    iterator early cancels the batches that have not started yet.
+
+    Takes the same arguments as `run_ensemble`.
+    """
+    check_sampler(sampler)
+    master = np.random.SeedSequence(seed)
+    *children, scramble = master.spawn(paths + 1)  # The first `paths` are the same as spawn(paths)
+    state = {key: float(state[key]) for key in VARIABLE_KEYS}
+    params = {key: float(value) for key, value in params.items()}
+    shocks = {key: float(value) for key, value in shocks.items()}
+
+    batches = [children[i:i + CHUNK_SIZE] for i in range(0, paths, CHUNK_SIZE)]
+    args = [
+        (state, params, shocks, steps, batch, keep_paths, sampler, i * CHUNK_SIZE, paths, scramble)
+        for i, batch in enumerate(batches)
+    ]
+
+    # Merge in batch order, which is fixed by the seed and path count alone
+    pooled = Moments(len(OUTPUT_KEYS))
+    per_period = Moments((steps, len(OUTPUT_KEYS)))
+    comoments = Comoments(len(OUTPUT_KEYS))
+    data = []
+    completed = 0
+
+    pool = process_pool(workers) if workers > 1 and len(batches) > 1 else None
+    try:
+        if pool is not None:
+            chunks = pool.map(_run_chunk, *zip(*args))
+        else:
+            chunks = (_run_chunk(*a) for a in args)
+
+        for batch, (chunk_data, chunk_pooled, chunk_per_period, chunk_comoments) in zip(batches, chunks):
+            pooled.merge(chunk_pooled)
+            per_period.merge(chunk_per_period)
+            comoments.merge(chunk_comoments)
+            if keep_paths:
+                data.append(chunk_data)
+            completed += len(batch)
+
+            final = completed == paths
+            empty = per_period.n == 0
+            yield EnsembleResult(
+                keys=list(OUTPUT_KEYS),
+                seed=master.entropy,
+                paths=completed,
+                steps=steps,
+                diverged=completed - per_period.n,
+                mean=np.full((steps, len(OUTPUT_KEYS)), np.nan) if empty else per_period.mean,
+                std=np.full((steps, len(OUTPUT_KEYS)), np.nan) if empty else per_period.std,
+                moments=MomentsTable.from_moments(OUTPUT_KEYS, pooled),
+                correlations=CorrelationMatrix.from_comoments(OUTPUT_KEYS, comoments),
+                data=np.concatenate(data) if final and data else None,
+                sampler=sampler,
+            )
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_ensemble(
+    state: Mapping[str, float],
+    params: Mapping[str, float],
+    shocks: Mapping[str, float],
+    steps: int,
+    paths: int,
+    seed: int | None = None,
+    workers: int = 1,
+    keep_paths: bool = False,
+    sampler: str = "standard",
+) -> EnsembleResult:
+    """
+    Run `paths` independent paths of `steps` periods each.
+
+    Args:
+        state (Mapping): Initial values for `VARIABLE_KEYS`.
+        params (Mapping): Model parameters.
+        shocks (Mapping): Shock means and standard errors.
+        steps (int): Periods per path.
+        paths (int): Number of paths.
+        seed (int | None): Master seed; a fresh one is drawn if omitted.
+        workers (int): Worker processes; 1 runs in the calling process.
+        keep_paths (bool): Keep the full (paths, steps, k) array in the result.
+        sampler (str): Shock sampler, one of `app.sampling.SAMPLERS`.
+
+    Returns:
+        EnsembleResult: Cross-path moments and correlations.
+    """
+    if paths <= 0:
+        raise ValueError("An ensemble needs at least one path.")
+    for result in iter_ensemble(state, params, shocks, steps, paths, seed, workers, keep_paths, sampler):
+        pass
+    return result
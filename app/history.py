@@ -0,0 +1,274 @@
+# app/history.py
+
+"""
+Columnar simulation history.
+
+All periods of a run live in one preallocated float64 buffer with a
+contiguous column per variable, grown geometrically as rows are appended.
+Past a configurable size the buffer moves into a memory-mapped temporary
+file, so very long histories cost disk pages rather than RAM.
+
+A `ForkedHistory` continues another history from one of its periods: it
+shares the rows before the fork without copying them and stores only its own
+rows, so the branches of a scenario tree cost memory only for the periods in
+which they differ.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+import numpy as np
+
+from .engine import OUTPUT_KEYS
+
+INITIAL_CAPACITY = 1024
+
+
+class History:
+    """
+    Growable (periods, variables) float64 buffer stored column by column.
+
+    Column and array views are zero-copy; they stay valid until an append
+    grows the buffer, after which they refer to the old storage.
+
+    Args:
+        keys (Sequence[str]): Variable names, one column each.
+        capacity (int): Initially allocated number of periods.
+        spill_bytes (int | None): Move the buffer to a memory-mapped file once
+            it would grow beyond this many bytes. None keeps it in memory.
+        spill_dir (str | Path | None): Directory for the memory-mapped file;
+            defaults to the system temp directory.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str] = OUTPUT_KEYS,
+        capacity: int = INITIAL_CAPACITY,
+        spill_bytes: int | None = None,
+        spill_dir: str | Path | None = None,
+    ) -> None:
+        self.keys = list(keys)
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+        self.spill_path: Path | None = None
+        self.n = 0
+        self._buf = self._allocate(max(capacity, 1))
+
+    @classmethod
+    def wrap(cls, array: np.ndarray, keys: Sequence[str] = OUTPUT_KEYS) -> "History":
+        """
+        A history whose periods are an existing (periods, variables) array,
+        such as a read-only memory map, used without copying. The first
+        append copies the periods into a buffer of its own, as when growing;
+        to extend a large array cheaply, fork it with `ForkedHistory`.
+        """
+        history = cls(keys, capacity=1)
+        if len(array):
+            history._buf = array
+            history.n = len(array)
+        return history
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    @property
+    def spilled(self) -> bool:
+        return self.spill_path is not None
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        nbytes = capacity * len(self.keys) * 8
+        if self.spill_bytes is None or nbytes <= self.spill_bytes:
+            return np.empty((capacity, len(self.keys)), order="F")
+
+        fd, path = tempfile.mkstemp(prefix="hume_history-", suffix=".f64", dir=self.spill_dir)
+        os.close(fd)
+        buf = np.memmap(path, dtype=np.float64, mode="w+", shape=(capacity, len(self.keys)), order="F")
+        self.spill_path = Path(path)
+        return buf
+
+    def _release(self) -> None:
+        """Drop the current memory-mapped file, if any."""
+        if self.spill_path is not None:
+            self._buf = None
+            self.spill_path.unlink(missing_ok=True)
+            self.spill_path = None
+
+    def append(self, rows: np.ndarray) -> None:
+        """Append a block of periods, shape (m, len(keys))."""
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(self.keys))
+        end = self.n + len(rows)
+        if end > self.capacity:
+            capacity = self.capacity
+            while capacity < end:
+                capacity *= 2
+            # Detach the old mapping first so it survives until its rows are copied
+            old, old_path = self._buf, self.spill_path
+            self.spill_path = None
+            buf = self._allocate(capacity)
+            buf[:self.n] = old[:self.n]
+            self._buf = buf
+            del old
+            if old_path is not None:
+                old_path.unlink(missing_ok=True)
+        self._buf[self.n:end] = rows
+        self.n = end
+
+    def column(self, key: str) -> np.ndarray:
+        """Zero-copy, contiguous view of one variable's series."""
+        return self._buf[:self.n, self.index[key]]
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.column(key)
+
+    def array(self) -> np.ndarray:
+        """Zero-copy (periods, variables) view of the whole history."""
+        return self._buf[:self.n]
+
+    def row(self, i: int) -> Dict[str, float]:
+        return dict(zip(self.keys, self._buf[i].tolist()))
+
+    def segments(self, stop: int | None = None) -> List[np.ndarray]:
+        """Zero-copy views that together hold the first `stop` periods (default all)."""
+        return [self._buf[:self.n if stop is None else stop]]
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        """Zero-copy view of periods `start` to `stop`."""
+        return self._buf[start:stop]
+
+    def iter_blocks(self, size: int = 10_000) -> Iterator[np.ndarray]:
+        """Yield the history in row blocks of at most `size` periods."""
+        for start in range(0, self.n, size):
+            yield self._buf[start:min(start + size, self.n)]
+
+    def to_dicts(self) -> List[Dict[str, float]]:
+        return [dict(zip(self.keys, row)) for row in self.array().tolist()]
+
+    def clear(self) -> None:
+        self._release()
+        self.n = 0
+        self._buf = self._allocate(INITIAL_CAPACITY)
+
+    def close(self) -> None:
+        """Release the backing file of a spilled history."""
+        self._release()
+        self._buf = np.empty((0, len(self.keys)), order="F")
+        self.n = 0
+
+    def __del__(self) -> None:
+        try:
+            self._release()
+        except Exception:
+            pass
+
+
+class ForkedHistory:
+    """
+    History of a branch: the first `fork` periods of `base`, shared without
+    copying, followed by the branch's own periods. Offers the reading
+    interface of `History`; appends go to the branch's own buffer only.
+
+    `base` may itself be forked, and may keep growing after the fork, but
+    must not be cleared while branches depend on it.
+
+    Args:
+        base (History | ForkedHistory): The history branched from.
+        fork (int): Number of leading periods of `base` shared.
+        spill_bytes (int | None): As for `History`, for the own periods.
+        spill_dir (str | Path | None): As for `History`.
+    """
+
+    def __init__(
+        self,
+        base: "History | ForkedHistory",
+        fork: int,
+        spill_bytes: int | None = None,
+        spill_dir: str | Path | None = None,
+    ) -> None:
+        if not 0 <= fork <= len(base):
+            raise ValueError(f"Cannot fork at period {fork} of a history of {len(base)} periods")
+        self.base = base
+        self.fork = fork
+        self.keys = base.keys
+        self.index = base.index
+        self.own = History(self.keys, spill_bytes=spill_bytes, spill_dir=spill_dir)
+
+    @property
+    def n(self) -> int:
+        return self.fork + self.own.n
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def spilled(self) -> bool:
+        return self.own.spilled
+
+    def append(self, rows: np.ndarray) -> None:
+        self.own.append(rows)
+
+    def segments(self, stop: int | None = None) -> List[np.ndarray]:
+        stop = self.n if stop is None else stop
+        segments = self.base.segments(min(stop, self.fork))
+        if stop > self.fork:
+            segments.append(self.own.array()[:stop - self.fork])
+        return segments
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        """Periods `start` to `stop`; a copy if they span shared and own periods."""
+        parts, offset = [], 0
+        for segment in self.segments(stop):
+            if start < offset + len(segment):
+                parts.append(segment[max(start - offset, 0):])
+            offset += len(segment)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.empty((0, len(self.keys)))
+
+    def array(self) -> np.ndarray:
+        """(periods, variables) array of the whole path; a copy unless nothing is shared."""
+        segments = [s for s in self.segments() if len(s)]
+        if len(segments) == 1:
+            return segments[0]
+        if not segments:
+            return self.own.array()
+        return np.asfortranarray(np.concatenate(segments))
+
+    def column(self, key: str) -> np.ndarray:
+        """One variable's series; a contiguous copy unless nothing is shared."""
+        j = self.index[key]
+        segments = [s[:, j] for s in self.segments() if len(s)]
+        return segments[0] if len(segments) == 1 else np.concatenate(segments or [self.own.column(key)])
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.column(key)
+
+    def row(self, i: int) -> Dict[str, float]:
+        if i < 0:
+            i += self.n
+        if i >= self.fork:
+            return self.own.row(i - self.fork)
+        return self.base.row(i)
+
+    def iter_blocks(self, size: int = 10_000) -> Iterator[np.ndarray]:
+        """Yield the path in zero-copy row blocks of at most `size` periods."""
+        for segment in self.segments():
+            for start in range(0, len(segment), size):
+                yield segment[start:start + size]
+
+    def to_dicts(self) -> List[Dict[str, float]]:
+        return [dict(zip(self.keys, row)) for block in self.iter_blocks() for row in block.tolist()]
+
+    def clear(self) -> None:
+        """Drop all periods, including the shared ones, leaving an empty history."""
+        self.fork = 0
+        self.own.clear()
+
+    def close(self) -> None:
+        self.fork = 0
+        self.own.close()
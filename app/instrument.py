@@ -0,0 +1,148 @@
+# app/instrument.py
+
+"""
+Lightweight instrumentation of the hot paths.
+
+Stages (sampling, equations, statistics, rendering, export) are timed with
+`INSTRUMENT.time(stage)` and events counted with `INSTRUMENT.count(name)`.
+Both cost a dict lookup and two clock reads when enabled, and nothing beyond
+a no-op context when disabled. The figures feed the diagnostics panel and can
+be saved as a JSON profile.
+
+Timers and counters may be used from several threads at once (worker
+threads, the server's executor): start times are kept per thread and
+updates are made under a lock.
+
+Verbose logging is gated by a level: build expensive log messages only under
+`if INSTRUMENT.verbose:`, so they cost nothing when the level is lower.
+"""
+
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import ContextManager, Dict
+import json
+import threading
+import time
+
+STAGES = ["sampling", "equations", "statistics", "rendering", "export"]
+LOG_LEVELS = {"info": 1, "debug": 2}
+
+_NULL = nullcontext()
+_LOCK = threading.Lock()  # Guards timer and counter updates
+
+
+@dataclass
+class StageTimer:
+    """Accumulated wall time of one stage, in seconds."""
+
+    calls: int = 0
+    total: float = 0.0
+    last: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    def add(self, seconds: float) -> None:
+        with _LOCK:
+            self.calls += 1
+            self.total += seconds
+            self.last = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+
+class _Timed:
+    """
+    Reusable context manager timing blocks into one `StageTimer`. Each
+    thread keeps its own stack of start times, so nested, re-entered and
+    concurrent blocks are timed independently.
+    """
+
+    __slots__ = ("timer", "local")
+
+    def __init__(self, timer: StageTimer) -> None:
+        self.timer = timer
+        self.local = threading.local()
+
+    def __enter__(self) -> None:
+        starts = getattr(self.local, "starts", None)
+        if starts is None:
+            starts = self.local.starts = []
+        starts.append(time.perf_counter())
+
+    def __exit__(self, *exc) -> None:
+        self.timer.add(time.perf_counter() - self.local.starts.pop())
+
+
+class Instrument:
+    """
+    Per-stage timers and named counters.
+
+    Args:
+        enabled (bool): Record timings and counts.
+        level (str): Log level, one of `LOG_LEVELS`.
+    """
+
+    def __init__(self, enabled: bool = True, level: str = "info") -> None:
+        self.configure(enabled, level)
+        self.reset()
+
+    def configure(self, enabled: bool = True, level: str = "info") -> None:
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level '{level}', expected one of {list(LOG_LEVELS)}")
+        self.enabled = enabled
+        self.level = level
+        self.verbose = LOG_LEVELS[level] >= LOG_LEVELS["debug"]
+
+    def reset(self) -> None:
+        self.timers: Dict[str, StageTimer] = {}
+        self._contexts: Dict[str, _Timed] = {}
+        for stage in STAGES:
+            self._add_stage(stage)
+        self.counters: Dict[str, int] = {}
+        self.started = time.time()
+
+    def _add_stage(self, stage: str) -> _Timed:
+        with _LOCK:
+            if stage not in self._contexts:
+                self.timers[stage] = StageTimer()
+                self._contexts[stage] = _Timed(self.timers[stage])
+            return self._contexts[stage]
+
+    def time(self, stage: str) -> ContextManager:
+        """Context manager adding the wall time of its block to `stage`."""
+        if not self.enabled:
+            return _NULL
+        context = self._contexts.get(stage)
+        return context if context is not None else self._add_stage(stage)
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            with _LOCK:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> dict:
+        """Current timers (in seconds) and counters as plain data."""
+        with _LOCK:
+            return {
+                "elapsed": time.time() - self.started,
+                "timers": {
+                    stage: {"calls": t.calls, "total": t.total, "mean": t.mean, "last": t.last, "max": t.max}
+                    for stage, t in self.timers.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def export(self, path: str | Path) -> Path:
+        """Write the snapshot as a JSON profile."""
+        path = Path(path)
+        profile = {"created": datetime.now().isoformat(timespec="seconds"), **self.snapshot()}
+        path.write_text(json.dumps(profile, indent=2) + "\n")
+        return path
+
+
+INSTRUMENT = Instrument()
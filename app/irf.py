@@ -0,0 +1,145 @@
+# app/irf.py
+
+"""
+Impulse-response functions.
+
+An impulse adds a multiple of a shock's standard error to that shock in one
+period. The baseline and every shocked scenario are run from the same start
+and with the same random draws (common random numbers), all as columns of a
+single vectorized simulation. The responses are the differences between the
+shocked and baseline paths, averaged over paths, so the sampling noise of the
+draws cancels out of the difference. The draws can also come from a
+variance-reducing sampler of `app.sampling`.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Sequence
+import numpy as np
+
+from .engine import OUTPUT_KEYS, SHOCK_KEYS, VARIABLE_KEYS, simulate
+from .sampling import check_sampler, path_normals
+
+IRF_SHOCKS = ["A", "D"]
+DEFAULT_HORIZON = 50
+
+
+@dataclass(frozen=True)
+class Impulse:
+    """A one-off shock of `size` standard errors to `shock` in period `period`."""
+
+    shock: str
+    size: float = 1.0
+    period: int = 0
+
+    def __post_init__(self) -> None:
+        if self.shock not in IRF_SHOCKS:
+            raise ValueError(f"Unknown shock '{self.shock}', expected one of {IRF_SHOCKS}")
+
+    def __str__(self) -> str:
+        when = f" at t={self.period}" if self.period else ""
+        return f"{self.size:+g} s.d. {self.shock}{when}"
+
+
+@dataclass
+class IRFResult:
+    """Responses to a set of impulses over a common horizon."""
+
+    keys: List[str]
+    impulses: List[Impulse]
+    horizon: int
+    paths: int
+    baseline: np.ndarray          # (horizon, k) mean baseline path
+    deviations: np.ndarray = field(repr=False)  # (impulses, horizon, k) shocked - baseline
+
+    def response(self, impulse: int | Impulse, key: str) -> np.ndarray:
+        """Deviation path of `key` after the given impulse (or its index)."""
+        index = self.impulses.index(impulse) if isinstance(impulse, Impulse) else impulse
+        return self.deviations[index, :, self.keys.index(key)]
+
+    def percent(self) -> np.ndarray:
+        """Deviations in percent of the baseline; NaN where the baseline is 0."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.baseline != 0, 100 * self.deviations / self.baseline, np.nan)
+
+    def as_dict(self) -> Dict[str, Dict[str, List[float]]]:
+        """Nested {str(impulse): {key: deviation path}} mapping."""
+        return {
+            str(impulse): dict(zip(self.keys, self.deviations[i].T.tolist()))
+            for i, impulse in enumerate(self.impulses)
+        }
+
+
+def impulse_response(
+    state: Mapping[str, float],
+    params: Mapping[str, float],
+    shocks: Mapping[str, float],
+    impulses: Sequence[Impulse],
+    horizon: int = DEFAULT_HORIZON,
+    paths: int = 1,
+    seed: int | None = None,
+    deterministic: bool = False,
+    sampler: str = "standard",
+) -> IRFResult:
+    """
+    Compute impulse responses from `state`.
+
+    Args:
+        state (Mapping): Starting values for `VARIABLE_KEYS`, e.g. the steady state.
+        params (Mapping): Model parameters.
+        shocks (Mapping): Shock means and standard errors; impulses are sized
+            in units of the standard errors.
+        impulses (Sequence[Impulse]): Impulses, each compared to the baseline.
+        horizon (int): Periods to simulate.
+        paths (int): Paths to average the responses over.
+        seed (int | None): Seed of the shared draws.
+        deterministic (bool): Keep the shocks at their means apart from the
+            impulses, so the responses are exact and `paths` is ignored.
+        sampler (str): Sampler of the shared draws, see `app.sampling`.
+
+    Returns:
+        IRFResult: Deviation paths of every output variable per impulse.
+    """
+    if horizon <= 0:
+        raise ValueError("The horizon must be positive.")
+    if paths <= 0:
+        raise ValueError("An impulse response needs at least one path.")
+    check_sampler(sampler)
+    impulses = list(impulses)
+    for impulse in impulses:
+        if not 0 <= impulse.period < horizon:
+            raise ValueError(f"Impulse {impulse} lies outside the horizon of {horizon} periods.")
+    shocks = {key: float(shocks[key]) for key in SHOCK_KEYS}
+    if deterministic:
+        paths = 1
+
+    # Columns: scenario-major, so column s * paths + j is path j of scenario s
+    # (scenario 0 is the baseline). All scenarios reuse the same draws.
+    scenarios = len(impulses) + 1
+    if deterministic:
+        z = np.zeros((horizon, 2, paths))
+    elif sampler == "standard":
+        z = np.random.default_rng(seed).standard_normal((horizon, 2, paths))
+    else:
+        *children, scramble = np.random.SeedSequence(seed).spawn(paths + 1)
+        z = path_normals(sampler, children, 0, paths, horizon, scramble)
+    z = np.tile(z, (1, 1, scenarios))
+    for s, impulse in enumerate(impulses, 1):
+        z[impulse.period, IRF_SHOCKS.index(impulse.shock), s * paths:(s + 1) * paths] += impulse.size
+    A = shocks["A-mean"] + shocks["A-stderr"] * z[:, 0, :]
+    D = shocks["D-mean"] + shocks["D-stderr"] * z[:, 1, :]
+
+    start = {key: np.full(scenarios * paths, float(state[key])) for key in VARIABLE_KEYS}
+    out = np.empty((horizon, len(OUTPUT_KEYS), scenarios * paths))
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        simulate(start, params, A, D, out)
+
+    runs = out.reshape(horizon, len(OUTPUT_KEYS), scenarios, paths)
+    deviations = runs[:, :, 1:, :] - runs[:, :, :1, :]
+    return IRFResult(
+        keys=list(OUTPUT_KEYS),
+        impulses=impulses,
+        horizon=horizon,
+        paths=paths,
+        baseline=runs[:, :, 0, :].mean(axis=2),
+        deviations=deviations.mean(axis=3).transpose(2, 0, 1),
+    )
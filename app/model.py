@@ -0,0 +1,231 @@
+# app/model.py
+
+"""
+Declarative model specification.
+
+The model is a list of equations, each naming the variable it defines, the
+`eq_*` function computing it and that function's inputs. An input is either
+another variable of the same period (e.g. "Y"), the previous period's value of
+a state variable ("K[-1]"), a parameter ("alpha") or an exogenous shock ("A").
+
+`ModelSpec.compile()` derives the evaluation order from the dependency graph,
+rejects cycles and unknown inputs, and generates one fused Python function
+that runs the whole period loop with every equation inlined, so a period
+costs no dict or global name lookups.
+"""
+
+import ast
+import hashlib
+import inspect
+import textwrap
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from . import equations
+from .equations import (
+    eq_output,
+    eq_consumption,
+    eq_investment,
+    eq_capital_accumulation,
+    eq_profit,
+    eq_interest_rate,
+    eq_savings_rate,
+    eq_wealth_concentration,
+    eq_price_level,
+    eq_inflation,
+)
+
+LAG = "[-1]"
+
+
+class ModelSpecError(ValueError):
+    """Raised for an inconsistent model specification."""
+
+
+def identity(x: float) -> float:
+    """x_t = x"""
+    return x
+
+
+@dataclass(frozen=True)
+class Equation:
+    """`name = func(*inputs)`, evaluated once per period."""
+
+    name: str
+    func: Callable
+    inputs: Tuple[str, ...]
+
+
+@dataclass
+class ModelSpec:
+    """
+    A complete model.
+
+    Args:
+        equations (Sequence[Equation]): One equation per endogenous variable,
+            in any order.
+        states (Sequence[str]): Variables carried between periods. A state
+            without an equation (e.g. "M") keeps its value.
+        parameters (Sequence[str]): Parameter names.
+        shocks (Sequence[str]): Exogenous series, one value per period.
+        outputs (Sequence[str] | None): Variables recorded per period, in
+            column order; defaults to the equations in listed order.
+    """
+
+    equations: Sequence[Equation]
+    states: Sequence[str]
+    parameters: Sequence[str]
+    shocks: Sequence[str]
+    outputs: Sequence[str] | None = None
+
+    def __post_init__(self) -> None:
+        if self.outputs is None:
+            self.outputs = [eq.name for eq in self.equations]
+        self.outputs = list(self.outputs)
+
+    def order(self) -> List[Equation]:
+        """
+        Equations sorted so every variable is computed after the same-period
+        variables it depends on (stable with respect to the listed order).
+
+        Raises:
+            ModelSpecError: On duplicate definitions, unknown inputs or cycles.
+        """
+        by_name: Dict[str, Equation] = {}
+        for eq in self.equations:
+            if eq.name in by_name:
+                raise ModelSpecError(f"Variable '{eq.name}' is defined twice")
+            if eq.name in self.parameters or eq.name in self.shocks:
+                raise ModelSpecError(f"Variable '{eq.name}' clashes with a parameter or shock")
+            by_name[eq.name] = eq
+
+        deps: Dict[str, set] = {}
+        for eq in self.equations:
+            deps[eq.name] = set()
+            for ref in eq.inputs:
+                if ref.endswith(LAG):
+                    if ref[:-len(LAG)] not in self.states:
+                        raise ModelSpecError(f"'{eq.name}' uses lag of '{ref[:-len(LAG)]}', which is not a state")
+                elif ref in by_name:
+                    deps[eq.name].add(ref)
+                elif ref not in self.parameters and ref not in self.shocks:
+                    raise ModelSpecError(f"'{eq.name}' uses unknown input '{ref}'")
+
+        for name in self.outputs:
+            if name not in by_name:
+                raise ModelSpecError(f"Output '{name}' has no equation")
+
+        ordered: List[Equation] = []
+        done: set = set()
+        pending = list(self.equations)
+        while pending:
+            ready = next((eq for eq in pending if deps[eq.name] <= done), None)
+            if ready is None:
+                cycle = ", ".join(eq.name for eq in pending)
+                raise ModelSpecError(f"Cyclic same-period dependencies among: {cycle}")
+            ordered.append(ready)
+            done.add(ready.name)
+            pending.remove(ready)
+        return ordered
+
+    def source(self) -> str:
+        """Python source of the fused period loop (see `compile`)."""
+        ordered = self.order()
+        lagged = sorted({ref[:-len(LAG)] for eq in ordered for ref in eq.inputs if ref.endswith(LAG)})
+        used_params = sorted({ref for eq in ordered for ref in eq.inputs if ref in self.parameters})
+
+        def local(ref: str) -> str:
+            if ref.endswith(LAG):
+                return f"lag_{ref[:-len(LAG)]}"
+            if ref in self.parameters:
+                return f"par_{ref}"
+            if ref in self.shocks:
+                return f"shk_{ref}"
+            return f"var_{ref}"
+
+        shock_args = ", ".join(self.shocks)
+        lines = [f"def step(state, params, {shock_args}, out):"]
+        lines += [f"    lag_{name} = state[{name!r}]" for name in lagged]
+        lines += [f"    par_{name} = params[{name!r}]" for name in used_params]
+        shock_locals = ", ".join(f"shk_{name}" for name in self.shocks)
+        if len(self.shocks) == 1:
+            lines.append(f"    for t, {shock_locals} in enumerate({shock_args}):")
+        else:
+            lines.append(f"    for t, ({shock_locals}) in enumerate(zip({shock_args})):")
+        for eq in ordered:
+            lines.append(f"        var_{eq.name} = {_inline(eq, [local(ref) for ref in eq.inputs])}")
+        lines.append(f"        out[t] = ({', '.join(f'var_{name}' for name in self.outputs)},)")
+        lines += [f"        lag_{name} = var_{name}" for name in lagged if name in {eq.name for eq in ordered}]
+        return "\n".join(lines) + "\n"
+
+    def version(self) -> str:
+        """Short hash of the generated code; changes whenever an equation does."""
+        return hashlib.sha256(self.source().encode()).hexdigest()[:16]
+
+    def compile(self) -> Callable:
+        """
+        Build the fused step function
+
+            step(state, params, *shocks, out)
+
+        which advances the model once per element of the shock series and
+        writes each period's `outputs` into `out[t]`. Like the equations it
+        is built from, it works on scalars and on equally shaped arrays.
+        """
+        namespace = dict(vars(equations))
+        namespace.update({eq.func.__name__: eq.func for eq in self.equations})
+        code = compile(self.source(), f"<model {id(self):x}>", "exec")
+        exec(code, namespace)
+        return namespace["step"]
+
+
+def _inline(eq: Equation, args: List[str]) -> str:
+    """
+    The body of `eq.func` with its parameters renamed to `args` if it is a
+    single return expression, otherwise a plain call.
+    """
+    call = f"{eq.func.__name__}({', '.join(args)})"
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(eq.func)))
+    except (OSError, TypeError, SyntaxError):
+        return call
+
+    func = tree.body[0]
+    body = [node for node in func.body if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant))]
+    if not isinstance(func, ast.FunctionDef) or len(body) != 1 or not isinstance(body[0], ast.Return):
+        return call
+
+    params = [a.arg for a in func.args.args]
+    if len(params) != len(args) or func.args.vararg or func.args.kwarg or func.args.kwonlyargs:
+        return call
+    rename = dict(zip(params, args))
+
+    expr = body[0].value
+    for node in ast.walk(expr):
+        if isinstance(node, ast.Name) and node.id not in rename and node.id not in vars(equations):
+            return call  # Refers to something we can't resolve in the generated module
+    for node in ast.walk(expr):
+        if isinstance(node, ast.Name) and node.id in rename:
+            node.id = rename[node.id]
+    return f"({ast.unparse(expr)})"
+
+
+HUME_MODEL = ModelSpec(
+    equations=[
+        Equation("Y", eq_output, ("A", "K[-1]", "alpha")),
+        Equation("C", eq_consumption, ("Y", "s[-1]", "D")),
+        Equation("I", eq_investment, ("Y", "s[-1]", "D")),
+        Equation("K", eq_capital_accumulation, ("K_last[-1]", "I", "delta")),
+        Equation("p", eq_profit, ("alpha", "Y", "K")),
+        Equation("r", eq_interest_rate, ("p", "gamma")),
+        Equation("s", eq_savings_rate, ("C", "Y")),
+        Equation("theta", eq_wealth_concentration, ("K", "M[-1]")),
+        Equation("P", eq_price_level, ("M[-1]", "Y")),
+        Equation("pi", eq_inflation, ("P", "P_last[-1]")),
+        Equation("K_last", identity, ("K",)),
+        Equation("P_last", identity, ("P",)),
+    ],
+    states=["Y", "C", "I", "K", "r", "s", "p", "theta", "M", "P", "pi", "K_last", "P_last"],
+    parameters=["alpha", "beta", "delta", "gamma", "sigma"],
+    shocks=["A", "D"],
+)
@@ -0,0 +1,167 @@
+# app/results.py
+
+"""
+Typed simulation results.
+
+`SimulationResults` collects the columnar iteration history of a run together
+with its running statistics. Widgets render the snapshots it hands out and the
+exporter serializes them directly, all at full float64 precision.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+import copy
+import numpy as np
+
+from .engine import OUTPUT_KEYS
+from .history import ForkedHistory, History
+from .instrument import INSTRUMENT
+from .stats import Comoments, Moments, RollingWindow
+
+MOMENT_FIELDS = ["mean", "std_dev", "variance", "skewness", "kurtosis"]
+
+
+@dataclass(frozen=True)
+class MomentsTable:
+    """Per-variable moments over `n` observations."""
+
+    keys: List[str]
+    n: int
+    mean: np.ndarray
+    std_dev: np.ndarray
+    variance: np.ndarray
+    skewness: np.ndarray
+    kurtosis: np.ndarray
+
+    @classmethod
+    def from_moments(cls, keys: Sequence[str], acc: Moments) -> "MomentsTable":
+        return cls(
+            keys=list(keys),
+            n=acc.n,
+            mean=acc.mean.copy(),
+            std_dev=acc.std,
+            variance=acc.variance,
+            skewness=acc.skewness,
+            kurtosis=acc.kurtosis,
+        )
+
+    def rows(self) -> List[Dict[str, float]]:
+        """One dict per variable: {"variable": key, "mean": ..., ...}."""
+        columns = [getattr(self, name).tolist() for name in MOMENT_FIELDS]
+        return [
+            {"variable": key, **dict(zip(MOMENT_FIELDS, values))}
+            for key, *values in zip(self.keys, *columns)
+        ]
+
+
+@dataclass(frozen=True)
+class CorrelationMatrix:
+    """Pearson correlation matrix over `n` observations."""
+
+    keys: List[str]
+    n: int
+    values: np.ndarray
+
+    @classmethod
+    def from_comoments(cls, keys: Sequence[str], acc: Comoments) -> "CorrelationMatrix":
+        return cls(keys=list(keys), n=acc.n, values=acc.pearson())
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Nested {row_key: {col_key: coefficient}} mapping."""
+        return {
+            row_key: dict(zip(self.keys, row))
+            for row_key, row in zip(self.keys, self.values.tolist())
+        }
+
+
+class SimulationResults:
+    """
+    Iteration history of a run plus its running moments and co-moments, over
+    the whole run and over rolling windows of the latest `windows` periods.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str] = OUTPUT_KEYS,
+        history: History | None = None,
+        windows: Sequence[int] = (),
+    ) -> None:
+        self.keys = list(keys)
+        self.history = history if history is not None else History(self.keys)
+        self.windows = {size: RollingWindow(len(self.keys), size) for size in sorted(set(windows))}
+        self.clear()
+
+    def clear(self) -> None:
+        self.history.clear()
+        self.moments_acc = Moments(len(self.keys))
+        self.comoments = Comoments(len(self.keys))
+        for window in self.windows.values():
+            window.reset()
+
+    @property
+    def n(self) -> int:
+        return len(self.history)
+
+    def append(self, rows: np.ndarray) -> None:
+        """
+        Add a block of periods, shape (n, len(keys)), as returned by `Engine.run`.
+        """
+        rows = np.asarray(rows, dtype=float)
+        with INSTRUMENT.time("statistics"):
+            if len(rows) == 1:
+                self.moments_acc.push(rows[0])
+                self.comoments.push(rows[0])
+            else:
+                self.moments_acc.push_batch(rows)
+                self.comoments.push_batch(rows)
+            for window in self.windows.values():
+                window.push_batch(rows)
+        self.history.append(rows)
+        INSTRUMENT.count("rows recorded", len(rows))
+
+    def fork(self, at: int | None = None) -> "SimulationResults":
+        """
+        Results continuing from period `at` (default: the latest) that share
+        the history up to there. Forking at the latest period copies the
+        running statistics; forking earlier recomputes them over the shared
+        periods.
+        """
+        own = self.history.own if isinstance(self.history, ForkedHistory) else self.history
+        history = ForkedHistory(
+            self.history, self.n if at is None else at, spill_bytes=own.spill_bytes, spill_dir=own.spill_dir
+        )
+        # A shallow copy rather than __init__, which would clear the shared periods
+        results = copy.copy(self)
+        results.history = history
+        results.moments_acc = Moments(len(self.keys))
+        results.comoments = Comoments(len(self.keys))
+        if history.fork == self.n:
+            results.moments_acc.merge(self.moments_acc)
+            results.comoments.merge(self.comoments)
+            results.windows = copy.deepcopy(self.windows)
+        else:
+            results.windows = {size: RollingWindow(len(self.keys), size) for size in self.windows}
+            with INSTRUMENT.time("statistics"):
+                for block in self.history.segments(history.fork):
+                    results.moments_acc.push_batch(block)
+                    results.comoments.push_batch(block)
+            results.rebuild_windows()
+        return results
+
+    def rebuild_windows(self) -> None:
+        """Recompute the rolling windows from the latest periods of the history."""
+        with INSTRUMENT.time("statistics"):
+            for size, window in self.windows.items():
+                window.rebuild(self.history.rows(max(0, self.n - size), self.n))
+
+    def moments(self, window: int | None = None) -> MomentsTable:
+        """Moments of the whole run, or of the latest `window` periods (a configured size)."""
+        with INSTRUMENT.time("statistics"):
+            acc = self.moments_acc if window is None else self.windows[window].moments
+            return MomentsTable.from_moments(self.keys, acc)
+
+    def correlations(self, window: int | None = None) -> CorrelationMatrix:
+        """Correlations of the whole run, or of the latest `window` periods (a configured size)."""
+        with INSTRUMENT.time("statistics"):
+            acc = self.comoments if window is None else self.windows[window].comoments
+            return CorrelationMatrix.from_comoments(self.keys, acc)
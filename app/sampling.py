@@ -0,0 +1,204 @@
+# app/sampling.py
+
+"""
+Shock samplers for ensembles and impulse responses.
+
+All samplers deliver standard normal draws of shape (steps, 2, paths), A
+then D per period, which the callers scale by the shock means and standard
+errors. They differ in how the paths relate to each other:
+
+- `standard`: independent pseudo-random paths, each from its own child
+  stream of the master seed.
+- `antithetic`: paths in pairs, the second path of a pair drawing the
+  negated shocks of the first. Odd moments of the shocks cancel exactly
+  within a pair, so means converge faster for smooth responses.
+- `halton`, `sobol`: randomized quasi-Monte Carlo. Path i is point i of a
+  low-discrepancy sequence in 2 * steps dimensions, mapped through the
+  inverse normal CDF, so the paths cover the shock space more evenly than
+  random draws. Halton points are scrambled with random affine digit
+  permutations; Sobol points need SciPy (`scipy.stats.qmc`), an optional
+  dependency, and `sobol` is only offered when it is installed. Only the first
+  `QMC_DIMENSIONS` dimensions (periods 0 .. QMC_DIMENSIONS / 2 - 1) are
+  quasi-random; later periods are filled from the paths' own streams.
+
+Common random numbers come from the seed: runs with the same seed, sampler
+and number of paths draw the same standardized shocks whatever the
+parameters, so differences between them reflect the parameters rather than
+sampling noise. Sweeps rely on this across their grid points.
+
+Blocks of paths can be drawn separately (e.g. on different processes): a
+path's draws depend only on its index, the seed and the total number of
+paths, never on the block it falls in.
+"""
+
+from importlib.util import find_spec
+from typing import List, Sequence
+import numpy as np
+
+HAS_SCIPY = find_spec("scipy") is not None
+SAMPLERS = ["standard", "antithetic", "halton"] + (["sobol"] if HAS_SCIPY else [])
+SCIPY_MISSING = "The sobol sampler needs SciPy (pip install scipy); use halton instead"
+QMC_DIMENSIONS = 1024  # Quasi-random dimensions per path, two per period
+
+# Wichura's algorithm AS 241 (PPND16), accurate to about 1e-16
+_A = [3.387132872796366608, 133.14166789178437745, 1971.5909503065514427, 13731.693765509461125,
+      45921.953931549871457, 67265.770927008700853, 33430.575583588128105, 2509.0809287301226727]
+_B = [1.0, 42.313330701600911252, 687.1870074920579083, 5394.1960214247511077,
+      21213.794301586595867, 39307.89580009271061, 28729.085735721942674, 5226.495278852545925]
+_C = [1.42343711074968357734, 4.6303378461565452959, 5.7694972214606914055, 3.64784832476320460504,
+      1.27045825245236838258, 0.24178072517745061177, 0.0227238449892691845833, 7.7454501427834140764e-4]
+_D = [1.0, 2.05319162663775882187, 1.6763848301838038494, 0.68976733498510000455,
+      0.14810397642748007459, 0.0151986665636164571966, 5.475938084995344946e-4, 1.05075007164441684324e-9]
+_E = [6.6579046435011037772, 5.4637849111641143699, 1.7848265399172913358, 0.29656057182850489123,
+      0.026532189526576123093, 0.0012426609473880784386, 2.71155556874348757815e-5, 2.01033439929228813265e-7]
+_F = [1.0, 0.59983220655588793769, 0.13692988092273580531, 0.0148753612908506148525,
+      7.868691311456132591e-4, 1.8463183175100546818e-5, 1.4215117583164458887e-7, 2.04426310338993978564e-15]
+
+
+def _ratio(num: List[float], den: List[float], r: np.ndarray) -> np.ndarray:
+    return np.polyval(num[::-1], r) / np.polyval(den[::-1], r)
+
+
+def norm_ppf(p: np.ndarray) -> np.ndarray:
+    """
+    Inverse of the standard normal CDF, elementwise, by Wichura's AS 241
+    (the algorithm behind `statistics.NormalDist.inv_cdf`). 0 and 1 map to
+    -inf and +inf.
+    """
+    p = np.asarray(p, dtype=float)
+    q = p - 0.5
+    out = np.empty_like(p)
+
+    central = np.abs(q) <= 0.425
+    r = 0.180625 - q[central] ** 2
+    out[central] = q[central] * _ratio(_A, _B, r)
+
+    tail = ~central
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.sqrt(-np.log(np.where(q[tail] < 0, p[tail], 1.0 - p[tail])))
+        value = np.where(r <= 5.0, _ratio(_C, _D, r - 1.6), _ratio(_E, _F, r - 5.0))
+    value[np.isinf(r)] = np.inf
+    out[tail] = np.where(q[tail] < 0, -value, value)
+    return out
+
+
+def _primes(n: int) -> np.ndarray:
+    """The first `n` primes."""
+    limit = max(16, int(n * (np.log(n + 1) + np.log(np.log(n + 2))) + 10))
+    sieve = np.ones(limit + 1, dtype=bool)
+    sieve[:2] = False
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = False
+    return np.flatnonzero(sieve)[:n]
+
+
+def halton(start: int, n: int, dimensions: int, seed: np.random.SeedSequence, total: int) -> np.ndarray:
+    """
+    Points `start` to `start + n` of a scrambled Halton sequence, shape
+    (n, dimensions), strictly inside (0, 1).
+
+    Each base-b digit of the point index is mapped by a random affine
+    permutation d -> (a d + c) mod b, drawn per dimension and digit from
+    `seed`; digits beyond those of `total` are replaced by a uniform
+    remainder. Every point is then uniformly distributed, and the
+    correlations between dimensions of plain Halton sequences are broken up.
+    """
+    rng = np.random.default_rng(seed)
+    index = np.arange(start, start + n)
+    points = np.empty((n, dimensions))
+    for j, base in enumerate(_primes(dimensions).tolist()):
+        digits = 1
+        while base ** digits < total:
+            digits += 1
+        slope = rng.integers(1, base, size=digits)
+        shift = rng.integers(0, base, size=digits)
+        remainder = rng.random()
+
+        u = np.zeros(n)
+        k = index.copy()
+        scale = 1.0 / base
+        for d in range(digits):
+            u += ((slope[d] * (k % base) + shift[d]) % base) * scale
+            k //= base
+            scale /= base
+        points[:, j] = u + remainder * scale * base
+    return points
+
+
+def sobol(start: int, n: int, dimensions: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Points `start` to `start + n` of a scrambled (Owen) Sobol sequence,
+    shape (n, dimensions), from `scipy.stats.qmc`. Balanced when the total
+    number of points is a power of two.
+
+    Raises:
+        ValueError: If SciPy is not installed.
+    """
+    if not HAS_SCIPY:
+        raise ValueError(SCIPY_MISSING)
+    from scipy.stats import qmc
+
+    engine = qmc.Sobol(dimensions, scramble=True, seed=np.random.default_rng(seed))
+    engine.fast_forward(start)
+    return np.clip(engine.random(n), 1e-16, 1 - 1e-16)
+
+
+def check_sampler(sampler: str) -> None:
+    """
+    Raises:
+        ValueError: If `sampler` is unknown, or is `sobol` without SciPy.
+    """
+    if sampler == "sobol" and not HAS_SCIPY:
+        raise ValueError(SCIPY_MISSING)
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler '{sampler}', expected one of {SAMPLERS}")
+
+
+def path_normals(
+    sampler: str,
+    seeds: Sequence[np.random.SeedSequence],
+    start: int,
+    total: int,
+    steps: int,
+    scramble: np.random.SeedSequence,
+) -> np.ndarray:
+    """
+    Standard normal shocks for paths `start` to `start + len(seeds)` of
+    `total`.
+
+    Args:
+        sampler (str): One of `SAMPLERS`.
+        seeds: Child streams of these paths.
+        start (int): Index of the first path; even for `antithetic`.
+        total (int): Number of paths of the whole run.
+        steps (int): Periods per path.
+        scramble (SeedSequence): Seed of the quasi-random scrambling, the
+            same for all blocks of a run.
+
+    Returns:
+        np.ndarray: Draws of shape (steps, 2, len(seeds)).
+    """
+    check_sampler(sampler)
+    n = len(seeds)
+    z = np.empty((steps, 2, n))
+
+    if sampler in ("halton", "sobol"):
+        quasi = min(steps, QMC_DIMENSIONS // 2)
+        if sampler == "halton":
+            u = halton(start, n, 2 * quasi, scramble, total)
+        else:
+            u = sobol(start, n, 2 * quasi, scramble)
+        z[:quasi] = norm_ppf(u).reshape(n, quasi, 2).transpose(1, 2, 0)
+        for i, seed in enumerate(seeds):
+            z[quasi:, :, i] = np.random.default_rng(seed).standard_normal((steps - quasi, 2))
+        return z
+
+    if sampler == "antithetic" and start % 2:
+        raise ValueError("Antithetic blocks must start at an even path")
+    for i, seed in enumerate(seeds):
+        if sampler == "antithetic" and (start + i) % 2:
+            z[:, :, i] = -z[:, :, i - 1]
+        else:
+            z[:, :, i] = np.random.default_rng(seed).standard_normal((steps, 2))
+    return z
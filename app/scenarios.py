@@ -0,0 +1,133 @@
+# app/scenarios.py
+
+"""
+Scenario trees.
+
+A run can be forked at any period into branches, each with its own engine and
+edits, to compare "what if" paths side by side. Branches share the history up
+to their fork with their parent (see `ForkedHistory`), so memory grows only
+with the periods in which they differ.
+
+Forking at the latest period copies the engine including its random stream,
+so sibling branches see the same shocks and differ only by their edits.
+Forking at an earlier period restarts from the recorded state of that period
+with a fresh random stream, as the stream of the past is not kept.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from .engine import Engine
+from .results import CorrelationMatrix, MomentsTable, SimulationResults
+
+ROOT_NAME = "main"
+
+
+@dataclass
+class Branch:
+    """One path of the scenario tree; `fork` periods are shared with `parent`."""
+
+    name: str
+    engine: Engine
+    results: SimulationResults
+    parent: "Branch | None" = None
+    fork: int = 0
+
+    @property
+    def label(self) -> str:
+        if self.parent is None:
+            return self.name
+        return f"{self.name} ({self.parent.name} @ {self.fork})"
+
+
+@dataclass(frozen=True)
+class BranchStatistics:
+    """Moments and correlations of a branch's whole path, for comparisons."""
+
+    name: str
+    label: str
+    n: int
+    moments: MomentsTable
+    correlations: CorrelationMatrix
+
+
+class ScenarioTree:
+    """
+    Branches of a run, one of which is current.
+
+    Args:
+        engine (Engine): Engine of the root branch.
+        results (SimulationResults): Results of the root branch.
+        name (str): Name of the root branch.
+    """
+
+    def __init__(self, engine: Engine, results: SimulationResults, name: str = ROOT_NAME) -> None:
+        self.branches: Dict[str, Branch] = {name: Branch(name, engine, results)}
+        self.current = self.branches[name]
+        self._forks = 0
+
+    def __len__(self) -> int:
+        return len(self.branches)
+
+    def __getitem__(self, name: str) -> Branch:
+        return self.branches[name]
+
+    def fork(self, at: int | None = None, name: str | None = None) -> Branch:
+        """
+        Branch off the current branch at period `at` (default: its latest
+        period) and make the new branch current.
+
+        Raises:
+            ValueError: If `at` is outside the current path, is 0 on a path
+                that has already run (the initial state is not kept), or the
+                name is taken.
+        """
+        parent = self.current
+        n = parent.results.n
+        at = n if at is None else at
+        if not 0 <= at <= n:
+            raise ValueError(f"Cannot fork at period {at}, the path has {n} periods")
+        if at == 0 < n:
+            raise ValueError("Cannot fork at period 0 of a path that has run; use Clear to start over")
+        if name is None:
+            self._forks += 1
+            name = f"b{self._forks}"
+            while name in self.branches:
+                self._forks += 1
+                name = f"b{self._forks}"
+        if name in self.branches:
+            raise ValueError(f"A branch named '{name}' already exists")
+
+        if at == n:
+            engine = parent.engine.copy()
+        else:
+            # Recorded variables of period `at`; the rest (money supply M) as now
+            state = parent.engine.state_dict()
+            state.update(parent.results.history.row(at - 1))
+            engine = Engine(state, parent.engine.params, parent.engine.shocks)
+            engine.steps = at
+
+        branch = Branch(name, engine, parent.results.fork(at), parent, at)
+        self.branches[name] = branch
+        self.current = branch
+        return branch
+
+    def switch(self, name: str) -> Branch:
+        """Make the branch `name` current."""
+        if name not in self.branches:
+            raise KeyError(f"No branch named '{name}'")
+        self.current = self.branches[name]
+        return self.current
+
+    def next_branch(self) -> Branch:
+        """Make the branch after the current one (in creation order) current."""
+        names = list(self.branches)
+        return self.switch(names[(names.index(self.current.name) + 1) % len(names)])
+
+    def compare(self, names: Sequence[str] | None = None) -> List[BranchStatistics]:
+        """Moments and correlations of the given branches (default: all)."""
+        branches = [self.branches[name] for name in names] if names is not None else self.branches.values()
+        return [
+            BranchStatistics(b.name, b.label, b.results.n, b.results.moments(), b.results.correlations())
+            for b in branches
+        ]
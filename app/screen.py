@@ -1,22 +1,65 @@
 # app/screen.py
 
+import os
+
+from textual import work
 from textual.app import ComposeResult, Screen
 from textual.containers import Horizontal, Vertical
 from textual.widgets import Header, Footer, Static
 
+from app.bootstrap import DEFAULT_REPLICATES, bootstrap
+from app.config_loader import ConfigWatcher, SimConfig, get_config, get_config_or_default
+from app.instrument import INSTRUMENT
+from app.results import CorrelationMatrix, MomentsTable, SimulationResults
+from app.timeseries import analyze
+from app.ui.bootstrap_widget import BootstrapWidget
+from app.ui.chart_widget import ChartWidget
+from app.ui.diagnostics_widget import DiagnosticsWidget
 from app.ui.iteration_widget import IterationControls
 from app.ui.moments_widget import MomentsWidget
 from app.ui.correlations_widget import CorrelationsWidget
 from app.ui.form_widget import FormWidget
+from app.ui.timeseries_widget import TimeSeriesWidget
+from app.utils.exporter import resolve_export_path
+
+DIAGNOSTICS_INTERVAL = 1.0  # Seconds between diagnostics panel updates
+TIMESERIES_INTERVAL = 2.0  # Seconds between checks for new periods to analyse
+BOOTSTRAP_INTERVAL = 5.0   # Seconds between checks for new periods to resample
 
 
 class SimScreen(Screen):
     """Main simulation screen layout."""
 
+    BINDINGS = [
+        ("d", "toggle_diagnostics", "Diagnostics"),
+        ("x", "export_profile", "Export profile"),
+        ("c", "save_checkpoint", "Checkpoint"),
+        ("r", "resume_checkpoint", "Resume"),
+        ("f", "fork_scenario", "Fork"),
+        ("n", "next_scenario", "Next branch"),
+        ("s", "show_scenarios", "Scenarios"),
+        ("w", "cycle_window", "Rolling window"),
+        ("t", "toggle_timeseries", "Time series"),
+        ("b", "toggle_bootstrap", "Bootstrap CI"),
+        ("g", "toggle_chart", "Chart"),
+        ("plus", "zoom_chart(0.5)", "Zoom in"),
+        ("minus", "zoom_chart(2)", "Zoom out"),
+        ("left_square_bracket", "pan_chart(-0.5)", "Pan left"),
+        ("right_square_bracket", "pan_chart(0.5)", "Pan right"),
+    ]
+
     def compose(self) -> ComposeResult:
         self.moments_widget = MomentsWidget(id="moments-table")
         self.corr_widget = CorrelationsWidget(id="correlations-table")
         self.form_widget = FormWidget(id="form-section")
+        self.controls = IterationControls(id="sim-controls")
+        self.diagnostics_widget = DiagnosticsWidget(id="diagnostics-table")
+        self.rolling_moments_widget = MomentsWidget(id="rolling-moments-table")
+        self.rolling_corr_widget = CorrelationsWidget(id="rolling-correlations-table")
+        self.timeseries_widget = TimeSeriesWidget(id="timeseries-table")
+        self.bootstrap_widget = BootstrapWidget(id="bootstrap-table")
+        config = get_config_or_default()
+        self.chart_widget = ChartWidget(config.chart_keys, config.chart_height, id="chart")
 
         yield Header()
         yield Horizontal(
@@ -27,12 +70,17 @@ class SimScreen(Screen):
                 ),
                 Vertical(
                     # Static("Simulation", id="sim-label", classes="title-label"),
-                    IterationControls(id="sim-controls"),
+                    self.controls,
                     id="button-container"
                 ),
                 id="left-pane"
             ),
             Vertical(  # RIGHT PANE
+                Vertical(
+                    Static("Chart", id="chart-label", classes="title-label"),
+                    self.chart_widget,
+                    id="chart-container"
+                ),
                 Vertical(
                     Static("Theoretical Moments", id="moments-label", classes="title-label"),
                     self.moments_widget,
@@ -43,6 +91,27 @@ class SimScreen(Screen):
                     self.corr_widget,
                     id="correlations-container"
                 ),
+                Vertical(
+                    Static("Bootstrap Confidence Intervals", id="bootstrap-label", classes="title-label"),
+                    self.bootstrap_widget,
+                    id="bootstrap-container"
+                ),
+                Vertical(
+                    Static("Rolling Window", id="rolling-label", classes="title-label"),
+                    self.rolling_moments_widget,
+                    self.rolling_corr_widget,
+                    id="rolling-container"
+                ),
+                Vertical(
+                    Static("Time-Series Statistics", id="timeseries-label", classes="title-label"),
+                    self.timeseries_widget,
+                    id="timeseries-container"
+                ),
+                Vertical(
+                    Static("Diagnostics", id="diagnostics-label", classes="title-label"),
+                    self.diagnostics_widget,
+                    id="diagnostics-container"
+                ),
                 id="analysis-row"
             )
         )
@@ -52,8 +121,169 @@ class SimScreen(Screen):
         self.app.moments_widget = self.moments_widget
         self.app.corr_widget = self.corr_widget
         self.app.form_widget = self.form_widget
+        self.app.rolling_moments_widget = self.rolling_moments_widget
+        self.app.rolling_corr_widget = self.rolling_corr_widget
+        self.app.chart_widget = self.chart_widget
         self.form_widget.repopulate()
 
+        try:
+            get_config()
+        except (FileNotFoundError, ValueError) as e:
+            self.notify(f"Using the default settings; config not loaded: {e}", severity="error")
+        config = get_config_or_default()
+        self.apply_instrument_config(config)
+        self.query_one("#diagnostics-container").display = False
+        self.query_one("#rolling-container").display = False
+        self.query_one("#timeseries-container").display = False
+        self.query_one("#bootstrap-container").display = False
+        self.query_one("#chart-container").display = False
+        self.timeseries_shown: tuple | None = None  # (results, periods) last analysed
+        self.timeseries_timer = self.set_interval(TIMESERIES_INTERVAL, self.refresh_timeseries, pause=True)
+        self.bootstrap_shown: tuple | None = None  # (results, periods) last resampled
+        self.bootstrap_timer = self.set_interval(BOOTSTRAP_INTERVAL, self.refresh_bootstrap, pause=True)
+        self.diagnostics_timer = self.set_interval(DIAGNOSTICS_INTERVAL, self.refresh_diagnostics, pause=True)
+        if config.watch:
+            self.config_watcher = ConfigWatcher()
+            self.set_interval(config.watch_interval, self.check_config)
+
+    def check_config(self) -> None:
+        """Push a changed config.toml into the running simulation."""
+        try:
+            config = self.config_watcher.poll()
+            if config is None:
+                return
+            self.controls.apply_config(config)
+            self.apply_instrument_config(config)
+        except Exception as e:
+            self.notify(f"Config not reloaded: {e}", severity="error")
+            return
+        self.app.log("[SimScreen] Config reloaded.")
+        self.notify("Config reloaded.")
+
+    def apply_instrument_config(self, config: SimConfig) -> None:
+        INSTRUMENT.configure(enabled=config.instrument, level=config.log_level)
+
+    def refresh_diagnostics(self) -> None:
+        self.diagnostics_widget.show(INSTRUMENT)
+
+    def action_toggle_diagnostics(self) -> None:
+        container = self.query_one("#diagnostics-container")
+        container.display = not container.display
+        if container.display:
+            self.refresh_diagnostics()
+            self.diagnostics_timer.resume()
+        else:
+            self.diagnostics_timer.pause()
+
+    def action_save_checkpoint(self) -> None:
+        self.controls.save_checkpoint()
+
+    def action_resume_checkpoint(self) -> None:
+        self.controls.resume_checkpoint()
+
+    def action_fork_scenario(self) -> None:
+        self.controls.fork_scenario()
+
+    def action_next_scenario(self) -> None:
+        self.controls.switch_scenario()
+
+    def action_show_scenarios(self) -> None:
+        self.controls.show_scenarios()
+
+    def action_cycle_window(self) -> None:
+        """Show the next rolling window next to the full-sample statistics, then none."""
+        sizes = [None, *self.controls.results.windows]
+        if len(sizes) == 1:
+            self.notify("No rolling windows configured ([statistics] windows).", severity="warning")
+            return
+        window = sizes[(sizes.index(self.controls.window) + 1) % len(sizes)]
+        self.controls.window = window
+        container = self.query_one("#rolling-container")
+        container.display = window is not None
+        if window is not None:
+            self.query_one("#rolling-label", Static).update(f"Rolling Window: last {window} periods")
+            self.controls.show_window()
+
+    def action_toggle_timeseries(self) -> None:
+        container = self.query_one("#timeseries-container")
+        container.display = not container.display
+        if container.display:
+            self.refresh_timeseries()
+            self.timeseries_timer.resume()
+        else:
+            self.timeseries_timer.pause()
+
+    def refresh_timeseries(self) -> None:
+        """Re-analyse the history if periods were added (or the run changed) since the last time."""
+        results = self.controls.results
+        if self.timeseries_shown == (results, results.n):
+            return
+        self.timeseries_shown = (results, results.n)
+        self.compute_timeseries(results)
+
+    @work(thread=True, exclusive=True, group="timeseries")
+    def compute_timeseries(self, results: SimulationResults) -> None:
+        """Analyse the history off the event loop; FFTs over long histories take a while."""
+        config = get_config_or_default()
+        ts = analyze(results.history, config.timeseries_max_lag, config.timeseries_pairs, config.timeseries_segment)
+        self.app.call_from_thread(self.timeseries_widget.show, ts)
+
+    def action_toggle_bootstrap(self) -> None:
+        container = self.query_one("#bootstrap-container")
+        container.display = not container.display
+        if container.display:
+            self.refresh_bootstrap()
+            self.bootstrap_timer.resume()
+        else:
+            self.bootstrap_timer.pause()
+
+    def refresh_bootstrap(self) -> None:
+        """Resample the history if periods were added (or the run changed) since the last time."""
+        results = self.controls.results
+        if self.bootstrap_shown == (results, results.n):
+            return
+        self.bootstrap_shown = (results, results.n)
+        if results.n < 2:
+            self.bootstrap_widget.update("*Needs at least two periods.*")
+            return
+        self.compute_bootstrap(results, results.moments(), results.correlations())
+
+    @work(thread=True, exclusive=True, group="bootstrap")
+    def compute_bootstrap(
+        self, results: SimulationResults, moments: MomentsTable, correlations: CorrelationMatrix
+    ) -> None:
+        """Resample off the event loop, across a process pool; long histories take seconds."""
+        config = get_config_or_default()
+        intervals = bootstrap(
+            results.history, config.bootstrap_replicates or DEFAULT_REPLICATES, config.bootstrap_block,
+            config.bootstrap_level, config.bootstrap_seed, workers=os.cpu_count() or 1,
+        )
+        self.controls.intervals = (results, intervals)  # Exported with the run while still current
+        self.app.call_from_thread(self.bootstrap_widget.show, intervals, moments, correlations)
+
+    def action_toggle_chart(self) -> None:
+        container = self.query_one("#chart-container")
+        container.display = not container.display
+        if container.display:
+            self.chart_widget.active = True
+            self.chart_widget.show(self.controls.results.history)
+        else:
+            self.chart_widget.deactivate()
+
+    def action_zoom_chart(self, factor: float) -> None:
+        self.chart_widget.zoom(factor)
+
+    def action_pan_chart(self, fraction: float) -> None:
+        self.chart_widget.pan(fraction)
+
+    def action_export_profile(self) -> None:
+        """Save the current stage timings and counters as a JSON profile."""
+        path = resolve_export_path(get_config_or_default().export_path, ".json", prefix="hume_profile")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        INSTRUMENT.export(path)
+        self.app.log(f"[SimScreen] Profile saved → {path}")
+        self.notify(f"Profile saved to: {path}")
+
 
 
 # EQUATION_MARKDOWN = """
@@ -0,0 +1,585 @@
+# app/server.py
+
+"""
+Local simulation server.
+
+Exposes the engine to other programs as JSON over HTTP/1.1, on a TCP port
+(localhost by default) or a Unix socket, using only asyncio:
+
+    GET  /health     model version and output keys
+    POST /run        one path; summary statistics, optionally all rows
+    POST /ensemble   Monte Carlo ensemble
+    POST /sweep      an ensemble per point of a parameter grid
+    POST /irf        impulse responses
+
+Request bodies are JSON objects. `state`, `params` and `shocks` override
+the config defaults by name; see the handlers for the other fields.
+
+Concurrent /run requests with the same number of steps are collected for a
+few milliseconds and simulated together as one vectorized batch, one path
+per request. The batched computation gives a path the same result whatever
+else is in its batch, so a seeded request is reproducible; it can differ
+from `Engine.run` with the same seed in the last digits.
+
+Responses to seeded requests (and to deterministic impulse responses) are
+cached by a hash of their resolved inputs, and identical requests arriving
+while one is computed wait for it instead of computing again.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Tuple
+import numpy as np
+
+from .config_loader import SimConfig
+from .engine import (
+    MODEL_VERSION, OUTPUT_KEYS, PARAMETER_KEYS, SHOCK_KEYS, VARIABLE_KEYS, draw_shocks, simulate,
+)
+from .instrument import INSTRUMENT
+from .results import CorrelationMatrix, MomentsTable
+from .sampling import check_sampler
+from .stats import Comoments, Moments
+
+MAX_BODY = 1 << 20  # Largest accepted request body in bytes
+
+
+class RequestError(ValueError):
+    """A request that cannot be served; `status` is its HTTP status."""
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _jsonable(value: Any) -> Any:
+    """Plain JSON types, with NaN and infinities (diverged paths) as null."""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def encode(payload: Mapping[str, Any]) -> bytes:
+    return json.dumps(_jsonable(payload), allow_nan=False).encode()
+
+
+def _int(body: Mapping[str, Any], name: str, default: int | None = None, minimum: int = 1) -> int:
+    value = body.get(name, default)
+    if value is None:
+        raise RequestError(f"'{name}' is required")
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise RequestError(f"'{name}' must be an integer >= {minimum}, got {value!r}")
+    return value
+
+
+def _seed(body: Mapping[str, Any]) -> int | None:
+    seed = body.get("seed")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+        raise RequestError(f"'seed' must be a non-negative integer, got {seed!r}")
+    return seed
+
+
+def _overrides(body: Mapping[str, Any], name: str, defaults: Mapping[str, float], keys: List[str]) -> Dict[str, float]:
+    values = {key: float(defaults[key]) for key in keys}
+    given = body.get(name, {})
+    if not isinstance(given, dict):
+        raise RequestError(f"'{name}' must be an object of numbers")
+    for key, value in given.items():
+        if key not in values:
+            raise RequestError(f"Unknown key '{key}' in '{name}', expected one of {keys}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise RequestError(f"'{name}.{key}' must be a number, got {value!r}")
+        values[key] = float(value)
+    return values
+
+
+def _sampler(body: Mapping[str, Any], default: str) -> str:
+    sampler = body.get("sampler", default)
+    try:
+        check_sampler(sampler)
+    except (TypeError, ValueError) as e:
+        raise RequestError(str(e))
+    return sampler
+
+
+def request_key(endpoint: str, inputs: Mapping[str, Any]) -> str:
+    """Cache key of a request: a hash of its endpoint, resolved inputs and the model version."""
+    payload = {"endpoint": endpoint, "model": MODEL_VERSION, **inputs}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Least-recently-used cache of encoded responses, with in-flight requests
+    shared: a request for a key being computed waits for that computation.
+
+    Args:
+        size (int): Number of responses kept; 0 disables the cache (in-flight
+            requests are still shared).
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._done: "OrderedDict[str, bytes]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    async def get(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> Tuple[bytes, bool]:
+        """The response for `key`, computing it if needed; also whether it was reused."""
+        if key in self._done:
+            self._done.move_to_end(key)
+            self.hits += 1
+            return self._done[key], True
+        if key in self._pending:
+            self.hits += 1
+            return await asyncio.shield(self._pending[key]), True
+
+        self.misses += 1
+        task = asyncio.ensure_future(compute())
+        self._pending[key] = task
+        try:
+            response = await asyncio.shield(task)
+        finally:
+            self._pending.pop(key, None)
+        if self.size:
+            self._done[key] = response
+            while len(self._done) > self.size:
+                self._done.popitem(last=False)
+        return response, False
+
+
+@dataclass(frozen=True)
+class RunRequest:
+    """Inputs of one /run path."""
+
+    state: Dict[str, float]
+    params: Dict[str, float]
+    shocks: Dict[str, float]
+    steps: int
+    seed: int | None
+    rows: bool = False
+
+
+def simulate_batch(requests: List[RunRequest]) -> List[Dict[str, Any]]:
+    """
+    Simulate one path per request, all with the same number of steps, as a
+    single vectorized batch, and summarise each path.
+    """
+    steps, k = requests[0].steps, len(OUTPUT_KEYS)
+    A = np.empty((steps, len(requests)))
+    D = np.empty((steps, len(requests)))
+    with INSTRUMENT.time("sampling"):
+        for i, request in enumerate(requests):
+            A[:, i], D[:, i] = draw_shocks(np.random.default_rng(request.seed), request.shocks, steps)
+
+    state = {key: np.array([r.state[key] for r in requests]) for key in VARIABLE_KEYS}
+    params = {key: np.array([r.params[key] for r in requests]) for key in PARAMETER_KEYS}
+    out = np.empty((steps, k, len(requests)))
+    with INSTRUMENT.time("equations"), np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        simulate(state, params, A, D, out)
+    INSTRUMENT.count("steps", steps * len(requests))
+
+    with INSTRUMENT.time("statistics"):
+        summaries = []
+        for i, request in enumerate(requests):
+            rows = np.ascontiguousarray(out[:, :, i])
+            summary = {
+                "keys": OUTPUT_KEYS,
+                "steps": steps,
+                "seed": request.seed,
+                "last": dict(zip(OUTPUT_KEYS, rows[-1].tolist())),
+                "moments": MomentsTable.from_moments(OUTPUT_KEYS, Moments.from_array(rows)).rows(),
+                "correlations": CorrelationMatrix.from_comoments(OUTPUT_KEYS, Comoments.from_array(rows)).as_dict(),
+            }
+            if request.rows:
+                summary["rows"] = rows
+            summaries.append(summary)
+    return summaries
+
+
+class RunBatcher:
+    """
+    Collects /run requests for `window` seconds, or until `max_batch` are
+    waiting, and simulates those with the same number of steps together in
+    a worker thread.
+    """
+
+    def __init__(self, window: float, max_batch: int, log: Callable[[str], None] | None = None) -> None:
+        self.window = window
+        self.max_batch = max_batch
+        self.log = log
+        self._groups: Dict[int, List[Tuple[RunRequest, asyncio.Future]]] = {}
+        self.batches = 0
+
+    def submit(self, request: RunRequest) -> "asyncio.Future[Dict[str, Any]]":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = self._groups.setdefault(request.steps, [])
+        group.append((request, future))
+        if len(group) == 1:
+            loop.call_later(self.window, self._flush, request.steps, group)
+        if len(group) >= self.max_batch:
+            self._flush(request.steps, group)
+        return future
+
+    def _flush(self, steps: int, group: List[Tuple[RunRequest, asyncio.Future]]) -> None:
+        if self._groups.get(steps) is not group:
+            return  # Already flushed when it filled up
+        del self._groups[steps]
+        self.batches += 1
+        INSTRUMENT.count("server batches")
+        if self.log is not None and INSTRUMENT.verbose:
+            self.log(f"[Server] Simulating {len(group)} paths of {steps} steps as one batch")
+
+        task = asyncio.get_running_loop().run_in_executor(None, simulate_batch, [r for r, _ in group])
+
+        def done(task: asyncio.Future) -> None:
+            for i, (_, future) in enumerate(group):
+                if future.done():
+                    continue
+                if task.exception() is not None:
+                    future.set_exception(task.exception())
+                else:
+                    future.set_result(task.result()[i])
+
+        task.add_done_callback(done)
+
+
+class SimServer:
+    """
+    The JSON endpoints over the engine, independent of the transport:
+    `dispatch()` serves one request, `start()` listens for HTTP.
+
+    Args:
+        config (SimConfig): Defaults for the model inputs, and the server
+            settings ([server] batch-window, max-batch, cache-size,
+            max-steps).
+        workers (int): Worker processes for ensembles and sweeps.
+        log (Callable[[str], None] | None): Receives failures and, at log
+            level "debug", every batch.
+    """
+
+    def __init__(self, config: SimConfig, workers: int = 1, log: Callable[[str], None] | None = None) -> None:
+        self.config = config
+        self.workers = workers
+        self.log = log
+        self.cache = ResponseCache(config.server_cache_size)
+        self.batcher = RunBatcher(config.server_batch_window, config.server_max_batch, log)
+        self.routes: Dict[str, Callable[[Mapping[str, Any]], Awaitable[Tuple[bytes, bool]]]] = {
+            "/run": self.run,
+            "/ensemble": self.ensemble,
+            "/sweep": self.sweep,
+            "/irf": self.irf,
+        }
+        self.server: asyncio.AbstractServer | None = None
+        self.socket: Path | None = None
+
+    # Endpoints
+
+    def _inputs(self, body: Mapping[str, Any]) -> Dict[str, Any]:
+        state = _overrides(body, "state", self.config.defaults, VARIABLE_KEYS)
+        params = _overrides(body, "params", self.config.parameters, PARAMETER_KEYS)
+        shocks = _overrides(body, "shocks", self.config.shocks, SHOCK_KEYS)
+        if body.get("steady"):
+            from .steady_state import solve
+
+            state = solve(state, params, shocks).state
+        return {"state": state, "params": params, "shocks": shocks}
+
+    def _steps(self, body: Mapping[str, Any], name: str = "steps") -> int:
+        steps = _int(body, name)
+        if steps > self.config.server_max_steps:
+            raise RequestError(f"'{name}' may be at most {self.config.server_max_steps} ([server] max-steps)")
+        return steps
+
+    async def _cached(self, endpoint: str, inputs: Dict[str, Any], cacheable: bool, compute) -> Tuple[bytes, bool]:
+        if not cacheable:
+            return await compute(), False
+        return await self.cache.get(request_key(endpoint, inputs), compute)
+
+    async def _in_thread(self, func, *args) -> bytes:
+        result = await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        return encode(result)
+
+    async def run(self, body: Mapping[str, Any]) -> Tuple[bytes, bool]:
+        """One path: `steps`, optional `seed`, `steady` and `rows` (include every period)."""
+        inputs = {**self._inputs(body), "steps": self._steps(body), "seed": _seed(body), "rows": bool(body.get("rows"))}
+        request = RunRequest(**inputs)
+
+        async def compute() -> bytes:
+            return encode(await self.batcher.submit(request))
+
+        return await self._cached("run", inputs, request.seed is not None, compute)
+
+    async def ensemble(self, body: Mapping[str, Any]) -> Tuple[bytes, bool]:
+        """Monte Carlo ensemble: `steps`, `paths`, optional `seed`, `sampler`, `steady` and `per_period`."""
+        from .ensemble import run_ensemble
+
+        inputs = {
+            **self._inputs(body),
+            "steps": self._steps(body),
+            "paths": _int(body, "paths"),
+            "seed": _seed(body),
+            "sampler": _sampler(body, self.config.sampler),
+            "per_period": bool(body.get("per_period")),
+        }
+
+        def compute_ensemble() -> Dict[str, Any]:
+            result = run_ensemble(
+                inputs["state"], inputs["params"], inputs["shocks"], inputs["steps"], inputs["paths"],
+                seed=inputs["seed"], workers=self.workers, sampler=inputs["sampler"],
+            )
+            payload = {
+                "keys": result.keys,
+                "seed": result.seed,
+                "sampler": result.sampler,
+                "paths": result.paths,
+                "steps": result.steps,
+                "diverged": result.diverged,
+                "moments": result.moments.rows(),
+                "correlations": result.correlations.as_dict(),
+            }
+            if inputs["per_period"]:
+                payload["mean"], payload["std"] = result.mean, result.std
+            return payload
+
+        return await self._cached(
+            "ensemble", inputs, inputs["seed"] is not None, lambda: self._in_thread(compute_ensemble)
+        )
+
+    async def sweep(self, body: Mapping[str, Any]) -> Tuple[bytes, bool]:
+        """
+        Parameter sweep: `axes` ({key: [values] or "start:stop:num"}),
+        `steps`, `paths`, optional `seed` and `sampler`. Grid points also go through the
+        on-disk sweep cache.
+        """
+        from .sweep import SweepCache, parse_axis, run_sweep
+
+        axes = body.get("axes")
+        if not isinstance(axes, dict) or not axes:
+            raise RequestError("'axes' must be an object of {key: [values] or 'start:stop:num'}")
+        try:
+            axes = {key: parse_axis(v) if isinstance(v, str) else [float(x) for x in v] for key, v in axes.items()}
+        except (TypeError, ValueError) as e:
+            raise RequestError(f"Bad 'axes': {e}")
+        inputs = {
+            **self._inputs(body),
+            "axes": axes,
+            "steps": self._steps(body),
+            "paths": _int(body, "paths"),
+            "seed": _seed(body),
+            "sampler": _sampler(body, self.config.sampler),
+        }
+
+        def compute_sweep() -> Dict[str, Any]:
+            sweep = run_sweep(
+                inputs["state"], inputs["params"], inputs["shocks"], axes, inputs["steps"], inputs["paths"],
+                seed=inputs["seed"], workers=self.workers, cache=SweepCache(self.config.sweep_cache_dir),
+                sampler=inputs["sampler"],
+            )
+            return {
+                "axes": sweep.axes,
+                "seed": sweep.seed,
+                "sampler": sweep.sampler,
+                "steps": sweep.steps,
+                "paths": sweep.paths,
+                "cached": sweep.cached,
+                "moments": sweep.moment_rows(),
+                "correlations": sweep.correlation_rows(),
+            }
+
+        return await self._cached("sweep", inputs, inputs["seed"] is not None, lambda: self._in_thread(compute_sweep))
+
+    async def irf(self, body: Mapping[str, Any]) -> Tuple[bytes, bool]:
+        """
+        Impulse responses: `impulses` ([{"shock", "size", "period"}], default
+        +1 s.d. A and D), `horizon`, `paths`, optional `seed`, `sampler`,
+        `steady` and `deterministic`.
+        """
+        from .irf import DEFAULT_HORIZON, IRF_SHOCKS, Impulse, impulse_response
+
+        specs = body.get("impulses", [{"shock": shock} for shock in IRF_SHOCKS])
+        try:
+            impulses = [Impulse(**spec) for spec in specs]
+        except (TypeError, ValueError) as e:
+            raise RequestError(f"Bad 'impulses': {e}")
+        inputs = {
+            **self._inputs(body),
+            "impulses": [[i.shock, float(i.size), int(i.period)] for i in impulses],
+            "horizon": self._steps(body, "horizon") if "horizon" in body else DEFAULT_HORIZON,
+            "paths": _int(body, "paths", 1),
+            "seed": _seed(body),
+            "sampler": _sampler(body, self.config.sampler),
+            "deterministic": bool(body.get("deterministic")),
+        }
+
+        def compute_irf() -> Dict[str, Any]:
+            result = impulse_response(
+                inputs["state"], inputs["params"], inputs["shocks"], impulses, inputs["horizon"],
+                inputs["paths"], inputs["seed"], inputs["deterministic"], inputs["sampler"],
+            )
+            return {
+                "keys": result.keys,
+                "horizon": result.horizon,
+                "paths": result.paths,
+                "baseline": dict(zip(result.keys, result.baseline.T.tolist())),
+                "responses": result.as_dict(),
+            }
+
+        cacheable = inputs["seed"] is not None or inputs["deterministic"]
+        return await self._cached("irf", inputs, cacheable, lambda: self._in_thread(compute_irf))
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, bytes, bool]:
+        """
+        Serve one request.
+
+        Returns:
+            tuple[int, bytes, bool]: HTTP status, JSON body, and whether the
+            response was reused from the cache or a concurrent request.
+        """
+        INSTRUMENT.count("server requests")
+        try:
+            if path == "/health":
+                if method != "GET":
+                    raise RequestError("Use GET for /health", 405)
+                return 200, encode({"status": "ok", "model": MODEL_VERSION, "keys": OUTPUT_KEYS}), False
+            if path not in self.routes:
+                raise RequestError(f"No endpoint '{path}', expected /health or one of {list(self.routes)}", 404)
+            if method != "POST":
+                raise RequestError(f"Use POST for {path}", 405)
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError as e:
+                raise RequestError(f"Body is not valid JSON: {e}")
+            if not isinstance(request, dict):
+                raise RequestError("Body must be a JSON object")
+            response, reused = await self.routes[path](request)
+            return 200, response, reused
+        except RequestError as e:
+            return e.status, encode({"error": str(e)}), False
+        except ValueError as e:  # Rejected by the model code, e.g. an impulse outside the horizon
+            return 400, encode({"error": str(e)}), False
+        except Exception as e:
+            if self.log is not None:
+                self.log(f"[Server] {method} {path} failed: {e!r}")
+            return 500, encode({"error": f"{type(e).__name__}: {e}"}), False
+
+    # HTTP
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection until the client closes it."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, encode({"error": "Malformed request line"}), False, False)
+                    break
+
+                headers = {}
+                while (header := await reader.readline()).strip():
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, encode({"error": f"Body over {MAX_BODY} bytes"}), False, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, response, reused = await self.dispatch(method, target.split("?", 1)[0], body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, response, reused, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes, reused: bool, keep_alive: bool) -> None:
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                   413: "Payload Too Large", 500: "Internal Server Error"}
+        head = (
+            f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"X-Cache: {'hit' if reused else 'miss'}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, socket: str | Path | None = None) -> str:
+        """
+        Start listening on `host:port` (port 0 picks a free one) or on the
+        Unix socket `socket`.
+
+        Returns:
+            str: The address served, e.g. "http://127.0.0.1:8765".
+        """
+        if socket is not None:
+            self.socket = Path(socket)
+            if self.socket.is_socket():
+                self.socket.unlink()  # Left over from a server that did not shut down
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=str(self.socket))
+            return f"unix:{self.socket}"
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.socket is not None:
+            self.socket.unlink(missing_ok=True)
+            self.socket = None
+
+
+def serve(
+    config: SimConfig,
+    host: str | None = None,
+    port: int | None = None,
+    socket: str | Path | None = None,
+    workers: int = 1,
+    log: Callable[[str], None] | None = None,
+) -> None:
+    """Run a `SimServer` until interrupted, announcing its address to `log`."""
+
+    async def main() -> None:
+        server = SimServer(config, workers, log)
+        address = await server.start(
+            host or config.server_host, config.server_port if port is None else port, socket
+        )
+        if log is not None:
+            log(f"Serving on {address} (Ctrl+C to stop)")
+        try:
+            await server.server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,382 @@
+# app/stats.py
+
+"""
+Streaming statistics over simulation output.
+
+Accumulators take one observation (or a block of observations) at a time in
+constant time per value and can be merged, so partial results from chunks or
+worker processes combine into exactly the statistics of the whole sample.
+Merges can also be undone, which `RollingWindow` uses to keep statistics of
+only the latest observations.
+"""
+
+import numpy as np
+
+
+class Moments:
+    """
+    Running central moments up to fourth order (Welford, merged after Chan et al.).
+
+    Each observation is an array of `shape` (e.g. one value per variable), and
+    every statistic is reported elementwise with that shape. Variances are
+    population variances, matching the moments table.
+    """
+
+    def __init__(self, shape: int | tuple = ()) -> None:
+        self.n = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.m3 = np.zeros(shape)
+        self.m4 = np.zeros(shape)
+
+    def push(self, x) -> None:
+        """Add a single observation."""
+        x = np.asarray(x, dtype=float)
+        n1 = self.n
+        self.n += 1
+        n = self.n
+
+        delta = x - self.mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * n1
+
+        self.mean += delta_n
+        self.m4 += term * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * self.m2 - 4 * delta_n * self.m3
+        self.m3 += term * delta_n * (n - 2) - 3 * delta_n * self.m2
+        self.m2 += term
+
+    def push_batch(self, block) -> None:
+        """Add a block of observations stacked along the first axis."""
+        block = np.asarray(block, dtype=float)
+        if len(block) == 0:
+            return
+        self.merge(Moments.from_array(block))
+
+    @classmethod
+    def from_array(cls, block) -> "Moments":
+        """Build an accumulator from a block of observations in one pass."""
+        block = np.asarray(block, dtype=float)
+        acc = cls(block.shape[1:])
+        if len(block) == 0:
+            return acc
+        acc.n = len(block)
+        acc.mean = block.mean(axis=0)
+        d = block - acc.mean
+        d2 = d * d
+        acc.m2 = d2.sum(axis=0)
+        acc.m3 = (d2 * d).sum(axis=0)
+        acc.m4 = (d2 * d2).sum(axis=0)
+        return acc
+
+    def merge(self, other: "Moments") -> None:
+        """Fold another accumulator's observations into this one."""
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n = other.n
+            self.mean = other.mean.copy()
+            self.m2 = other.m2.copy()
+            self.m3 = other.m3.copy()
+            self.m4 = other.m4.copy()
+            return
+
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        delta2 = delta * delta
+
+        m4 = (
+            self.m4 + other.m4
+            + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+            + 6 * delta2 * (na * na * other.m2 + nb * nb * self.m2) / n ** 2
+            + 4 * delta * (na * other.m3 - nb * self.m3) / n
+        )
+        m3 = (
+            self.m3 + other.m3
+            + delta2 * delta * na * nb * (na - nb) / n ** 2
+            + 3 * delta * (na * other.m2 - nb * self.m2) / n
+        )
+        m2 = self.m2 + other.m2 + delta2 * na * nb / n
+
+        self.n = n
+        self.mean = self.mean + delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+
+    def pop(self, x) -> None:
+        """Take out a single observation previously added, inverting `push`."""
+        if self.n <= 1:
+            self.reset()
+            return
+        x = np.asarray(x, dtype=float)
+        n = self.n
+        nb = n - 1
+        mean = self.mean - (x - self.mean) / nb
+        delta = x - mean
+        delta2 = delta * delta
+
+        m2 = np.maximum(self.m2 - delta2 * nb / n, 0.0)
+        m3 = self.m3 - delta2 * delta * nb * (nb - 1) / n ** 2 + 3 * delta * m2 / n
+        m4 = self.m4 - delta2 * delta2 * nb * (nb * nb - nb + 1) / n ** 3 - 6 * delta2 * m2 / n ** 2 + 4 * delta * m3 / n
+
+        self.n = nb
+        self.mean = mean
+        self.m2, self.m3, self.m4 = m2, m3, m4
+
+    def remove(self, other: "Moments") -> None:
+        """Take out observations previously merged in, inverting `merge`."""
+        if other.n == 0:
+            return
+        if other.n >= self.n:
+            self.reset()
+            return
+
+        n, nc = self.n, other.n
+        nb = n - nc
+        mean = self.mean - (other.mean - self.mean) * nc / nb
+        delta = other.mean - mean
+        delta2 = delta * delta
+
+        m2 = np.maximum(self.m2 - other.m2 - delta2 * nb * nc / n, 0.0)
+        m3 = (
+            self.m3 - other.m3
+            - delta2 * delta * nb * nc * (nb - nc) / n ** 2
+            - 3 * delta * (nb * other.m2 - nc * m2) / n
+        )
+        m4 = (
+            self.m4 - other.m4
+            - delta2 * delta2 * nb * nc * (nb * nb - nb * nc + nc * nc) / n ** 3
+            - 6 * delta2 * (nb * nb * other.m2 + nc * nc * m2) / n ** 2
+            - 4 * delta * (nb * other.m3 - nc * m3) / n
+        )
+
+        self.n = nb
+        self.mean = mean
+        self.m2, self.m3, self.m4 = m2, m3, m4
+
+    def reset(self) -> None:
+        self.__init__(self.mean.shape)
+
+    @property
+    def variance(self) -> np.ndarray:
+        return self.m2 / self.n if self.n else np.zeros_like(self.m2)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    @property
+    def skewness(self) -> np.ndarray:
+        """Sample skewness g1; 0.0 where the variance is zero."""
+        denom = self.m2 ** 1.5
+        return np.divide(np.sqrt(self.n) * self.m3, denom, out=np.zeros_like(denom), where=denom > 0)
+
+    @property
+    def kurtosis(self) -> np.ndarray:
+        """Excess kurtosis g2; 0.0 where the variance is zero."""
+        denom = self.m2 * self.m2
+        return np.divide(self.n * self.m4, denom, out=np.full_like(denom, 3.0), where=denom > 0) - 3.0
+
+
+class Comoments:
+    """
+    Running co-moment matrix of `k` variables for covariances and Pearson
+    correlations.
+
+    Each observation is a rank-1 update of the k x k matrix, and accumulators
+    from separate batches merge exactly, so the full correlation matrix is
+    available at any time in O(k^2).
+    """
+
+    def __init__(self, k: int) -> None:
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.c = np.zeros((k, k))
+
+    def push(self, x) -> None:
+        """Add a single observation of all `k` variables."""
+        x = np.asarray(x, dtype=float)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.c += np.outer(delta, x - self.mean)
+
+    def push_batch(self, block) -> None:
+        """Add a block of observations, one row per observation."""
+        block = np.asarray(block, dtype=float)
+        if len(block) == 0:
+            return
+        self.merge(Comoments.from_array(block))
+
+    @classmethod
+    def from_array(cls, block) -> "Comoments":
+        """Build an accumulator from an (n, k) block in one pass."""
+        block = np.asarray(block, dtype=float)
+        acc = cls(block.shape[1])
+        if len(block) == 0:
+            return acc
+        acc.n = len(block)
+        acc.mean = block.mean(axis=0)
+        d = block - acc.mean
+        acc.c = d.T @ d
+        return acc
+
+    def merge(self, other: "Comoments") -> None:
+        """Fold another accumulator's observations into this one."""
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n = other.n
+            self.mean = other.mean.copy()
+            self.c = other.c.copy()
+            return
+
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        self.c = self.c + other.c + np.outer(delta, delta) * na * nb / n
+        self.mean = self.mean + delta * nb / n
+        self.n = n
+
+    def pop(self, x) -> None:
+        """Take out a single observation previously added, inverting `push`."""
+        if self.n <= 1:
+            self.reset()
+            return
+        x = np.asarray(x, dtype=float)
+        nb = self.n - 1
+        mean = self.mean - (x - self.mean) / nb
+        delta = x - mean
+        self.c -= np.outer(delta, delta) * (nb / self.n)
+        self.mean = mean
+        self.n = nb
+
+    def remove(self, other: "Comoments") -> None:
+        """Take out observations previously merged in, inverting `merge`."""
+        if other.n == 0:
+            return
+        if other.n >= self.n:
+            self.reset()
+            return
+
+        n, nc = self.n, other.n
+        nb = n - nc
+        mean = self.mean - (other.mean - self.mean) * nc / nb
+        delta = other.mean - mean
+        self.c = self.c - other.c - np.outer(delta, delta) * nb * nc / n
+        self.mean = mean
+        self.n = nb
+
+    def reset(self) -> None:
+        self.__init__(len(self.mean))
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Population covariance matrix."""
+        return self.c / self.n if self.n else np.zeros_like(self.c)
+
+    def pearson(self) -> np.ndarray:
+        """Pearson correlation matrix; 0.0 where either std. dev. is zero."""
+        std = np.sqrt(np.diag(self.c))
+        denom = np.outer(std, std)
+        corr = np.divide(self.c, denom, out=np.zeros_like(self.c), where=denom > 0)
+        return np.clip(corr, -1.0, 1.0)
+
+
+class RollingWindow:
+    """
+    Moments and co-moments of the latest `size` observations of `k` variables.
+
+    Observations entering the window are merged in and those leaving it are
+    removed again, so an update costs the same whatever the window size. The
+    window is kept in a ring buffer, from which the accumulators are rebuilt
+    once every `size` removals to discard the rounding error that removals
+    accumulate; this keeps the amortized cost per observation constant.
+    Windows of up to `EXACT_WINDOW` observations are simply recomputed, which
+    costs no more than the updates and avoids their cancellation errors.
+    """
+
+    EXACT_WINDOW = 32
+
+    def __init__(self, k: int, size: int) -> None:
+        if size < 1:
+            raise ValueError(f"The window size must be positive, got {size}")
+        self.size = size
+        self._buf = np.empty((size, k))
+        self._start = 0  # Ring position of the oldest observation
+        self._removed = 0
+        self.moments = Moments(k)
+        self.comoments = Comoments(k)
+
+    @property
+    def n(self) -> int:
+        return self.moments.n
+
+    def push(self, x) -> None:
+        """Add a single observation of all `k` variables."""
+        self.push_batch(np.asarray(x, dtype=float).reshape(1, -1))
+
+    def push_batch(self, block) -> None:
+        """Add a block of observations, one row per observation, oldest first."""
+        block = np.asarray(block, dtype=float)
+        m = len(block)
+        if m == 0:
+            return
+        if m >= self.size:
+            self.rebuild(block[-self.size:])
+            return
+        if self.size <= self.EXACT_WINDOW:
+            self.rebuild(np.concatenate([self.window(), block]))
+            return
+
+        n = self.n
+        leaving = max(0, n + m - self.size)
+        if leaving == 1:
+            old = self._buf[self._start]
+            self.moments.pop(old)
+            self.comoments.pop(old)
+        elif leaving:
+            old = self._ring(self._start, leaving)
+            self.moments.remove(Moments.from_array(old))
+            self.comoments.remove(Comoments.from_array(old))
+        self._removed += leaving
+
+        # New rows go after the newest one, overwriting those that just left
+        end = (self._start + n) % self.size
+        first = min(m, self.size - end)
+        self._buf[end:end + first] = block[:first]
+        self._buf[:m - first] = block[first:]
+        self._start = (self._start + leaving) % self.size
+
+        if m == 1:
+            self.moments.push(block[0])
+            self.comoments.push(block[0])
+        else:
+            self.moments.merge(Moments.from_array(block))
+            self.comoments.merge(Comoments.from_array(block))
+
+        if self._removed >= self.size:
+            self.rebuild(self.window())
+
+    def _ring(self, start: int, count: int) -> np.ndarray:
+        """`count` observations from ring position `start` on, as one array."""
+        stop = start + count
+        if stop <= self.size:
+            return self._buf[start:stop]
+        return np.concatenate([self._buf[start:], self._buf[:stop - self.size]])
+
+    def window(self) -> np.ndarray:
+        """The observations in the window, oldest first (a copy)."""
+        return np.array(self._ring(self._start, self.n))
+
+    def rebuild(self, block) -> None:
+        """Replace the window with the last `size` rows of `block`, recomputing exactly."""
+        block = np.asarray(block, dtype=float)[-self.size:]
+        self._buf[:len(block)] = block
+        self._start = 0
+        self._removed = 0
+        self.moments = Moments.from_array(block)
+        self.comoments = Comoments.from_array(block)
+
+    def reset(self) -> None:
+        self.__init__(self._buf.shape[1], self.size)
@@ -0,0 +1,190 @@
+# app/steady_state.py
+
+"""
+Deterministic steady state of the Hume model.
+
+With the shocks fixed at their means, the model is a map x_t = F(x_{t-1}) on
+the lagged state variables it carries between periods. The steady state is
+its fixed point x* = F(x*). It is found with Newton's method on F(x) - x,
+started from the closed form where one is known. The same compiled step
+function as the simulation is used, so the solver always matches the
+`eq_*` relationships in the model spec.
+
+The eigenvalues of the Jacobian of F at x* describe the linearised dynamics:
+deviations from the steady state shrink by the spectral radius per period if
+it is below one.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping
+import math
+import numpy as np
+
+from .engine import OUTPUT_KEYS, VARIABLE_KEYS, simulate
+from .model import HUME_MODEL, LAG
+
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-12
+UNIT_TOLERANCE = 1e-6  # |eigenvalue| this close to 1 counts as a unit root
+
+# Lagged state variables the step depends on and that have an equation; the
+# others (e.g. M) are exogenous and stay at their initial values
+UNKNOWNS = [
+    key for key in VARIABLE_KEYS
+    if key in OUTPUT_KEYS and any(f"{key}{LAG}" in eq.inputs for eq in HUME_MODEL.equations)
+]
+_UNKNOWN_COLUMNS = [OUTPUT_KEYS.index(key) for key in UNKNOWNS]
+
+
+@dataclass
+class SteadyState:
+    """A fixed point of the deterministic model and its local dynamics."""
+
+    values: Dict[str, float]      # All outputs at the steady state
+    state: Dict[str, float]       # Full state vector for seeding an `Engine`
+    method: str                   # "closed form" or "newton"
+    iterations: int               # Newton iterations taken
+    residual: float               # max |F(x*) - x*|
+    unknowns: List[str]
+    jacobian: np.ndarray = field(repr=False)  # dF/dx at x*, over `unknowns`
+    eigenvalues: np.ndarray = field(default=None)
+
+    def __post_init__(self) -> None:
+        if self.eigenvalues is None:
+            self.eigenvalues = np.linalg.eigvals(self.jacobian)
+
+    @property
+    def spectral_radius(self) -> float:
+        """Factor by which deviations shrink per period (asymptotically)."""
+        return float(np.max(np.abs(self.eigenvalues)))
+
+    @property
+    def stable(self) -> bool:
+        """Whether deviations die out; unit roots (up to `UNIT_TOLERANCE`) do not."""
+        return self.spectral_radius < 1 - UNIT_TOLERANCE
+
+    @property
+    def half_life(self) -> float:
+        """Periods for a deviation to halve; inf if the steady state is not stable."""
+        rho = self.spectral_radius
+        if not self.stable:
+            return math.inf
+        if rho == 0:
+            return 0.0
+        return math.log(0.5) / math.log(rho)
+
+
+def _step(
+    base: Mapping[str, float],
+    params: Mapping[str, float],
+    A: float,
+    D: float,
+    x: np.ndarray,
+) -> np.ndarray:
+    """
+    F evaluated at the columns of x (len(UNKNOWNS), n) in one vectorized call.
+    Returns all outputs, shape (len(OUTPUT_KEYS), n).
+    """
+    n = x.shape[1]
+    state = {key: np.full(n, float(base[key])) for key in VARIABLE_KEYS}
+    state.update(zip(UNKNOWNS, x))
+    out = np.empty((1, len(OUTPUT_KEYS), n))
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        simulate(state, params, np.full((1, n), A), np.full((1, n), D), out)
+    return out[0]
+
+
+def _jacobian(base, params, A, D, x: np.ndarray) -> np.ndarray:
+    """Central-difference Jacobian of F at x, all perturbations in one call."""
+    k = len(x)
+    h = 1e-6 * np.maximum(np.abs(x), 1.0)
+    points = np.repeat(x[:, None], 2 * k, axis=1)
+    points[np.arange(k), np.arange(k)] += h
+    points[np.arange(k), np.arange(k, 2 * k)] -= h
+    f = _step(base, params, A, D, points)[_UNKNOWN_COLUMNS]
+    return (f[:, :k] - f[:, k:]) / (2 * h)
+
+
+def closed_form(
+    state: Mapping[str, float], params: Mapping[str, float], shocks: Mapping[str, float]
+) -> Dict[str, float] | None:
+    """
+    Closed-form steady state of the lagged variables, or None if the
+    parameters have none (non-positive D, A or delta, or alpha >= 1).
+
+        s* = D / (1 + D)                         from s = (1 - s) D
+        K* = (s* D A / delta)^(1 / (1 - alpha))  from delta K = s D A K^alpha
+        P* = M / (A K*^alpha)
+    """
+    A, D = shocks["A-mean"], shocks["D-mean"]
+    alpha, delta = params["alpha"], params["delta"]
+    if A <= 0 or D <= 0 or delta <= 0 or alpha >= 1:
+        return None
+    s = D / (1 + D)
+    K = (s * D * A / delta) ** (1 / (1 - alpha))
+    P = state["M"] / (A * K ** alpha)
+    return {"K": K, "K_last": K, "s": s, "P_last": P}
+
+
+def solve(
+    state: Mapping[str, float],
+    params: Mapping[str, float],
+    shocks: Mapping[str, float],
+    tol: float = TOLERANCE,
+    max_iter: int = MAX_ITERATIONS,
+) -> SteadyState:
+    """
+    Find the deterministic steady state with the shocks at their means.
+
+    Args:
+        state (Mapping): Starting point; also supplies the exogenous states (M).
+        params (Mapping): Model parameters.
+        shocks (Mapping): Shock settings; only the means are used.
+        tol (float): Convergence tolerance, relative to the size of x.
+        max_iter (int): Newton iteration limit.
+
+    Returns:
+        SteadyState: The fixed point, its Jacobian and eigenvalues.
+
+    Raises:
+        ValueError: If the iteration does not converge.
+    """
+    A, D = float(shocks["A-mean"]), float(shocks["D-mean"])
+    params = {key: float(value) for key, value in params.items()}
+    base = {key: float(state[key]) for key in VARIABLE_KEYS}
+
+    guess = dict(base)
+    known = closed_form(base, params, shocks)
+    if known is not None:
+        guess.update(known)
+    x = np.array([guess[key] for key in UNKNOWNS])
+
+    def residual(x: np.ndarray) -> np.ndarray:
+        return _step(base, params, A, D, x[:, None])[_UNKNOWN_COLUMNS, 0] - x
+
+    r = residual(x)
+    method = "closed form" if known is not None else "newton"
+    iterations = 0
+    while not np.max(np.abs(r)) <= tol * max(1.0, np.max(np.abs(x))):
+        if iterations >= max_iter or not np.isfinite(r).all():
+            raise ValueError(f"Steady state not found after {iterations} iterations (residual {np.max(np.abs(r)):.3g})")
+        jac = _jacobian(base, params, A, D, x) - np.eye(len(x))
+        dx = np.linalg.lstsq(jac, -r, rcond=None)[0]
+        x = x + dx
+        r = residual(x)
+        iterations += 1
+        method = "newton"
+
+    outputs = _step(base, params, A, D, x[:, None])[:, 0]
+    values = dict(zip(OUTPUT_KEYS, outputs.tolist()))
+    seeded = dict(base)
+    seeded.update(values)
+    return SteadyState(
+        values=values,
+        state=seeded,
+        method=method,
+        iterations=iterations,
+        residual=float(np.max(np.abs(r))),
+        unknowns=list(UNKNOWNS),
+        jacobian=_jacobian(base, params, A, D, x),
+    )
@@ -0,0 +1,301 @@
+# app/sweep.py
+
+"""
+Parameter sweeps.
+
+A sweep runs one ensemble per point of a grid over parameters and shock
+settings and collects the moments and correlations of every point. All points
+share the same seed and sampler, so differences between points come from the
+parameters and not from the random draws (common random numbers). Each point
+is cached on disk under a hash of everything that determines its result,
+including the model version, so repeating or extending a sweep only computes
+the points not seen before.
+"""
+
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Sequence
+import hashlib
+import json
+import os
+import numpy as np
+
+from .engine import MODEL_VERSION, PARAMETER_KEYS, SHOCK_KEYS, VARIABLE_KEYS
+from .ensemble import process_pool, run_ensemble
+from .results import MOMENT_FIELDS, CorrelationMatrix, MomentsTable
+from .sampling import check_sampler
+
+SWEEP_KEYS = PARAMETER_KEYS + SHOCK_KEYS
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "hume-sim" / "sweep"
+
+
+def parse_axis(text: str) -> List[float]:
+    """
+    Parse the values of one sweep axis: "0.2:0.4:5" gives 5 evenly spaced
+    values from 0.2 to 0.4, "0.1,0.2,0.5" the listed values.
+    """
+    try:
+        if ":" in text:
+            start, stop, num = text.split(":")
+            if int(num) < 1:
+                raise ValueError
+            return np.linspace(float(start), float(stop), int(num)).tolist()
+        return [float(v) for v in text.split(",") if v.strip()]
+    except ValueError:
+        raise ValueError(f"Cannot parse sweep values '{text}', expected 'start:stop:num' or 'a,b,c'")
+
+
+def grid(axes: Mapping[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """
+    All combinations of the axis values, the last axis varying fastest.
+
+    Raises:
+        ValueError: If an axis is not a parameter or shock setting, or empty.
+    """
+    for key, values in axes.items():
+        if key not in SWEEP_KEYS:
+            raise ValueError(f"Cannot sweep '{key}', expected one of {SWEEP_KEYS}")
+        if len(values) == 0:
+            raise ValueError(f"No values given for '{key}'")
+    keys = list(axes)
+    return [dict(zip(keys, map(float, combo))) for combo in product(*axes.values())]
+
+
+def point_key(
+    state: Mapping[str, float],
+    params: Mapping[str, float],
+    shocks: Mapping[str, float],
+    steps: int,
+    paths: int,
+    seed: int,
+    sampler: str = "standard",
+) -> str:
+    """Cache key of one grid point: a hash of all its inputs and the model version."""
+    payload = {
+        "model": MODEL_VERSION,
+        "state": {key: float(state[key]) for key in VARIABLE_KEYS},
+        "params": {key: float(params[key]) for key in PARAMETER_KEYS},
+        "shocks": {key: float(shocks[key]) for key in SHOCK_KEYS},
+        "steps": int(steps),
+        "paths": int(paths),
+        "seed": int(seed),
+        "sampler": sampler,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class SweepPoint:
+    """Result of one grid point."""
+
+    values: Dict[str, float]     # The swept settings of this point
+    key: str                     # Cache key
+    diverged: int                # Paths dropped because they turned NaN
+    moments: MomentsTable
+    correlations: CorrelationMatrix
+    cached: bool = False
+
+
+class SweepCache:
+    """
+    One .npz file per grid point in `directory`, named after its key.
+    Files are written atomically, so an interrupted sweep never leaves a
+    corrupt entry behind.
+    """
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        self.directory = Path(directory).expanduser() if directory else DEFAULT_CACHE_DIR
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def load(self, key: str, values: Dict[str, float]) -> SweepPoint | None:
+        path = self.path(key)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as archive:
+                data = {name: archive[name] for name in archive.files}
+        except (OSError, ValueError, EOFError):
+            return None  # Unreadable entry; recompute and overwrite it
+
+        keys = data["keys"].tolist()
+        n = int(data["n"])
+        return SweepPoint(
+            values=values,
+            key=key,
+            diverged=int(data["diverged"]),
+            moments=MomentsTable(keys=keys, n=n, **{name: data[name] for name in MOMENT_FIELDS}),
+            correlations=CorrelationMatrix(keys=keys, n=int(data["corr_n"]), values=data["correlations"]),
+            cached=True,
+        )
+
+    def store(self, point: SweepPoint) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(point.key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        arrays = {name: getattr(point.moments, name) for name in MOMENT_FIELDS}
+        with tmp.open("wb") as f:
+            np.savez(
+                f,
+                keys=np.array(point.moments.keys),
+                n=point.moments.n,
+                diverged=point.diverged,
+                correlations=point.correlations.values,
+                corr_n=point.correlations.n,
+                **arrays,
+            )
+        os.replace(tmp, path)
+
+
+@dataclass
+class SweepResult:
+    """All grid points of a sweep, in grid order."""
+
+    axes: List[str]
+    seed: int
+    steps: int
+    paths: int
+    points: List[SweepPoint]
+    sampler: str = "standard"
+
+    @property
+    def cached(self) -> int:
+        return sum(point.cached for point in self.points)
+
+    def moment_rows(self) -> List[Dict[str, float]]:
+        """Tidy table: one row per grid point and variable."""
+        return [
+            {**point.values, "diverged": point.diverged, **row}
+            for point in self.points
+            for row in point.moments.rows()
+        ]
+
+    def correlation_rows(self) -> List[Dict[str, float]]:
+        """Tidy table: one row per grid point and pair of variables."""
+        rows = []
+        for point in self.points:
+            keys = point.correlations.keys
+            for i, row in enumerate(point.correlations.values.tolist()):
+                for j in range(i + 1, len(keys)):
+                    rows.append({**point.values, "variable_1": keys[i], "variable_2": keys[j], "correlation": row[j]})
+        return rows
+
+
+def _run_point(
+    state: Dict[str, float],
+    params: Dict[str, float],
+    shocks: Dict[str, float],
+    steps: int,
+    paths: int,
+    seed: int,
+    sampler: str = "standard",
+) -> tuple[int, MomentsTable, CorrelationMatrix]:
+    result = run_ensemble(state, params, shocks, steps, paths, seed=seed, sampler=sampler)
+    return result.diverged, result.moments, result.correlations
+
+
+def iter_sweep(
+    state: Mapping[str, float],
+    params: Mapping[str, float],
+    shocks: Mapping[str, float],
+    axes: Mapping[str, Sequence[float]],
+    steps: int,
+    paths: int,
+    seed: int,
+    workers: int = 1,
+    cache: SweepCache | None = None,
+    sampler: str = "standard",
+) -> Iterator[tuple[int, SweepPoint]]:
+    """
+    Run a sweep, yielding `(index, point)` as grid points finish, cached
+    points first. Closing the iterator early cancels the points that have
+    not started yet.
+
+    Takes the same arguments as `run_sweep`.
+    """
+    state = {key: float(state[key]) for key in VARIABLE_KEYS}
+    todo = []
+    for index, values in enumerate(grid(axes)):
+        point_params = {key: float(params[key]) for key in PARAMETER_KEYS}
+        point_shocks = {key: float(shocks[key]) for key in SHOCK_KEYS}
+        for key, value in values.items():
+            (point_params if key in point_params else point_shocks)[key] = value
+        key = point_key(state, point_params, point_shocks, steps, paths, seed, sampler)
+
+        point = cache.load(key, values) if cache is not None else None
+        if point is not None:
+            yield index, point
+        else:
+            todo.append((index, values, key, (state, point_params, point_shocks, steps, paths, seed, sampler)))
+
+    def finish(index, values, key, outcome) -> tuple[int, SweepPoint]:
+        diverged, moments, correlations = outcome
+        point = SweepPoint(values, key, diverged, moments, correlations)
+        if cache is not None:
+            cache.store(point)
+        return index, point
+
+    if workers <= 1 or len(todo) <= 1:
+        for index, values, key, args in todo:
+            yield finish(index, values, key, _run_point(*args))
+        return
+
+    pool = process_pool(workers)
+    try:
+        futures = {pool.submit(_run_point, *args): (index, values, key) for index, values, key, args in todo}
+        for future in as_completed(futures):
+            yield finish(*futures[future], future.result())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_sweep(
+    state: Mapping[str, float],
+    params: Mapping[str, float],
+    shocks: Mapping[str, float],
+    axes: Mapping[str, Sequence[float]],
+    steps: int,
+    paths: int,
+    seed: int | None = None,
+    workers: int = 1,
+    cache: SweepCache | None = None,
+    sampler: str = "standard",
+) -> SweepResult:
+    """
+    Run an ensemble at every point of the grid spanned by `axes`.
+
+    Args:
+        state (Mapping): Initial values for `VARIABLE_KEYS`.
+        params (Mapping): Model parameters; swept ones are overridden per point.
+        shocks (Mapping): Shock settings; swept ones are overridden per point.
+        axes (Mapping): Values per swept key, e.g. {"alpha": [0.3, 0.33]}.
+        steps (int): Periods per path.
+        paths (int): Paths per grid point.
+        seed (int | None): Seed shared by all points; a fresh one is drawn if omitted.
+        workers (int): Worker processes, one grid point each.
+        cache (SweepCache | None): Where to look up and store grid points.
+        sampler (str): Shock sampler of the ensembles, see `app.sampling`.
+
+    Returns:
+        SweepResult: Moments and correlations per grid point.
+    """
+    if paths <= 0:
+        raise ValueError("A sweep needs at least one path per point.")
+    check_sampler(sampler)
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)
+
+    points: Dict[int, SweepPoint] = {}
+    for index, point in iter_sweep(state, params, shocks, axes, steps, paths, seed, workers, cache, sampler):
+        points[index] = point
+    return SweepResult(
+        axes=list(axes),
+        seed=seed,
+        steps=steps,
+        paths=paths,
+        points=[points[i] for i in sorted(points)],
+        sampler=sampler,
+    )
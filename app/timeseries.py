@@ -0,0 +1,231 @@
+# app/timeseries.py
+
+"""
+Time-series statistics of the simulated paths.
+
+Autocorrelations, cross-correlations at leads and lags, and spectral
+densities are computed with FFTs in O(N log N). The history is streamed in
+blocks, so long (or memory-mapped) histories never need an FFT of the whole
+series or a copy of it:
+
+- Lagged products are accumulated block by block, each block correlated with
+  itself and the `max_lag` periods before it (overlap-save).
+- Spectral densities are Welch estimates: the average periodogram of
+  Hann-windowed segments that overlap by half.
+
+Estimates follow the usual conventions: autocorrelations use the biased
+(1/N) autocovariance, `ccf(x, y)[k]` is corr(x_t, y_{t+k}), so a peak at a
+positive lag means x leads y, and densities are one-sided per unit frequency
+(cycles per period), integrating to the variance.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Sequence, Tuple
+import numpy as np
+
+from .history import ForkedHistory, History
+from .instrument import INSTRUMENT
+
+DEFAULT_MAX_LAG = 40
+DEFAULT_SEGMENT = 256
+DEFAULT_PAIRS = [("K", "r"), ("K", "P"), ("r", "P")]
+BLOCK_SIZE = 4096  # Periods per FFT block; small blocks stay in cache
+
+
+def _fft_size(n: int) -> int:
+    """Smallest power of two >= n."""
+    return 1 << max(n - 1, 0).bit_length()
+
+
+def _blocks(segments: Sequence[np.ndarray], size: int) -> Iterator[np.ndarray]:
+    for segment in segments:
+        for start in range(0, len(segment), size):
+            yield segment[start:start + size]
+
+
+@dataclass(frozen=True)
+class TimeSeriesStats:
+    """
+    Autocorrelations of every variable, cross-correlations of `pairs`, and
+    spectral densities of every variable over `n` periods.
+
+    `acf` has shape (max_lag + 1, variables) for lags 0..max_lag; `ccf` has
+    shape (pairs, 2 max_lag + 1) for lags -max_lag..max_lag; `density` has
+    shape (frequencies, variables) for `frequencies` in cycles per period.
+    """
+
+    keys: List[str]
+    n: int
+    max_lag: int
+    acf: np.ndarray
+    pairs: List[Tuple[str, str]]
+    ccf: np.ndarray
+    segment: int
+    frequencies: np.ndarray
+    density: np.ndarray
+
+    @property
+    def lags(self) -> np.ndarray:
+        return np.arange(self.max_lag + 1)
+
+    @property
+    def ccf_lags(self) -> np.ndarray:
+        return np.arange(-self.max_lag, self.max_lag + 1)
+
+    def peak_lags(self) -> np.ndarray:
+        """Lag of the largest absolute cross-correlation of each pair."""
+        return self.ccf_lags[np.argmax(np.abs(self.ccf), axis=1)] if len(self.pairs) else np.array([], dtype=int)
+
+    def peak_periods(self) -> np.ndarray:
+        """Period length (1 / frequency) with the most spectral power, per variable; inf at frequency 0."""
+        if len(self.frequencies) < 2:
+            return np.full(len(self.keys), np.nan)
+        peak = self.frequencies[1:][np.argmax(self.density[1:], axis=0)]  # Skip the zero frequency
+        return 1.0 / peak
+
+    def band_shares(self, bands: Sequence[Tuple[float, float]]) -> np.ndarray:
+        """
+        Share of each variable's spectral power in period bands [lo, hi),
+        shape (bands, variables). Periods are in simulation periods.
+        """
+        with np.errstate(divide="ignore"):
+            periods = 1.0 / self.frequencies
+        total = self.density.sum(axis=0)
+        shares = [self.density[(periods >= lo) & (periods < hi)].sum(axis=0) for lo, hi in bands]
+        return np.divide(shares, total, out=np.zeros((len(bands), len(self.keys))), where=total > 0)
+
+    def acf_dict(self) -> Dict[str, List[float]]:
+        return {key: self.acf[:, i].tolist() for i, key in enumerate(self.keys)}
+
+
+def _lagged_products(
+    segments: Sequence[np.ndarray],
+    mean: np.ndarray,
+    max_lag: int,
+    pairs: Sequence[Tuple[int, int]],
+    block: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sums of lagged products of the demeaned series: `auto[k, i]` = sum_t
+    x_i(t) x_i(t + k), and for each pair (i, j) `forward[p, k]` = sum_t
+    x_i(t) x_j(t + k) and `backward[p, k]` = sum_t x_j(t) x_i(t + k).
+    """
+    k = len(mean)
+    i_idx = np.array([i for i, _ in pairs], dtype=int)
+    j_idx = np.array([j for _, j in pairs], dtype=int)
+    auto = np.zeros((max_lag + 1, k))
+    forward = np.zeros((len(pairs), max_lag + 1))
+    backward = np.zeros((len(pairs), max_lag + 1))
+
+    tail = np.zeros((max_lag, k))  # The periods before the block; zeros before the start
+    lags = max_lag - np.arange(max_lag + 1)
+    for rows in _blocks(segments, block):
+        z = rows - mean
+        w = np.concatenate([tail, z])
+        size = _fft_size(len(w))  # Lags up to max_lag never wrap around
+        fz = np.conj(np.fft.rfft(z, size, axis=0))
+        fw = np.fft.rfft(w, size, axis=0)
+
+        # g[s] = sum_q z[q] w[q + s]; lag k pairs z[q] with w[q + max_lag - k]
+        auto += np.fft.irfft(fz * fw, size, axis=0)[lags]
+        if len(pairs):
+            forward += np.fft.irfft(fz[:, j_idx] * fw[:, i_idx], size, axis=0)[lags].T
+            backward += np.fft.irfft(fz[:, i_idx] * fw[:, j_idx], size, axis=0)[lags].T
+        tail = w[len(w) - max_lag:]
+    return auto, forward, backward
+
+
+def _welch(segments: Sequence[np.ndarray], mean: np.ndarray, segment: int, block: int) -> np.ndarray:
+    """One-sided Welch density of each column, segments overlapping by half."""
+    step = max(segment // 2, 1)
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(segment) / segment)  # Periodic Hann
+    scale = 1.0 / (window * window).sum()
+
+    power = np.zeros((segment // 2 + 1, len(mean)))
+    count = 0
+    carry = np.empty((0, len(mean)))
+    for rows in _blocks(segments, block):
+        buf = np.concatenate([carry, rows - mean])
+        starts = np.arange(0, len(buf) - segment + 1, step)
+        if len(starts):
+            pieces = np.lib.stride_tricks.sliding_window_view(buf, segment, axis=0)[starts]  # (s, k, segment)
+            pieces = pieces - pieces.mean(axis=2, keepdims=True)
+            power += (np.abs(np.fft.rfft(pieces * window, axis=2)) ** 2).sum(axis=0).T
+            count += len(starts)
+            carry = buf[starts[-1] + step:]
+        else:
+            carry = buf
+
+    density = power * scale / max(count, 1)
+    density[1:] *= 2  # One-sided: fold the negative frequencies in
+    if segment % 2 == 0:
+        density[-1] /= 2  # The Nyquist frequency has no mirror image
+    return density
+
+
+def analyze(
+    history: History | ForkedHistory | np.ndarray,
+    max_lag: int = DEFAULT_MAX_LAG,
+    pairs: Sequence[Tuple[str, str]] = DEFAULT_PAIRS,
+    segment: int = DEFAULT_SEGMENT,
+    keys: Sequence[str] | None = None,
+    block: int = BLOCK_SIZE,
+) -> TimeSeriesStats:
+    """
+    Autocorrelations, cross-correlations and spectral densities of a history.
+
+    Args:
+        history: A `History`, `ForkedHistory` or (periods, variables) array.
+            The periods present at the call are analysed, so a history may
+            keep growing in another thread meanwhile.
+        max_lag (int): Largest lag (and lead) of the correlations, capped at
+            N - 1.
+        pairs: (x, y) variable names for cross-correlations; pairs with a
+            variable not in the history are skipped.
+        segment (int): Welch segment length in periods, capped at N; longer
+            segments resolve lower frequencies with more noise.
+        keys: Variable names of an array `history`.
+        block (int): Periods per block streamed through the FFTs.
+
+    Returns:
+        TimeSeriesStats: All zeros if there are fewer than two periods.
+    """
+    if isinstance(history, np.ndarray):
+        segments = [np.asarray(history, dtype=float)]
+        keys = list(keys) if keys is not None else [str(i) for i in range(history.shape[1])]
+    else:
+        segments = history.segments()
+        keys = list(history.keys)
+    n = sum(len(s) for s in segments)
+    index = {key: i for i, key in enumerate(keys)}
+    pairs = [(x, y) for x, y in pairs if x in index and y in index]
+    max_lag = max(min(max_lag, n - 1), 0)
+    segment = max(min(segment, n), 1)
+
+    with INSTRUMENT.time("statistics"):
+        if n < 2:
+            return TimeSeriesStats(
+                keys, n, max_lag, np.zeros((max_lag + 1, len(keys))), pairs,
+                np.zeros((len(pairs), 2 * max_lag + 1)), segment,
+                np.fft.rfftfreq(segment), np.zeros((segment // 2 + 1, len(keys))),
+            )
+
+        mean = sum(rows.sum(axis=0) for rows in _blocks(segments, block)) / n
+        # Blocks that, with the max_lag periods before them, fill a power-of-two FFT
+        lag_block = _fft_size(max(block, max_lag + 1) + max_lag) - max_lag
+        auto, forward, backward = _lagged_products(
+            segments, mean, max_lag, [(index[x], index[y]) for x, y in pairs], lag_block
+        )
+
+        var = auto[0]
+        acf = np.divide(auto, var, out=np.zeros_like(auto), where=var > 0)
+        if pairs:
+            norm = np.sqrt([var[index[x]] * var[index[y]] for x, y in pairs])[:, None]
+            both = np.concatenate([backward[:, :0:-1], forward], axis=1)  # Lags -max_lag .. max_lag
+            ccf = np.divide(both, norm, out=np.zeros_like(both), where=norm > 0)
+        else:
+            ccf = np.zeros((0, 2 * max_lag + 1))
+
+        density = _welch(segments, mean, segment, max(block, segment))
+    INSTRUMENT.count("timeseries analyses")
+    return TimeSeriesStats(keys, n, max_lag, acf, pairs, ccf, segment, np.fft.rfftfreq(segment), density)
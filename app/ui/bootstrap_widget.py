@@ -0,0 +1,58 @@
+from textual.widgets import Markdown
+
+from app.bootstrap import BootstrapIntervals
+from app.instrument import INSTRUMENT
+from app.results import MOMENT_FIELDS, CorrelationMatrix, MomentsTable
+
+MOMENT_HEADERS = ["Mean", "Std. Dev.", "Variance", "Skewness", "Kurtosis"]
+
+
+class BootstrapWidget(Markdown):
+    """
+    A Markdown widget that displays the moments and correlation tables with
+    block-bootstrap confidence intervals: each moment as its estimate and
+    interval, each correlation as its interval. The intervals are computed
+    by `app.bootstrap`; this widget only renders them.
+    """
+
+    def show(self, intervals: BootstrapIntervals, moments: MomentsTable, correlations: CorrelationMatrix) -> None:
+        with INSTRUMENT.time("rendering"):
+            self._show(intervals, moments, correlations)
+        INSTRUMENT.count("renders")
+
+    def _show(self, intervals: BootstrapIntervals, moments: MomentsTable, correlations: CorrelationMatrix) -> None:
+        if INSTRUMENT.verbose:
+            self.app.log(f"[BootstrapWidget] show called with {intervals.n} iterations.")
+
+        keys = intervals.keys
+        rows = [
+            f"*{intervals.level:.0%} intervals over {intervals.n} periods from {intervals.replicates} "
+            f"circular block-bootstrap replicates, blocks of {intervals.block} periods*",
+            "",
+            "| Variable | " + " | ".join(MOMENT_HEADERS) + " |",
+            "|----------|" + ("----------|" * len(MOMENT_HEADERS)),
+        ]
+        for i, key in enumerate(keys):
+            cells = [
+                f"{getattr(moments, name)[i]:.4g} [{getattr(intervals.moments_low, name)[i]:.4g}, "
+                f"{getattr(intervals.moments_high, name)[i]:.4g}]"
+                for name in MOMENT_FIELDS
+            ]
+            rows.append(f"| {key:8} | " + " | ".join(cells) + " |")
+
+        low, high = intervals.correlations_low.values, intervals.correlations_high.values
+        rows += [
+            "",
+            "**Correlation intervals** (estimates in the Pearson table)",
+            "",
+            "|        | " + " | ".join(f"{k:>11}" for k in keys) + " |",
+            "|" + ("--------|" * (len(keys) + 1)),
+        ]
+        for i, key in enumerate(keys):
+            cells = [
+                f"{correlations.values[i, j]:>11.0f}" if i == j else f"{low[i, j]:.2f}…{high[i, j]:.2f}".rjust(11)
+                for j in range(len(keys))
+            ]
+            rows.append(f"| {key:>6} | " + " | ".join(cells) + " |")
+
+        self.update("\n".join(rows))
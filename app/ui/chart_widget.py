@@ -0,0 +1,122 @@
+from rich.text import Text
+from textual.widget import Widget
+from typing import Sequence, Tuple
+import numpy as np
+
+from app.decimate import Decimated, DecimationCache
+from app.history import ForkedHistory, History
+
+CHART_KEYS = ["Y", "K", "r", "P"]
+CHART_COLORS = ["#8aadf4", "#a6da95", "#eed49f", "#f5a97f", "#c6a0f6", "#8bd5ca"]
+AXIS_WIDTH = 11  # Cells left of the plot for the axis labels
+MIN_SPAN = 16    # Fewest periods shown when zoomed in
+
+
+class ChartWidget(Widget):
+    """
+    A chart of selected variables over the history, one band per variable.
+    Each column spans the lowest to the highest value of the periods it
+    covers, drawn with half blocks, so spikes stay visible however many
+    periods a column stands for.
+
+    The decimation to the widget's width comes from a `DecimationCache`:
+    new periods and zooming cost O(width), not O(history). The cache is only
+    kept up to date while the chart is `active` (shown).
+    """
+
+    def __init__(self, keys: Sequence[str] = CHART_KEYS, band_height: int = 4, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.keys = list(keys)
+        self.band_height = band_height
+        self.cache: DecimationCache | None = None
+        self.active = False
+        self.span: int | None = None  # Periods shown; None = the whole history
+        self.end: int | None = None   # Last period shown (exclusive); None = follow the latest
+
+    def show(self, history: History | ForkedHistory) -> None:
+        """Take in new periods (or another history) and redraw."""
+        if not self.active:
+            return
+        if self.cache is None:
+            self.cache = DecimationCache(history)
+        self.cache.update(history)
+        self.refresh()
+
+    def deactivate(self) -> None:
+        """Stop following the history and drop the cache."""
+        self.active = False
+        self.cache = None
+
+    def visible_range(self) -> Tuple[int, int]:
+        n = self.cache.n if self.cache is not None else 0
+        end = n if self.end is None else min(self.end, n)
+        span = end if self.span is None else min(self.span, end)
+        return end - span, end
+
+    def zoom(self, factor: float) -> None:
+        """Show `factor` times as many periods, keeping the last one shown in view."""
+        if self.cache is None or not self.cache.n:
+            return
+        start, stop = self.visible_range()
+        span = int((stop - start) * factor)
+        self.span = None if span >= stop else max(span, MIN_SPAN)
+        if self.span is None:
+            self.end = None
+        self.refresh()
+
+    def pan(self, fraction: float) -> None:
+        """Move the view by `fraction` of its width; moving past the latest period follows it again."""
+        if self.cache is None or self.span is None:
+            return
+        start, stop = self.visible_range()
+        end = stop + int(fraction * (stop - start))
+        self.end = None if end >= self.cache.n else max(end, stop - start)
+        self.refresh()
+
+    def render(self) -> Text:
+        if self.cache is None or not self.cache.n:
+            return Text("No periods yet.")
+
+        start, stop = self.visible_range()
+        view = self.cache.view(start, stop, max(self.size.width - AXIS_WIDTH, 1))
+        mode = "latest" if self.end is None else "panned"
+        text = Text(
+            f"Periods {view.start:,}–{view.stop:,} of {self.cache.n:,}, "
+            f"{view.periods_per_column:,.1f} per column ({mode}; + - zoom, [ ] pan)\n",
+            style="italic",
+        )
+        last = self.cache.history.rows(view.stop - 1, view.stop)[0]
+        for i, key in enumerate(k for k in self.keys if k in view.keys):
+            j = view.keys.index(key)
+            self._render_band(text, view, j, last[j], CHART_COLORS[i % len(CHART_COLORS)])
+        text.rstrip()
+        return text
+
+    def _render_band(self, text: Text, view: Decimated, j: int, last: float, color: str) -> None:
+        low, high = view.low[:, j], view.high[:, j]
+        finite = np.isfinite(low) & np.isfinite(high)
+        if not finite.any():
+            text.append(f"{view.keys[j]}  no finite values\n", style=f"bold {color}")
+            return
+
+        ymin, ymax = float(low[finite].min()), float(high[finite].max())
+        text.append(f"{view.keys[j]}", style=f"bold {color}")
+        text.append(f"  last {last:.6g}  min {ymin:.6g}  max {ymax:.6g}\n")
+
+        # Half-row levels 0 (bottom) .. 2 * band_height - 1 of each column's range
+        levels = 2 * self.band_height
+        if ymax > ymin:
+            scale = levels / (ymax - ymin)
+            lo = np.clip(((np.where(finite, low, ymin) - ymin) * scale).astype(int), 0, levels - 1)
+            hi = np.clip(((np.where(finite, high, ymin) - ymin) * scale).astype(int), 0, levels - 1)
+        else:
+            lo = hi = np.full(len(low), levels // 2)
+
+        for row in range(self.band_height):
+            bottom = 2 * (self.band_height - 1 - row)
+            top_on = finite & (lo <= bottom + 1) & (hi >= bottom + 1)
+            bottom_on = finite & (lo <= bottom) & (hi >= bottom)
+            cells = np.where(top_on & bottom_on, "█", np.where(top_on, "▀", np.where(bottom_on, "▄", " ")))
+            label = f"{ymax:.4g}" if row == 0 else f"{ymin:.4g}" if row == self.band_height - 1 else ""
+            text.append(f"{label:>{AXIS_WIDTH - 2}} │", style="dim")
+            text.append("".join(cells.tolist()) + "\n", style=color)
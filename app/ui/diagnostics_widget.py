@@ -0,0 +1,35 @@
+from textual.widgets import Markdown
+
+from app.instrument import Instrument
+
+
+class DiagnosticsWidget(Markdown):
+    """
+    A Markdown widget that displays the stage timers and counters collected
+    by the instrumentation layer. Rendering times cover building and queueing
+    the tables; Textual lays them out afterwards.
+    """
+
+    def show(self, instrument: Instrument) -> None:
+        if not instrument.enabled:
+            self.update("*Instrumentation is off (`[app] instrument = false`).*")
+            return
+
+        snapshot = instrument.snapshot()
+        rows = [
+            f"*{snapshot['elapsed']:.0f} s since start or reset, log level `{instrument.level}`*",
+            "",
+            "| Stage      |    Calls |  Total ms |   Mean us |   Last us |    Max us |",
+            "|------------|----------|-----------|-----------|-----------|-----------|",
+        ]
+        for stage, t in snapshot["timers"].items():
+            rows.append(
+                f"| {stage:10} | {t['calls']:8d} | {t['total'] * 1e3:9.1f} | {t['mean'] * 1e6:9.1f} "
+                f"| {t['last'] * 1e6:9.1f} | {t['max'] * 1e6:9.1f} |"
+            )
+
+        if snapshot["counters"]:
+            rows += ["", "| Counter          |        Count |", "|------------------|--------------|"]
+            rows += [f"| {name:16} | {count:12d} |" for name, count in sorted(snapshot["counters"].items())]
+
+        self.update("\n".join(rows))
@@ -1,23 +1,9 @@
 from textual.widgets import Static, Input
 from textual.containers import Horizontal, Vertical
 from textual.widget import Widget
+from typing import Dict, Tuple
 
-from app.config_loader import load_config
-
-# Hardcoded fallback defaults
-FALLBACK_DEFAULTS = {
-    "defaults": {
-        "Y": 1.0, "C": 0.6, "I": 0.4, "K": 5.0, "r": 0.03, "s": 0.2, "p": 0.05,
-        "theta": 0.5, "M": 1.0, "P": 1.0, "pi": 0.0, "K_last": 5.0, "P_last": 1.0,
-    },
-    "parameters": {
-        "alpha": 0.33, "beta": 0.96, "delta": 0.05, "gamma": 0.004, "sigma": 1.0,
-    },
-    "shocks": {
-        "A-mean": 1.0, "A-stderr": 0.01,
-        "D-mean": 1.0, "D-stderr": 0.02,
-    },
-}
+from app.config_loader import FALLBACK_DEFAULTS, SimConfig, get_config_or_default
 
 # Metadata only — not actual values
 VARIABLES = [
@@ -93,29 +79,81 @@ class FormWidget(Vertical):
             id="shock-values"
         )
 
-    def repopulate(self):
-        try:
-            config = load_config()
-        except Exception:
-            config = {}
+    def on_mount(self) -> None:
+        self.inputs = {widget.id: widget for widget in self.query(Input)}
+        self.shown: Dict[str, str] = {}
 
-        defaults = config.get("defaults", FALLBACK_DEFAULTS["defaults"])
-        params = config.get("parameters", FALLBACK_DEFAULTS["parameters"])
-        shocks = config.get("shocks", FALLBACK_DEFAULTS["shocks"])
+    def set_value(self, input_id: str, text: str) -> None:
+        """Write a value into an input and remember it as program-set."""
+        self.inputs[input_id].value = text
+        self.shown[input_id] = text
 
-        for var, _, _ in VARIABLES:
-            value = defaults.get(var, FALLBACK_DEFAULTS["defaults"].get(var, ""))
-            self.query_one(f"#init-{var}", Input).value = str(value)
+    def show_state(self, values: Dict[str, float]) -> None:
+        """Render model variables into their `init-*` inputs."""
+        for key, val in values.items():
+            self.set_value(f"init-{key}", f"{val:.5f}")
 
+    def show_settings(self, params: Dict[str, float], shocks: Dict[str, float]) -> None:
+        """Render parameters and shock settings into their inputs."""
         for name, _ in PARAMETERS:
-            value = params.get(name, FALLBACK_DEFAULTS["parameters"].get(name, ""))
-            self.query_one(f"#param-{name}", Input).value = str(value)
+            self.set_value(f"param-{name}", str(params[name]))
+        for name, _ in SHOCKS:
+            for suffix in ("mean", "stderr"):
+                self.set_value(f"shock-{name}-{suffix}", str(shocks[f"{name}-{suffix}"]))
 
+    def read_values(self) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float]]:
+        """
+        Parse every input into (state, parameters, shocks) dicts for the engine.
+        """
+        state = {var: self._parse(f"init-{var}", var) for var, _, _ in VARIABLES}
+        params = {name: self._parse(f"param-{name}", name) for name, _ in PARAMETERS}
+        shocks = {}
         for name, _ in SHOCKS:
-            mean_key = f"{name}-mean"
-            stderr_key = f"{name}-stderr"
-            mean = shocks.get(mean_key, FALLBACK_DEFAULTS["shocks"].get(mean_key, ""))
-            stderr = shocks.get(stderr_key, FALLBACK_DEFAULTS["shocks"].get(stderr_key, ""))
-            self.query_one(f"#shock-{name}-mean", Input).value = str(mean)
-            self.query_one(f"#shock-{name}-stderr", Input).value = str(stderr)
+            for suffix in ("mean", "stderr"):
+                shocks[f"{name}-{suffix}"] = self._parse(f"shock-{name}-{suffix}", f"{name}-{suffix}")
+        return state, params, shocks
+
+    def edited_values(self) -> Dict[str, float]:
+        """
+        Return only the values the user typed since they were last set by the
+        program, keyed by model name (e.g. "K", "alpha", "A-mean").
+
+        The edits count as applied only if every one of them parses; if one
+        fails, none are marked, so they are all still edits on the next call.
+        """
+        changed = {
+            input_id: widget.value
+            for input_id, widget in self.inputs.items()
+            if widget.value != self.shown.get(input_id)
+        }
+        edited = {}
+        for input_id in changed:
+            key = input_id.split("-", 1)[1]
+            edited[key] = self._parse(input_id, key)
+        self.shown.update(changed)
+        return edited
+
+    def _parse(self, input_id: str, key: str) -> float:
+        try:
+            return float(self.inputs[input_id].value)
+        except Exception as e:
+            raise ValueError(f"Failed to get value for '{key}': {e}")
 
+    def repopulate(self):
+        self.apply_config(get_config_or_default())
+
+    def apply_config(self, config: SimConfig, initial_values: bool = True) -> None:
+        """
+        Fill the inputs from a config: parameters and shocks always, the
+        initial values of the variables only if `initial_values` is set.
+        """
+        if initial_values:
+            for var, _, _ in VARIABLES:
+                self.set_value(f"init-{var}", str(config.defaults.get(var, "")))
+
+        for name, _ in PARAMETERS:
+            self.set_value(f"param-{name}", str(config.parameters.get(name, "")))
+
+        for name, _ in SHOCKS:
+            for suffix in ("mean", "stderr"):
+                self.set_value(f"shock-{name}-{suffix}", str(config.shocks.get(f"{name}-{suffix}", "")))
@@ -0,0 +1,69 @@
+from textual.app import ComposeResult
+from textual.containers import Vertical, VerticalScroll
+from textual.screen import ModalScreen
+from textual.widgets import Button, Markdown, Static
+from typing import List
+
+from app.instrument import INSTRUMENT
+from app.irf import IRFResult
+
+IRF_KEYS = ["Y", "K", "r", "P"]
+
+
+class IRFWidget(Markdown):
+    """
+    A Markdown widget that displays impulse responses, one table per impulse
+    with the deviation from the baseline of each variable per period. The
+    responses are computed by `app.irf`; this widget only renders them.
+    """
+
+    def show(self, result: IRFResult, keys: List[str] = IRF_KEYS) -> None:
+        with INSTRUMENT.time("rendering"):
+            self._show(result, keys)
+        INSTRUMENT.count("renders")
+
+    def _show(self, result: IRFResult, keys: List[str]) -> None:
+        if INSTRUMENT.verbose:
+            self.app.log(f"[IRFWidget] show called with {len(result.impulses)} impulses, {result.horizon} periods.")
+
+        columns = [result.keys.index(k) for k in keys]
+        rows = []
+        for impulse, deviations in zip(result.impulses, result.deviations):
+            rows += [
+                f"**{impulse}**",
+                "",
+                "| t | " + " | ".join(f"{k:>10}" for k in keys) + " |",
+                "|---|" + ("-----------|" * len(keys)),
+            ]
+            for t, values in enumerate(deviations[:, columns].tolist()):
+                rows.append(f"| {t} | " + " | ".join(f"{v:>10.6f}" for v in values) + " |")
+            rows.append("")
+
+        self.update("\n".join(rows))
+
+
+class IRFScreen(ModalScreen):
+    """Modal view of an impulse-response result."""
+
+    BINDINGS = [("escape", "dismiss", "Close")]
+
+    def __init__(self, result: IRFResult, caption: str = "") -> None:
+        super().__init__()
+        self.result = result
+        self.caption = caption
+
+    def compose(self) -> ComposeResult:
+        yield Vertical(
+            Static("Impulse Responses (deviation from baseline)", classes="title-label"),
+            Static(self.caption, id="irf-caption"),
+            VerticalScroll(IRFWidget(id="irf-table")),
+            Button("Close", id="irf-close"),
+            id="irf-dialog",
+        )
+
+    def on_mount(self) -> None:
+        self.query_one(IRFWidget).show(self.result)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "irf-close":
+            self.dismiss()
@@ -1,18 +1,31 @@
-from textual.widgets import Button, Static, Input
+from textual import work
+from textual.widgets import Button, Static, Input, ProgressBar
 from textual.containers import Horizontal, Vertical
 from textual.message import Message
 from textual.widget import Widget
 from textual.reactive import reactive
-import random
+from textual.worker import Worker, WorkerState, get_current_worker
+import os
+import time
+import numpy as np
 
-from ..equations import *
-from app.utils.exporter import export_simulation  # ✅ new import
+from app.checkpoint import DEFAULT_CHECKPOINT_PATH, CheckpointError, CheckpointWriter, load_checkpoint, save_checkpoint
+from app.engine import Engine, Condition, VARIABLE_KEYS, PARAMETER_KEYS, SHOCK_KEYS, OUTPUT_KEYS
+from app.config_loader import SimConfig, get_config_or_default
+from app.ensemble import EnsembleResult, iter_ensemble
+from app.history import History
+from app.instrument import INSTRUMENT
+from app.irf import DEFAULT_HORIZON, Impulse
+from app.results import SimulationResults
+from app.scenarios import ScenarioTree
+from app.steady_state import solve as solve_steady_state
+from app.utils.exporter import export_simulation, open_stream
+from app.ui.irf_widget import IRFScreen
+from app.ui.scenario_widget import ScenarioScreen
 
-VARIABLE_KEYS = [
-    "Y", "C", "I", "K", "r", "s", "p", "theta", "M", "P", "pi", "K_last", "P_last"
-]
-PARAMETER_KEYS = ["alpha", "beta", "delta", "gamma", "sigma"]
-SHOCK_KEYS = ["A-mean", "A-stderr", "D-mean", "D-stderr"]
+RUN_BLOCK_SIZE = 1000      # Periods computed between checks for a UI refresh
+REFRESH_INTERVAL = 0.1     # Seconds between redraws during a batch run
+MAX_UNTIL_STEPS = 1_000_000  # Step limit for "run until" without a step count
 
 class NewIteration(Message):
     def __init__(self, sender: Widget, data: dict) -> None:
@@ -22,110 +35,530 @@ class NewIteration(Message):
 
 
 class IterationControls(Vertical):
+    """
+    Simulation controls. Single iterations run inline; batch runs, ensembles
+    and exports run in background workers that report progress, can be
+    cancelled and stream partial results into the statistics panes.
+    """
+
     counter = reactive(0)
-    simulation_state = reactive(list)
+    engine: Engine | None = None
+    running: bool = False
+    scenarios: ScenarioTree | None = None  # Created by the first fork
+    window: int | None = None  # Rolling window shown next to the full-sample statistics
+    stream = None  # Open streaming export, if [export] stream is enabled
+    intervals: tuple | None = None  # (results, BootstrapIntervals) last shown in the bootstrap pane
 
     def compose(self):
 
         yield Horizontal(
             Button("Iterate", id="iterate-button"),
+            Button("Run", id="run-button"),
+            Button("Ensemble", id="ensemble-button"),
+            Button("IRF", id="irf-button"),
+            id="button-row"
+        )
+
+        yield Horizontal(
             Button("Clear", id="clear-button"),
             Button("Export", id="export-button"),
-            id="button-row"
+            Button("Steady", id="steady-button"),
+            Button("Cancel", id="cancel-button", disabled=True),
+            id="control-row"
+        )
+
+        yield Horizontal(
+            Input(placeholder="N steps", id="run-steps", classes="run-input"),
+            Input(placeholder="until, e.g. K > 10", id="run-until", classes="run-input"),
+            Input(placeholder="paths", id="run-paths", classes="run-input"),
+            Input(placeholder="fork at period", id="run-fork", classes="run-input"),
+            id="run-row"
         )
 
-        yield Static(f"Iterations: {self.counter}", id="iteration-counter")
+        yield Horizontal(
+            Static(f"Iterations: {self.counter}", id="iteration-counter"),
+            ProgressBar(id="run-progress", show_eta=False),
+            id="status-row"
+        )
+
+    def on_mount(self) -> None:
+        self.results = SimulationResults(OUTPUT_KEYS, self.new_history(), get_config_or_default().windows)
+        self.query_one("#run-progress", ProgressBar).display = False
+
+    @staticmethod
+    def new_history() -> History:
+        config = get_config_or_default()
+        return History(
+            OUTPUT_KEYS,
+            spill_bytes=int(config.spill_mb * 2**20) if config.spill_mb else None,
+            spill_dir=config.spill_dir,
+        )
 
+    def on_unmount(self) -> None:
+        self.close_stream()
+
+    def record(self, rows: np.ndarray) -> None:
+        """Add computed periods to the results and, if enabled, the export stream."""
+        self.results.append(rows)
+        if self.stream is None and get_config_or_default().export_stream:
+            self.stream = open_stream(OUTPUT_KEYS)
+            self.app.log(f"[Export] Streaming iterations to {self.stream.path}")
+            rows = self.results.history.array()  # Catch up on earlier periods
+        if self.stream is not None:
+            self.stream.append(rows)
+
+    def apply_config(self, config: SimConfig) -> None:
+        """
+        Apply a reloaded config: parameters and shocks take effect from the
+        next period on; initial values only while no iteration has run yet.
+        """
+        fresh = self.results.n == 0
+        self.app.form_widget.apply_config(config, initial_values=fresh)
+        if self.engine is not None:
+            if fresh:
+                self.engine.update(dict(config.defaults))
+            self.engine.update({k: v for k, v in config.parameters.items() if k in PARAMETER_KEYS})
+            self.engine.update(dict(config.shocks))
+
+    def close_stream(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.app.log(f"[Export] Stream closed → {self.stream.path}")
+            self.stream = None
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "cancel-button":
+            self.app.log("[IterationControls] Cancelling background job...")
+            self.workers.cancel_group(self, "simulation")
+            return
+
+        if self.running:
+            self.app.notify("A job is in progress.", severity="warning")
+            return
+
         if event.button.id == "iterate-button":
             self.do_iteration()
-            self.app.log(f"[IterationControls] Iterating with {len(self.simulation_state)} steps")
+            self.app.log(f"[IterationControls] Iterating with {self.results.n} steps")
 
-            if self.simulation_state:
-                self.app.moments_widget.update_from_simulation(self.simulation_state)
-                self.app.corr_widget.update_from_simulation(self.simulation_state)
+        elif event.button.id == "run-button":
+            try:
+                steps, condition = self.read_run_settings()
+                engine = self.sync_engine()
+            except ValueError as e:
+                self.app.notify(str(e), severity="error")
+                return
+            self.start_job(steps)
+            self.run_batch(engine, steps, condition)
+
+        elif event.button.id == "ensemble-button":
+            try:
+                steps, paths = self.read_ensemble_settings()
+                engine = self.sync_engine()
+            except ValueError as e:
+                self.app.notify(str(e), severity="error")
+                return
+            self.start_job(paths)
+            self.run_ensemble(engine.state_dict(), dict(engine.params), dict(engine.shocks), steps, paths)
 
         elif event.button.id == "clear-button":
             self.app.log("[IterationControls] Clearing simulation...")
-            self.simulation_state = []
+            self.reset_scenarios()
+            self.results.clear()
+            self.close_stream()
+            self.engine = None
             self.counter = 0
             self.query_one("#iteration-counter", Static).update(f"Iterations: {self.counter}")
             self.app.form_widget.repopulate()
-            self.app.moments_widget.update_from_simulation([])
-            self.app.corr_widget.update_from_simulation([])
+            self.show_results()
+
+        elif event.button.id == "irf-button":
+            self.show_impulse_responses()
+
+        elif event.button.id == "steady-button":
+            self.seed_steady_state()
 
         elif event.button.id == "export-button":
             self.app.log("[Export] Saving...")
-            moments = self.app.moments_widget.get_data_as_dicts()
-            correlations = self.app.corr_widget.get_data_as_matrix()
-            path = export_simulation(moments, correlations, self.simulation_state)
-            self.app.notify(f"Export saved to: {path}")
-            self.app.log(f"[Export] Done → {path}")
+            self.start_job(None, cancellable=False)  # A half-written file is of no use
+            self.run_export()
+
+    def show_impulse_responses(self) -> None:
+        """
+        Compute the responses to a one-standard-deviation A and D shock from
+        the current state and open them in a modal view. The horizon is taken
+        from the steps input (default `DEFAULT_HORIZON`); with a number of
+        paths, the responses are averaged over that many noisy paths,
+        otherwise the other shocks are held at their means.
+        """
+        steps_text = self.query_one("#run-steps", Input).value.strip()
+        paths_text = self.query_one("#run-paths", Input).value.strip()
+        try:
+            horizon = self._parse_count(steps_text, "steps") if steps_text else DEFAULT_HORIZON
+            paths = self._parse_count(paths_text, "paths") if paths_text else 1
+            engine = self.sync_engine()
+        except ValueError as e:
+            self.app.notify(str(e), severity="error")
+            return
+
+        result = engine.impulse_response(
+            [Impulse("A"), Impulse("D")], horizon, paths, deterministic=not paths_text,
+            sampler=get_config_or_default().sampler,
+        )
+        kind = f"averaged over {paths} paths" if paths_text else "other shocks at their means"
+        caption = f"{horizon} periods from the current state, {kind}. Esc to close."
+        self.app.log(f"[IterationControls] Impulse responses: {caption}")
+        self.app.push_screen(IRFScreen(result, caption))
+
+    def seed_steady_state(self) -> None:
+        """
+        Move the engine to the deterministic steady state of the current
+        parameters, so the next periods start there without a burn-in.
+        """
+        try:
+            engine = self.sync_engine()
+            ss = solve_steady_state(engine.state_dict(), engine.params, engine.shocks)
+        except ValueError as e:
+            self.app.notify(str(e), severity="error")
+            return
+
+        engine.update(ss.state)
+        self.app.form_widget.show_state(ss.state)
+        eigenvalues = ", ".join(f"{ev.real:.4f}" if abs(ev.imag) < 1e-12 else f"{ev:.4f}" for ev in ss.eigenvalues)
+        stability = f"half-life {ss.half_life:.1f} periods" if ss.stable else "not asymptotically stable"
+        self.app.log(f"[IterationControls] Steady state ({ss.method}, {ss.iterations} iterations): {ss.values}")
+        self.app.notify(
+            f"Steady state: K*={ss.values['K']:.5f}, s*={ss.values['s']:.5f}, r*={ss.values['r']:.5f}\n"
+            f"Eigenvalues: {eigenvalues}; spectral radius {ss.spectral_radius:.4f}, {stability}."
+        )
+
+    @staticmethod
+    def checkpoint_path():
+        return get_config_or_default().checkpoint_path or DEFAULT_CHECKPOINT_PATH
+
+    def save_checkpoint(self) -> None:
+        """Save the engine, history and statistics to the checkpoint file."""
+        if self.running:
+            self.app.notify("A job is in progress; checkpoints are saved between jobs.", severity="warning")
+            return
+        if self.engine is None:
+            self.app.notify("Nothing to checkpoint yet.", severity="warning")
+            return
+        path = save_checkpoint(self.checkpoint_path(), self.engine, self.results)
+        self.app.log(f"[Checkpoint] Saved {self.results.n} periods → {path}")
+        self.app.notify(f"Checkpoint saved to: {path}")
+
+    def resume_checkpoint(self) -> None:
+        """
+        Replace the simulation with the one in the checkpoint file; the next
+        periods continue exactly as the checkpointed run would have.
+        """
+        if self.running:
+            self.app.notify("A job is in progress.", severity="warning")
+            return
+        try:
+            checkpoint = load_checkpoint(self.checkpoint_path())
+        except CheckpointError as e:
+            self.app.notify(str(e), severity="error")
+            return
+
+        self.close_stream()
+        self.reset_scenarios()
+        self.results.clear()
+        self.engine = checkpoint.engine()
+        config = get_config_or_default()
+        self.results = checkpoint.results(
+            list(self.results.windows),
+            spill_bytes=int(config.spill_mb * 2**20) if config.spill_mb else None,
+            spill_dir=config.spill_dir,
+        )
+        self.app.form_widget.show_settings(self.engine.params, self.engine.shocks)
+        self.app.form_widget.show_state(self.engine.state_dict())
+        self.refresh_view()
+        self.app.log(f"[Checkpoint] Resumed {self.results.n} periods from {checkpoint.path}")
+        self.app.notify(f"Resumed {self.results.n} periods from: {checkpoint.path}")
+
+    def fork_scenario(self) -> None:
+        """
+        Branch off the current path at the period in the fork input, or at
+        its latest period if that is empty. The new branch becomes current;
+        edits from here on apply to it alone.
+        """
+        if self.running:
+            self.app.notify("A job is in progress.", severity="warning")
+            return
+        try:
+            at = self.read_fork_period()
+            engine = self.sync_engine()
+            if self.scenarios is None:
+                self.scenarios = ScenarioTree(engine, self.results)
+            parent = self.scenarios.current
+            branch = self.scenarios.fork(at)
+        except ValueError as e:
+            self.app.notify(str(e), severity="error")
+            return
+        self.app.log(f"[Scenarios] Forked {branch.label}")
+        self.show_branch()
+        self.app.notify(f"Forked branch '{branch.name}' from '{parent.name}' at period {branch.fork}.")
 
+    def switch_scenario(self, name: str | None = None) -> None:
+        """Switch to the branch `name`, or to the next one in creation order."""
+        if self.scenarios is None or len(self.scenarios) == 1:
+            self.app.notify("No other branches; fork one with f.", severity="warning")
+            return
+        if self.running:
+            self.app.notify("A job is in progress.", severity="warning")
+            return
+        try:
+            self.sync_engine()  # Keep pending edits with the branch they were made on
+        except ValueError as e:
+            self.app.notify(str(e), severity="error")
+            return
+        branch = self.scenarios.switch(name) if name else self.scenarios.next_branch()
+        self.show_branch()
+        self.app.notify(f"Switched to branch {branch.label}.")
+
+    def show_scenarios(self) -> None:
+        """Open the comparison of all branches."""
+        if self.scenarios is None:
+            self.app.notify("No branches yet; fork one with f.", severity="warning")
+            return
+
+        def chosen(name: str | None) -> None:
+            if name is not None and name != self.scenarios.current.name:
+                self.switch_scenario(name)
+
+        self.app.push_screen(ScenarioScreen(self.scenarios.compare(), self.scenarios.current.name), chosen)
+
+    def show_branch(self) -> None:
+        """Make the current branch's engine and results the ones on screen."""
+        branch = self.scenarios.current
+        self.close_stream()
+        self.engine, self.results = branch.engine, branch.results
+        self.app.form_widget.show_settings(self.engine.params, self.engine.shocks)
+        self.app.form_widget.show_state(self.engine.state_dict())
+        self.app.sub_title = f"Scenario: {branch.label}"
+        self.refresh_view()
+
+    def reset_scenarios(self) -> None:
+        """Drop all branches but the root, which becomes the current run again."""
+        if self.scenarios is not None:
+            root = next(iter(self.scenarios.branches.values()))
+            self.engine, self.results = root.engine, root.results
+            self.scenarios = None
+            self.app.sub_title = ""
+
+    def read_run_settings(self) -> tuple[int, Condition | None]:
+        """Parse the step count and optional stop condition of the run row."""
+        steps_text = self.query_one("#run-steps", Input).value.strip()
+        until_text = self.query_one("#run-until", Input).value.strip()
+        condition = Condition.parse(until_text) if until_text else None
+
+        if steps_text:
+            steps = self._parse_count(steps_text, "steps")
+        elif condition is not None:
+            steps = MAX_UNTIL_STEPS
+        else:
+            raise ValueError("Enter a number of steps or a stop condition.")
+        return steps, condition
+
+    def read_ensemble_settings(self) -> tuple[int, int]:
+        """Parse the steps per path and number of paths of the run row."""
+        steps_text = self.query_one("#run-steps", Input).value.strip()
+        paths_text = self.query_one("#run-paths", Input).value.strip()
+        if not steps_text or not paths_text:
+            raise ValueError("Enter a number of steps and paths for the ensemble.")
+        return self._parse_count(steps_text, "steps"), self._parse_count(paths_text, "paths")
+
+    def read_fork_period(self) -> int | None:
+        """Parse the fork period of the run row; None (the latest period) if empty."""
+        text = self.query_one("#run-fork", Input).value.strip()
+        if not text:
+            return None
+        try:
+            return int(text)
+        except ValueError:
+            raise ValueError(f"Invalid fork period: '{text}'")
+
+    @staticmethod
+    def _parse_count(text: str, what: str) -> int:
+        try:
+            count = int(text)
+        except ValueError:
+            raise ValueError(f"Invalid number of {what}: '{text}'")
+        if count <= 0:
+            raise ValueError(f"The number of {what} must be positive.")
+        return count
+
+    def sync_engine(self) -> Engine:
+        """Create the engine from the form, or push the user's edits into it."""
+        form = self.app.form_widget
+        if self.engine is None:
+            state, params, shocks = form.read_values()
+            self.engine = Engine(state, params, shocks)
+        else:
+            self.engine.update(form.edited_values())
+        return self.engine
+
+    def show_results(self) -> None:
+        self.app.moments_widget.show(self.results.moments())
+        self.app.corr_widget.show(self.results.correlations())
+        if self.window is not None:
+            self.show_window()
+        self.app.chart_widget.show(self.results.history)
+
+    def show_window(self) -> None:
+        """Render the statistics of the selected rolling window."""
+        caption = f"*Last {min(self.window, self.results.n)} of {self.results.n} periods*"
+        self.app.rolling_moments_widget.show(self.results.moments(self.window), caption=caption)
+        self.app.rolling_corr_widget.show(self.results.correlations(self.window), caption=caption)
+
+    def refresh_view(self) -> None:
+        """Render the latest period into the form, counter and statistics."""
+        self.counter = self.results.n
+        self.query_one("#iteration-counter", Static).update(f"Iterations: {self.counter}")
+        if self.results.n:
+            self.app.form_widget.show_state(self.results.history.row(self.results.n - 1))
+        self.show_results()
+
+    def show_progress(self, progress: float) -> None:
+        self.query_one("#run-progress", ProgressBar).update(progress=progress)
+
+    def start_job(self, total: float | None, cancellable: bool = True) -> None:
+        """
+        Lock the controls and show the progress bar for a background job;
+        Cancel is offered only for jobs that stop when cancelled.
+        """
+        self.running = True
+        self.query_one("#cancel-button", Button).disabled = not cancellable
+        bar = self.query_one("#run-progress", ProgressBar)
+        bar.update(total=total, progress=0)
+        bar.display = True
+
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        if event.worker.group != "simulation" or not event.worker.is_finished:
+            return
+
+        self.running = False
+        self.query_one("#cancel-button", Button).disabled = True
+        self.query_one("#run-progress", ProgressBar).display = False
+
+        if event.state == WorkerState.ERROR:
+            self.app.log(f"[IterationControls] Job failed: {event.worker.error}")
+            self.app.notify(f"Job failed: {event.worker.error}", severity="error")
+        elif event.state == WorkerState.CANCELLED:
+            self.app.notify("Job cancelled.", severity="warning")
+
+    @work(thread=True, exclusive=True, group="simulation", exit_on_error=False)
+    def run_batch(self, engine: Engine, steps: int, condition: Condition | None = None) -> None:
+        """
+        Run up to `steps` periods, stopping early once `condition` holds.
+
+        The periods are computed in blocks off the event loop; the form and
+        statistics are redrawn at most every `REFRESH_INTERVAL` seconds. A
+        cancelled run keeps the periods computed so far.
+        """
+        worker = get_current_worker()
+        self.app.log(f"[IterationControls] Running {steps} steps, until: {condition}")
+        interval = get_config_or_default().checkpoint_interval
+        writer = CheckpointWriter(self.checkpoint_path())
+
+        done, met, diverged = 0, False, False
+        saved = 0
+        last_refresh = time.monotonic()
+        try:
+            while done < steps and not met and not diverged and not worker.is_cancelled:
+                n = min(RUN_BLOCK_SIZE, steps - done)
+                if condition is None:
+                    rows = engine.run(n)
+                else:
+                    rows, met = engine.run_until(condition, n)
+                self.record(rows)
+                done += len(rows)
+                diverged = not np.isfinite(rows[-1]).all()
+
+                if interval and done - saved >= interval:
+                    writer.save(engine, self.results)
+                    self.app.log(f"[Checkpoint] Saved {self.results.n} periods → {writer.path}")
+                    saved = done
+
+                if time.monotonic() - last_refresh >= REFRESH_INTERVAL:
+                    self.app.call_from_thread(self.refresh_view)
+                    self.app.call_from_thread(self.show_progress, done)
+                    last_refresh = time.monotonic()
+        finally:
+            self.app.call_from_thread(self.refresh_view)
+
+        if self.results.n:
+            self.post_message(NewIteration(self, self.results.history.row(self.results.n - 1)))
+        if diverged:
+            self.app.call_from_thread(
+                self.app.notify, f"Stopped after {done} steps: the path diverged.", severity="warning"
+            )
+        elif condition is not None and not worker.is_cancelled:
+            outcome = "met" if met else "not met"
+            self.app.call_from_thread(self.app.notify, f"Ran {done} steps, condition {condition} {outcome}.")
+
+    @work(thread=True, exclusive=True, group="simulation", exit_on_error=False)
+    def run_ensemble(self, state: dict, params: dict, shocks: dict, steps: int, paths: int) -> None:
+        """
+        Run an ensemble of `paths` paths from the current state across a
+        process pool, streaming the merged moments after every batch.
+        """
+        worker = get_current_worker()
+        self.app.log(f"[IterationControls] Ensemble of {paths} paths x {steps} steps")
+
+        config = get_config_or_default()
+        batches = iter_ensemble(
+            state, params, shocks, steps, paths, seed=config.sampling_seed,
+            workers=os.cpu_count() or 1, sampler=config.sampler,
+        )
+        try:
+            for result in batches:
+                self.app.call_from_thread(self.show_ensemble, result)
+                self.app.call_from_thread(self.show_progress, result.paths)
+                if worker.is_cancelled:
+                    break
+        finally:
+            batches.close()
+
+    def show_ensemble(self, result: EnsembleResult) -> None:
+        caption = f"*Ensemble: {result.paths} paths × {result.steps} periods, {result.diverged} diverged*"
+        self.app.moments_widget.show(result.moments, caption=caption)
+        self.app.corr_widget.show(result.correlations, caption=caption)
+
+    @work(thread=True, exclusive=True, group="simulation", exit_on_error=False)
+    def run_export(self) -> None:
+        metadata = {}
+        if self.engine is not None:
+            metadata = {"parameters": self.engine.params, "shocks": self.engine.shocks}
+        intervals = None
+        if self.intervals is not None and self.intervals[0] is self.results:
+            intervals = self.intervals[1]  # Dropped by the export if periods were added since
+        path = export_simulation(self.results, metadata=metadata, intervals=intervals)
+        self.app.call_from_thread(self.app.notify, f"Export saved to: {path}")
+        self.app.log(f"[Export] Done → {path}")
 
     def do_iteration(self):
-        def get(var: str) -> float:
-            try:
-                return float(self.screen.query_one(f"#init-{var}", Input).value)
-            except Exception:
-                try:
-                    return float(self.screen.query_one(f"#param-{var}", Input).value)
-                except Exception:
-                    try:
-                        return float(self.screen.query_one(f"#shock-{var}", Input).value)
-                    except Exception as e:
-                        raise ValueError(f"Failed to get value for '{var}': {e}")
-
-        inputs = {key: get(key) for key in VARIABLE_KEYS}
-        params = {key: get(key) for key in PARAMETER_KEYS}
-        shocks = {key: get(key) for key in SHOCK_KEYS}
-
-        A = random.gauss(shocks["A-mean"], shocks["A-stderr"])
-        D = random.gauss(shocks["D-mean"], shocks["D-stderr"])
-        self.app.log(f"[do_iteration] Sampled A={A:.5f}, D={D:.5f}")
-
-        Y = eq_output(A, inputs["K"], params["alpha"])
-        C = eq_consumption(Y, inputs["s"], D)
-        I = eq_investment(Y, inputs["s"], D)
-        K_new = eq_capital_accumulation(inputs["K_last"], I, params["delta"])
-        p = eq_profit(params["alpha"], Y, K_new)
-        r = eq_interest_rate(p, params["gamma"])
-        s_new = eq_savings_rate(C, Y)
-        theta = eq_wealth_concentration(K_new, inputs["M"])
-        P = eq_price_level(inputs["M"], Y)
-        pi = eq_inflation(P, inputs["P_last"])
-
-        updates = {
-            "Y": Y,
-            "C": C,
-            "I": I,
-            "K": K_new,
-            "p": p,
-            "r": r,
-            "s": s_new,
-            "theta": theta,
-            "P": P,
-            "pi": pi,
-            "K_last": K_new,
-            "P_last": P,
-        }
-
-        for key, val in updates.items():
-            widget = self.screen.query_one(f"#init-{key}", Input)
-            widget.value = f"{val:.5f}"
-
-        self.simulation_state.append({k: float(f"{v:.5f}") for k, v in updates.items()})
+        try:
+            engine = self.sync_engine()
+        except ValueError as e:
+            self.app.notify(str(e), severity="error")
+            return
+
+        rows = engine.run(1)
+        updates = dict(zip(OUTPUT_KEYS, rows[0].tolist()))
+
+        self.app.form_widget.show_state(updates)
+
+        self.record(rows)
         self.counter += 1
         self.query_one("#iteration-counter", Static).update(f"Iterations: {self.counter}")
         self.post_message(NewIteration(self, updates))
 
-        self.app.log(f"Simulation State [{self.counter} iterations]:")
-        for i, row in enumerate(self.simulation_state, 1):
-            self.app.log(f"{i}: {row}")
+        if INSTRUMENT.verbose:
+            self.app.log(f"[IterationControls] Iteration {self.counter}: {updates}")
 
-        self.app.moments_widget.update_from_simulation(self.simulation_state)
-        self.app.corr_widget.update_from_simulation(self.simulation_state)
+        self.show_results()
 
 
 # EQUATION_MARKDOWN = """
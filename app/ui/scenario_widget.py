@@ -0,0 +1,87 @@
+from textual.app import ComposeResult
+from textual.containers import Horizontal, Vertical, VerticalScroll
+from textual.screen import ModalScreen
+from textual.widgets import Button, Markdown, Static
+from itertools import combinations
+from typing import List
+
+from app.instrument import INSTRUMENT
+from app.scenarios import BranchStatistics
+
+SCENARIO_KEYS = ["Y", "K", "r", "P", "pi"]
+
+
+class ScenarioWidget(Markdown):
+    """
+    A Markdown widget that compares the branches of a scenario tree: means
+    and standard deviations of selected variables, and their pairwise
+    correlations, one column per branch over its whole path.
+    """
+
+    def show(self, branches: List[BranchStatistics], keys: List[str] = SCENARIO_KEYS, current: str = "") -> None:
+        with INSTRUMENT.time("rendering"):
+            self._show(branches, keys, current)
+        INSTRUMENT.count("renders")
+
+    def _show(self, branches: List[BranchStatistics], keys: List[str], current: str) -> None:
+        if INSTRUMENT.verbose:
+            self.app.log(f"[ScenarioWidget] show called with {len(branches)} branches.")
+
+        names = [f"{b.name}{' *' if b.name == current else ''}" for b in branches]
+        header = "| | " + " | ".join(f"{name:>10}" for name in names) + " |"
+        rule = "|---|" + ("-----------|" * len(branches))
+
+        rows = ["| Branch | Periods |", "|--------|---------|"]
+        rows += [f"| {b.label} | {b.n} |" for b in branches]
+
+        for title, field in (("Mean", "mean"), ("Std. Dev.", "std_dev")):
+            rows += ["", f"**{title}**", "", header, rule]
+            for key in keys:
+                values = [getattr(b.moments, field)[b.moments.keys.index(key)] if b.n else float("nan") for b in branches]
+                rows.append(f"| {key} | " + " | ".join(f"{v:>10.5f}" for v in values) + " |")
+
+        rows += ["", "**Correlation**", "", header, rule]
+        for a, b in combinations(keys, 2):
+            values = []
+            for branch in branches:
+                corr = branch.correlations
+                values.append(corr.values[corr.keys.index(a), corr.keys.index(b)] if branch.n else float("nan"))
+            rows.append(f"| {a}, {b} | " + " | ".join(f"{v:>10.5f}" for v in values) + " |")
+
+        self.update("\n".join(rows))
+
+
+class ScenarioScreen(ModalScreen):
+    """
+    Modal comparison of the scenario branches. Choosing a branch dismisses
+    the screen with its name, so the caller can switch to it.
+    """
+
+    BINDINGS = [("escape", "dismiss", "Close")]
+
+    def __init__(self, branches: List[BranchStatistics], current: str) -> None:
+        super().__init__()
+        self.branches = branches
+        self.current = current
+
+    def compose(self) -> ComposeResult:
+        yield Vertical(
+            Static("Scenarios", classes="title-label"),
+            Static("* = current branch. Choose a branch to switch to it; Esc to close.", id="scenario-caption"),
+            VerticalScroll(ScenarioWidget(id="scenario-table")),
+            Horizontal(
+                *[Button(b.name, id=f"branch-{i}", classes="branch-button") for i, b in enumerate(self.branches)],
+                Button("Close", id="scenario-close"),
+                id="scenario-buttons",
+            ),
+            id="scenario-dialog",
+        )
+
+    def on_mount(self) -> None:
+        self.query_one(ScenarioWidget).show(self.branches, current=self.current)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "scenario-close":
+            self.dismiss()
+        elif event.button.id.startswith("branch-"):
+            self.dismiss(self.branches[int(event.button.id.removeprefix("branch-"))].name)
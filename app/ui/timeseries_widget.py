@@ -0,0 +1,80 @@
+from textual.widgets import Markdown
+from typing import List
+
+from app.instrument import INSTRUMENT
+from app.timeseries import TimeSeriesStats
+
+TIMESERIES_KEYS = ["Y", "K", "r", "P"]
+ACF_LAGS = [1, 2, 3, 4, 5, 10, 20, 40]
+CCF_LAGS = [-10, -5, -2, -1, 0, 1, 2, 5, 10]
+SPECTRAL_BANDS = [(2, 8), (8, 32), (32, float("inf"))]  # Period lengths
+
+
+class TimeSeriesWidget(Markdown):
+    """
+    A Markdown widget that displays time-series statistics of the history:
+    autocorrelations at selected lags, cross-correlations at leads and lags
+    with the lag of the strongest one, and a summary of the spectral
+    densities. The statistics are computed by `app.timeseries`; this widget
+    only renders them.
+    """
+
+    def show(self, ts: TimeSeriesStats, keys: List[str] = TIMESERIES_KEYS) -> None:
+        with INSTRUMENT.time("rendering"):
+            self._show(ts, keys)
+        INSTRUMENT.count("renders")
+
+    def _show(self, ts: TimeSeriesStats, keys: List[str]) -> None:
+        if INSTRUMENT.verbose:
+            self.app.log(f"[TimeSeriesWidget] show called with {ts.n} iterations.")
+
+        if ts.n < 2:
+            self.update("*Needs at least two periods.*")
+            return
+
+        columns = [ts.keys.index(k) for k in keys if k in ts.keys]
+        names = [ts.keys[i] for i in columns]
+
+        lags = [lag for lag in ACF_LAGS if lag <= ts.max_lag]
+        rows = [
+            f"*{ts.n} periods; lag k of x, y = corr(x_t, y_t+k), so a peak at k > 0 means x leads y*",
+            "",
+            "**Autocorrelation**",
+            "",
+            "| Variable | " + " | ".join(f"{lag:>6}" for lag in lags) + " |",
+            "|----------|" + ("--------|" * len(lags)),
+        ]
+        for i, key in zip(columns, names):
+            rows.append(f"| {key:8} | " + " | ".join(f"{ts.acf[lag, i]:>6.3f}" for lag in lags) + " |")
+
+        if ts.pairs:
+            lags = [lag for lag in CCF_LAGS if abs(lag) <= ts.max_lag]
+            positions = [lag + ts.max_lag for lag in lags]
+            rows += [
+                "",
+                "**Cross-correlation**",
+                "",
+                "| x, y | Peak lag | " + " | ".join(f"{lag:>6}" for lag in lags) + " |",
+                "|------|----------|" + ("--------|" * len(lags)),
+            ]
+            for (x, y), peak, values in zip(ts.pairs, ts.peak_lags().tolist(), ts.ccf):
+                rows.append(
+                    f"| {x}, {y} | {peak:>8} | " + " | ".join(f"{values[p]:>6.3f}" for p in positions) + " |"
+                )
+
+        peaks = ts.peak_periods()
+        shares = ts.band_shares(SPECTRAL_BANDS)
+        bands = [f"{lo:g}-{hi:g}" if hi != float("inf") else f"> {lo:g}" for lo, hi in SPECTRAL_BANDS]
+        rows += [
+            "",
+            f"**Spectral density** (segments of {ts.segment} periods; share of power by cycle length)",
+            "",
+            "| Variable | Peak period | " + " | ".join(f"{band:>7}" for band in bands) + " |",
+            "|----------|-------------|" + ("---------|" * len(bands)),
+        ]
+        for i, key in zip(columns, names):
+            rows.append(
+                f"| {key:8} | {peaks[i]:>11.1f} | " + " | ".join(f"{shares[b, i]:>7.1%}" for b in range(len(bands))) + " |"
+            )
+
+        self.update("\n".join(rows))
@@ -1,24 +1,42 @@
 # app/utils/exporter.py
 
 import csv
+import json
 import os
+import zipfile
 from pathlib import Path
 from datetime import datetime
-from app.config_loader import load_config
+from typing import TYPE_CHECKING, Sequence
+import numpy as np
 
+from app.bootstrap import BootstrapIntervals, bootstrap
+from app.config_loader import EXPORT_FORMATS, get_config_or_default
+from app.instrument import INSTRUMENT
+from app.results import MOMENT_FIELDS, CorrelationMatrix, MomentsTable, SimulationResults
+from app.timeseries import TimeSeriesStats, analyze
 
+if TYPE_CHECKING:
+    from app.ensemble import EnsembleResult
+    from app.sweep import SweepResult
 
+_SUFFIXES = {"csv": ".csv", "tidy-csv": ".csv", "npz": ".npz", "npy": ".npy"}
 
-def resolve_export_path(path_str: str | None) -> Path:
+# .npy files written by NpyStream get a fixed-size header, so the shape can be
+# patched in place as rows are appended
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_NPY_PREFIX_LEN = 128
+
+
+def resolve_export_path(path_str: str | None, suffix: str = ".csv", prefix: str = "hume_export") -> Path:
     """Resolve export path from config or fallback to a default directory in the user's home."""
     timestamp = datetime.now().strftime("%Y-%m-%d-%H%M%S")
-    filename = f"hume_export-{timestamp}.csv"
+    filename = f"{prefix}-{timestamp}{suffix}"
 
     if path_str:
         path = Path(path_str).expanduser()
         if path.is_absolute():
             # If it's a directory or ends with a slash, treat it as a directory
-            if path.is_dir() or str(path).endswith(("/", "\\")):
+            if path.is_dir() or path_str.endswith(("/", "\\")):
                 return path / filename
             # Otherwise, assume it's a full file path
             return path.with_name(filename)
@@ -29,43 +47,539 @@ def resolve_export_path(path_str: str | None) -> Path:
     default_dir.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
     return default_dir / filename
 
+
 def export_simulation(
-    moments: list[dict[str, float]],
-    correlations: dict[str, dict[str, float]],
-    iterations: list[dict[str, float]]
+    results: SimulationResults,
+    fmt: str | None = None,
+    metadata: dict | None = None,
+    intervals: BootstrapIntervals | None = None,
 ) -> Path:
-    config = load_config()
-    configured_path = config.get("export", {}).get("path")
-    export_path = resolve_export_path(configured_path)
+    """
+    Export a run in the configured format ([export] format, default "csv"),
+    with its time-series statistics as configured in [timeseries]. Bootstrap
+    intervals are included if given, or computed as configured in
+    [bootstrap] if [export] bootstrap is on; resampling a long run takes
+    seconds across all cores, so it is off by default.
 
+    Args:
+        results (SimulationResults): The run to export.
+        fmt (str | None): One of `EXPORT_FORMATS`; overrides the config.
+        metadata (dict | None): Parameters, shocks etc. stored with binary formats.
+        intervals (BootstrapIntervals | None): Intervals already computed for
+            this run, e.g. for the bootstrap panel.
+
+    Returns:
+        Path: The written file (the iterations file for "tidy-csv").
+    """
+    config = get_config_or_default()
+    fmt = fmt or config.export_format
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {EXPORT_FORMATS}")
+
+    export_path = resolve_export_path(config.export_path, _SUFFIXES[fmt])
     export_path.parent.mkdir(parents=True, exist_ok=True)
+    timeseries = None
+    if intervals is not None and intervals.n != results.n:
+        intervals = None  # Computed before the latest periods were added
+    if results.n >= 2 and fmt != "npy":
+        timeseries = analyze(
+            results.history, config.timeseries_max_lag, config.timeseries_pairs, config.timeseries_segment
+        )
+        if intervals is None and config.export_bootstrap and config.bootstrap_replicates:
+            intervals = bootstrap(
+                results.history, config.bootstrap_replicates, config.bootstrap_block, config.bootstrap_level,
+                config.bootstrap_seed, workers=os.cpu_count() or 1,
+            )
+    return write_results(
+        results, export_path, fmt, compressed=config.export_compress, metadata=metadata,
+        timeseries=timeseries, intervals=intervals,
+    )
+
+
+def format_for_path(path: str | Path) -> str:
+    """Export format implied by a file suffix (.csv, .npz or .npy)."""
+    suffix = Path(path).suffix.lower()
+    for fmt in ("csv", "npz", "npy"):
+        if suffix == _SUFFIXES[fmt]:
+            return fmt
+    raise ValueError(f"Cannot tell the export format of '{path}', expected a .csv, .npz or .npy file")
+
+
+def write_results(
+    results: SimulationResults,
+    export_path: Path,
+    fmt: str,
+    compressed: bool = True,
+    metadata: dict | None = None,
+    timeseries: TimeSeriesStats | None = None,
+    intervals: BootstrapIntervals | None = None,
+) -> Path:
+    """
+    Write a run to `export_path` in one of `EXPORT_FORMATS`, including
+    `timeseries` statistics and bootstrap `intervals` if given (not in
+    "npy", which holds only the iterations).
+
+    Returns:
+        Path: The written file (the iterations file for "tidy-csv").
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {EXPORT_FORMATS}")
 
+    with INSTRUMENT.time("export"):
+        if fmt == "csv":
+            write_csv(results, export_path, timeseries, intervals)
+        elif fmt == "tidy-csv":
+            export_path = write_tidy_csv(results, export_path, timeseries, intervals)
+        elif fmt == "npz":
+            write_npz(
+                results, export_path, compressed=compressed, metadata=metadata,
+                timeseries=timeseries, intervals=intervals,
+            )
+        else:
+            with NpyStream(export_path, results.keys) as stream:
+                for block in results.history.iter_blocks():
+                    stream.append(block)
+    INSTRUMENT.count("exports")
+    return export_path
+
+
+def write_csv(
+    results: SimulationResults,
+    export_path: Path,
+    timeseries: TimeSeriesStats | None = None,
+    intervals: BootstrapIntervals | None = None,
+) -> None:
+    """
+    Write moments, correlations and iteration rows of a run to one CSV file
+    with three sections, plus a moments and a correlations section per
+    rolling window, with `intervals` a "=Bootstrap=" section with its
+    settings and a moments and a correlations section per interval bound,
+    and with `timeseries`, sections for autocorrelations, cross-correlations
+    and spectral densities.
+
+    Values are taken straight from the results object, so they are written
+    at full float64 precision.
+    """
     with export_path.open("w", newline="") as f:
         writer = csv.writer(f)
-
-        writer.writerow(["=Moments="])
-        if moments:
-            keys = list(moments[0].keys())
-            writer.writerow(keys)
-            for row in moments:
-                writer.writerow([row[k] for k in keys])
-        writer.writerow([])
-
-        writer.writerow(["=Correlations="])
-        if correlations:
-            headers = [""] + list(correlations.keys())
-            writer.writerow(headers)
-            for row_key, col_dict in correlations.items():
-                row = [row_key] + [col_dict.get(k, "") for k in correlations.keys()]
-                writer.writerow(row)
-        writer.writerow([])
+        _write_statistics(writer, results.moments(), results.correlations())
+        for size in results.windows:
+            _write_statistics(writer, results.moments(size), results.correlations(size), f" (last {size})")
+        if intervals is not None:
+            _write_intervals(writer, intervals)
+        if timeseries is not None:
+            _write_timeseries(writer, timeseries)
 
         writer.writerow(["=Iterations="])
-        if iterations:
-            keys = list(iterations[0].keys())
-            writer.writerow(keys)
-            for row in iterations:
-                writer.writerow([row[k] for k in keys])
+        if results.n:
+            writer.writerow(results.keys)
+            for block in results.history.iter_blocks():
+                writer.writerows(block.tolist())
+
+
+def _write_statistics(writer, moments: MomentsTable, correlations: CorrelationMatrix, label: str = "") -> None:
+    """The "=Moments<label>=" and "=Correlations<label>=" sections of a sectioned CSV."""
+    writer.writerow([f"=Moments{label}="])
+    if moments.n:
+        writer.writerow(["variable"] + MOMENT_FIELDS)
+        for row in moments.rows():
+            writer.writerow([row["variable"]] + [row[k] for k in MOMENT_FIELDS])
+    writer.writerow([])
+
+    writer.writerow([f"=Correlations{label}="])
+    if correlations.n:
+        writer.writerow([""] + correlations.keys)
+        for row_key, row in zip(correlations.keys, correlations.values.tolist()):
+            writer.writerow([row_key] + row)
+    writer.writerow([])
+
+
+def _write_intervals(writer, intervals: BootstrapIntervals) -> None:
+    """The "=Bootstrap=" section and the statistics sections of the lower and upper bounds."""
+    writer.writerow(["=Bootstrap="])
+    writer.writerow(list(intervals.metadata()))
+    writer.writerow(list(intervals.metadata().values()))
+    writer.writerow([])
+    level = f"{intervals.level:.4g}"
+    _write_statistics(writer, intervals.moments_low, intervals.correlations_low, f" ({level} CI low)")
+    _write_statistics(writer, intervals.moments_high, intervals.correlations_high, f" ({level} CI high)")
+
+
+def _write_timeseries(writer, ts: TimeSeriesStats) -> None:
+    """The "=Autocorrelations=", "=Cross-correlations=" and "=Spectral density=" sections."""
+    writer.writerow(["=Autocorrelations="])
+    writer.writerow(["lag"] + ts.keys)
+    for lag, row in zip(ts.lags.tolist(), ts.acf.tolist()):
+        writer.writerow([lag] + row)
+    writer.writerow([])
+
+    writer.writerow(["=Cross-correlations="])
+    if ts.pairs:
+        writer.writerow(["lag"] + [f"{x}:{y}" for x, y in ts.pairs])
+        for lag, row in zip(ts.ccf_lags.tolist(), ts.ccf.T.tolist()):
+            writer.writerow([lag] + row)
+    writer.writerow([])
+
+    writer.writerow(["=Spectral density="])
+    writer.writerow(["frequency"] + ts.keys)
+    for frequency, row in zip(ts.frequencies.tolist(), ts.density.tolist()):
+        writer.writerow([frequency] + row)
+    writer.writerow([])
+
+
+def write_ensemble(result: "EnsembleResult", export_path: Path, metadata: dict | None = None) -> None:
+    """
+    Write the statistics of an ensemble, chosen by the file suffix: a .csv
+    file with moments and correlations sections plus the per-period
+    cross-path means, or a .npz archive with `mean` and `std` (periods,
+    variables), the moment fields, `correlations`, `keys` and `metadata`.
+    """
+    if format_for_path(export_path) == "csv":
+        with export_path.open("w", newline="") as f:
+            writer = csv.writer(f)
+            _write_statistics(writer, result.moments, result.correlations)
+            writer.writerow(["=Mean path="])
+            writer.writerow(["period"] + result.keys)
+            writer.writerows([t + 1] + row for t, row in enumerate(result.mean.tolist()))
+        return
+
+    meta = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "seed": result.seed,
+        "sampler": result.sampler,
+        "paths": result.paths,
+        "steps": result.steps,
+        "diverged": result.diverged,
+    }
+    meta.update(metadata or {})
+    arrays = {
+        "mean": result.mean,
+        "std": result.std,
+        "keys": np.array(result.keys),
+        "correlations": result.correlations.values,
+        "metadata": np.array(json.dumps(meta)),
+    }
+    arrays.update({f"moments_{name}": getattr(result.moments, name) for name in MOMENT_FIELDS})
+    with export_path.open("wb") as f:
+        np.savez_compressed(f, **arrays)
+
+
+def write_tidy_csv(
+    results: SimulationResults,
+    export_path: Path,
+    timeseries: TimeSeriesStats | None = None,
+    intervals: BootstrapIntervals | None = None,
+) -> Path:
+    """
+    Write a run as plain, single-table CSV files next to each other:
+    `<name>-iterations.csv` (one row per period), `<name>-moments.csv`
+    (one row per variable) and `<name>-correlations.csv` (one row per pair).
+    With rolling windows, `<name>-rolling-moments.csv` and
+    `<name>-rolling-correlations.csv` hold the same with a leading `window`
+    column. With `intervals`, `<name>-bootstrap-moments.csv` and
+    `<name>-bootstrap-correlations.csv` hold the interval bounds, one row
+    per variable and moment (or pair), with the bootstrap settings as
+    leading columns. With `timeseries`, `<name>-acf.csv`, `<name>-ccf.csv`
+    and `<name>-spectrum.csv` hold one row per variable (or pair) and lag
+    (or frequency).
+
+    Returns:
+        Path: The iterations file.
+    """
+    stem = export_path.with_suffix("")
+    iterations_path = Path(f"{stem}-iterations.csv")
+
+    with CsvStream(iterations_path, results.keys) as stream:
+        for block in results.history.iter_blocks():
+            stream.append(block)
+
+    with open(f"{stem}-moments.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["variable"] + MOMENT_FIELDS)
+        for row in results.moments().rows():
+            writer.writerow([row["variable"]] + [row[k] for k in MOMENT_FIELDS])
+
+    correlations = results.correlations()
+    with open(f"{stem}-correlations.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["variable_1", "variable_2", "correlation"])
+        for row_key, row in zip(correlations.keys, correlations.values.tolist()):
+            writer.writerows([row_key, col_key, value] for col_key, value in zip(correlations.keys, row))
+
+    if results.windows:
+        with open(f"{stem}-rolling-moments.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["window", "periods", "variable"] + MOMENT_FIELDS)
+            for size in results.windows:
+                moments = results.moments(size)
+                for row in moments.rows():
+                    writer.writerow([size, moments.n, row["variable"]] + [row[k] for k in MOMENT_FIELDS])
+
+        with open(f"{stem}-rolling-correlations.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["window", "periods", "variable_1", "variable_2", "correlation"])
+            for size in results.windows:
+                correlations = results.correlations(size)
+                for row_key, row in zip(correlations.keys, correlations.values.tolist()):
+                    writer.writerows(
+                        [size, correlations.n, row_key, col_key, value] for col_key, value in zip(correlations.keys, row)
+                    )
+
+    if intervals is not None:
+        settings = list(intervals.metadata().values())
+        with open(f"{stem}-bootstrap-moments.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(intervals.metadata()) + ["variable", "statistic", "low", "high"])
+            writer.writerows(settings + list(row.values()) for row in intervals.moment_rows())
+
+        with open(f"{stem}-bootstrap-correlations.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(intervals.metadata()) + ["variable_1", "variable_2", "low", "high"])
+            writer.writerows(settings + list(row.values()) for row in intervals.correlation_rows())
+
+    if timeseries is not None:
+        ts = timeseries
+        with open(f"{stem}-acf.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["variable", "lag", "autocorrelation"])
+            for key, column in zip(ts.keys, ts.acf.T.tolist()):
+                writer.writerows([key, lag, value] for lag, value in zip(ts.lags.tolist(), column))
+
+        with open(f"{stem}-ccf.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["variable_1", "variable_2", "lag", "correlation"])
+            for (x, y), row in zip(ts.pairs, ts.ccf.tolist()):
+                writer.writerows([x, y, lag, value] for lag, value in zip(ts.ccf_lags.tolist(), row))
+
+        with open(f"{stem}-spectrum.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["variable", "frequency", "density"])
+            for key, column in zip(ts.keys, ts.density.T.tolist()):
+                writer.writerows([key, freq, value] for freq, value in zip(ts.frequencies.tolist(), column))
+
+    return iterations_path
+
+
+def export_sweep(sweep: "SweepResult") -> Path:
+    """
+    Export a parameter sweep as two tidy CSV files in the configured export
+    directory, `<name>-moments.csv` and `<name>-correlations.csv`.
+
+    Returns:
+        Path: The moments file.
+    """
+    config = get_config_or_default()
+    export_path = resolve_export_path(config.export_path, ".csv")
+    export_path.parent.mkdir(parents=True, exist_ok=True)
+    return write_sweep_csv(sweep, export_path)
+
+
+def write_sweep_csv(sweep: "SweepResult", export_path: Path) -> Path:
+    """
+    Write the tidy moments and correlations tables of a sweep, one row per
+    grid point and variable (or pair of variables), with the swept values
+    as leading columns.
+
+    Returns:
+        Path: The moments file.
+    """
+    stem = export_path.with_suffix("")
+    moments_path = Path(f"{stem}-moments.csv")
+
+    with moments_path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(sweep.axes + ["diverged", "variable"] + MOMENT_FIELDS)
+        for row in sweep.moment_rows():
+            writer.writerow([row[k] for k in sweep.axes + ["diverged", "variable"] + MOMENT_FIELDS])
+
+    with open(f"{stem}-correlations.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        columns = sweep.axes + ["variable_1", "variable_2", "correlation"]
+        writer.writerow(columns)
+        for row in sweep.correlation_rows():
+            writer.writerow([row[k] for k in columns])
+
+    return moments_path
+
+
+def write_npz(
+    results: SimulationResults,
+    export_path: Path,
+    compressed: bool = True,
+    metadata: dict | None = None,
+    timeseries: TimeSeriesStats | None = None,
+    intervals: BootstrapIntervals | None = None,
+) -> None:
+    """
+    Write a run to a NumPy .npz archive.
+
+    Arrays: `iterations` (periods, variables), `keys`, one array per moment
+    field, `correlations` (variables, variables) and `metadata`, a JSON string.
+    With rolling windows also `windows` (sizes), `window_periods` and, with a
+    leading window axis, `window_<field>` and `window_correlations`. With
+    `intervals` also `bootstrap_<field>` (2, variables) and
+    `bootstrap_correlations` (2, variables, variables), the lower and upper
+    bounds, with the settings under "bootstrap" in the metadata. With
+    `timeseries` also `acf` (lags, variables), `ccf_pairs`, `ccf` (pairs,
+    lags -max_lag..max_lag), `frequencies` and `spectral_density`
+    (frequencies, variables).
+
+    `iterations` is written block by block, so a long or memory-mapped
+    history is never copied into memory as a whole.
+    """
+    moments = results.moments()
+    meta = {"created": datetime.now().isoformat(timespec="seconds"), "periods": results.n}
+    meta.update(metadata or {})
+    if intervals is not None:
+        meta["bootstrap"] = intervals.metadata()
+
+    arrays = {
+        "keys": np.array(results.keys),
+        "correlations": results.correlations().values,
+        "metadata": np.array(json.dumps(meta)),
+    }
+    arrays.update({name: getattr(moments, name) for name in MOMENT_FIELDS})
+    if results.windows:
+        tables = [results.moments(size) for size in results.windows]
+        arrays["windows"] = np.array(list(results.windows))
+        arrays["window_periods"] = np.array([table.n for table in tables])
+        arrays.update({f"window_{name}": np.stack([getattr(t, name) for t in tables]) for name in MOMENT_FIELDS})
+        arrays["window_correlations"] = np.stack([results.correlations(size).values for size in results.windows])
+    if intervals is not None:
+        bounds = (intervals.moments_low, intervals.moments_high)
+        arrays.update({f"bootstrap_{name}": np.stack([getattr(t, name) for t in bounds]) for name in MOMENT_FIELDS})
+        arrays["bootstrap_correlations"] = np.stack(
+            [intervals.correlations_low.values, intervals.correlations_high.values]
+        )
+    if timeseries is not None:
+        arrays["acf"] = timeseries.acf
+        arrays["ccf_pairs"] = np.array(timeseries.pairs, dtype=str).reshape(-1, 2)
+        arrays["ccf"] = timeseries.ccf
+        arrays["frequencies"] = timeseries.frequencies
+        arrays["spectral_density"] = timeseries.density
+
+    # The members np.savez would write, with `iterations` streamed rather than stacked first
+    compression = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+    with zipfile.ZipFile(export_path, "w", compression=compression, allowZip64=True) as archive:
+        with archive.open("iterations.npy", "w", force_zip64=True) as member:
+            header = {"descr": "<f8", "fortran_order": False, "shape": (results.n, len(results.keys))}
+            np.lib.format.write_array_header_2_0(member, header)
+            for block in results.history.iter_blocks():
+                member.write(np.ascontiguousarray(block, dtype="<f8").tobytes())
+        for name, array in arrays.items():
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+                np.lib.format.write_array(member, np.asanyarray(array), allow_pickle=False)
+
+
+def load_export(path: str | Path) -> dict:
+    """
+    Load a binary export back into a dict of arrays.
+
+    For .npz files the `metadata` entry is decoded from JSON; .npy files are
+    memory-mapped and returned as {"iterations": array}.
+    """
+    path = Path(path)
+    if path.suffix == ".npy":
+        return {"iterations": np.load(path, mmap_mode="r")}
+
+    with np.load(path) as archive:
+        data = {name: archive[name] for name in archive.files}
+    data["keys"] = data["keys"].tolist()
+    data["metadata"] = json.loads(data["metadata"].item())
+    return data
+
+
+class CsvStream:
+    """
+    Append iteration rows to a CSV file in chunks while a simulation runs.
+
+    Usable as a context manager; rows are flushed with every `append`.
+    """
+
+    def __init__(self, path: str | Path, keys: Sequence[str]) -> None:
+        self.path = Path(path)
+        self.keys = list(keys)
+        self.rows = 0
+        self._file = self.path.open("w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["period"] + self.keys)
+
+    def append(self, rows: np.ndarray) -> None:
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(self.keys))
+        periods = range(self.rows + 1, self.rows + len(rows) + 1)
+        with INSTRUMENT.time("export"):
+            self._writer.writerows([period] + row for period, row in zip(periods, rows.tolist()))
+            self._file.flush()
+        self.rows += len(rows)
+        INSTRUMENT.count("rows streamed", len(rows))
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "CsvStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class NpyStream:
+    """
+    Append iteration rows to a .npy file in chunks while a simulation runs.
+
+    Rows are written as raw float64 after a fixed-size header, which is
+    rewritten with the new shape after every `append`, so the file is a
+    standard .npy file that `np.load(..., mmap_mode="r")` opens without
+    copying, with all rows appended so far even if the stream is never
+    closed (e.g. the program is killed).
+    """
+
+    def __init__(self, path: str | Path, keys: Sequence[str]) -> None:
+        self.path = Path(path)
+        self.keys = list(keys)
+        self.rows = 0
+        self._file = self.path.open("wb")
+        self._write_header()
+
+    def _write_header(self) -> None:
+        header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d, %d), }" % (self.rows, len(self.keys))
+        header_len = _NPY_PREFIX_LEN - len(_NPY_MAGIC) - 2
+        header = header.ljust(header_len - 1) + "\n"
+        self._file.seek(0)
+        self._file.write(_NPY_MAGIC + header_len.to_bytes(2, "little") + header.encode("latin1"))
+        self._file.seek(0, os.SEEK_END)
+
+    def append(self, rows: np.ndarray) -> None:
+        rows = np.ascontiguousarray(rows, dtype="<f8").reshape(-1, len(self.keys))
+        with INSTRUMENT.time("export"):
+            self._file.write(rows.tobytes())
+            self.rows += len(rows)
+            # Rows first, then the shape, so the header never counts rows not yet written
+            self._file.flush()
+            self._write_header()
+            self._file.flush()
+        INSTRUMENT.count("rows streamed", len(rows))
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "NpyStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
-    return export_path
 
+def open_stream(keys: Sequence[str], fmt: str | None = None) -> CsvStream | NpyStream:
+    """
+    Open a streaming export in the configured export directory. "npy" and
+    "npz" stream binary rows to a .npy file, anything else to a tidy CSV.
+    """
+    config = get_config_or_default()
+    fmt = fmt or config.export_format
+    binary = fmt in ("npy", "npz")
+    path = resolve_export_path(config.export_path, ".npy" if binary else ".csv")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return NpyStream(path, keys) if binary else CsvStream(path, keys)
@@ -0,0 +1,279 @@
+# benchmarks/run.py
+
+"""
+Benchmark suite for the hot paths of the simulator.
+
+Times the model step, the statistics refresh as the history grows, export
+throughput and the Textual refresh latency in headless mode, and compares the
+numbers with a stored baseline.
+
+    python -m benchmarks.run                 # run all, compare with baseline.json
+    python -m benchmarks.run --only steps    # run one group
+    python -m benchmarks.run --quick         # smaller sizes, fewer repeats
+    python -m benchmarks.run --save          # store the results as the new baseline
+
+Exits with status 1 if any benchmark is slower than its baseline by more than
+the threshold (default 25%). Each case reports the best of several repeats
+with a fixed seed, which keeps run-to-run noise low on an otherwise idle machine.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config_loader import FALLBACK_DEFAULTS  # noqa: E402
+from app.decimate import DecimationCache  # noqa: E402
+from app.engine import OUTPUT_KEYS, Engine  # noqa: E402
+from app.results import SimulationResults  # noqa: E402
+from app.utils.exporter import NpyStream, write_csv, write_npz  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+GROUPS = ["steps", "stats", "export", "ui"]
+SEED = 12345
+
+STATE = dict(FALLBACK_DEFAULTS["defaults"])
+PARAMS = dict(FALLBACK_DEFAULTS["parameters"])
+SHOCKS = dict(FALLBACK_DEFAULTS["shocks"])
+
+
+def best_of(func: Callable[[], object], repeats: int, number: int = 1) -> float:
+    """
+    Shortest wall time per call over `repeats` rounds of `number` calls of
+    `func`, in seconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def filled_results(n: int) -> SimulationResults:
+    """Results holding `n` simulated periods."""
+    results = SimulationResults(OUTPUT_KEYS)
+    engine = Engine(STATE, PARAMS, SHOCKS, seed=SEED)
+    for start in range(0, n, 100_000):
+        results.append(engine.run(min(100_000, n - start)))
+    return results
+
+
+def bench_steps(quick: bool) -> Dict[str, dict]:
+    repeats = 3 if quick else 7
+    n = 20_000 if quick else 100_000
+    # A fresh engine per round, so every round computes the same path
+    block = best_of(lambda: Engine(STATE, PARAMS, SHOCKS, seed=SEED).run(n), repeats)
+
+    single = 2_000
+
+    def one_at_a_time():
+        engine = Engine(STATE, PARAMS, SHOCKS, seed=SEED)
+        for _ in range(single):
+            engine.step()
+
+    step = best_of(one_at_a_time, repeats)
+    return {
+        "steps.block": {"value": n / block, "unit": "steps/s", "higher_is_better": True},
+        "steps.single": {"value": single / step, "unit": "steps/s", "higher_is_better": True},
+    }
+
+
+def bench_stats(quick: bool) -> Dict[str, dict]:
+    """
+    Cost of one refresh (append a period, then snapshot moments and
+    correlations) at history sizes N = 10^2 ... 10^6, of one append with
+    rolling windows, and of one chart redraw of the largest history.
+    """
+    repeats = 3 if quick else 7
+    exponents = range(2, 6) if quick else range(2, 7)
+    out = {}
+    row = Engine(STATE, PARAMS, SHOCKS, seed=SEED).run(1)
+    for e in exponents:
+        results = filled_results(10 ** e)
+
+        def refresh():
+            results.append(row)
+            results.moments()
+            results.correlations()
+
+        seconds = best_of(refresh, repeats, number=100)
+        out[f"stats.refresh.N=1e{e}"] = {"value": seconds * 1e6, "unit": "us", "higher_is_better": False}
+
+    # A new period taken into the decimation cache, then the whole history in 200 columns
+    cache = DecimationCache(results.history)
+    cache.update()
+
+    def redraw():
+        results.append(row)
+        cache.update()
+        cache.view(0, cache.n, 200)
+
+    seconds = best_of(redraw, repeats, number=100)
+    out[f"stats.chart.N=1e{exponents[-1]}"] = {"value": seconds * 1e6, "unit": "us", "higher_is_better": False}
+
+    # One period entering (and one leaving) each of the default rolling windows
+    results = SimulationResults(OUTPUT_KEYS, windows=(50, 200, 1000))
+    results.append(Engine(STATE, PARAMS, SHOCKS, seed=SEED).run(2_000))
+    seconds = best_of(lambda: results.append(row), repeats, number=100)
+    out["stats.rolling-append"] = {"value": seconds * 1e6, "unit": "us", "higher_is_better": False}
+    return out
+
+
+def bench_export(quick: bool) -> Dict[str, dict]:
+    repeats = 2 if quick else 3
+    n = 20_000 if quick else 200_000
+    results = filled_results(n)
+    out = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        def npy():
+            with NpyStream(tmp / "bench.npy", results.keys) as stream:
+                for block in results.history.iter_blocks():
+                    stream.append(block)
+
+        cases = {
+            "export.csv": lambda: write_csv(results, tmp / "bench.csv"),
+            "export.npz": lambda: write_npz(results, tmp / "bench.npz", compressed=False),
+            "export.npz-compressed": lambda: write_npz(results, tmp / "bench-c.npz", compressed=True),
+            "export.npy-stream": npy,
+        }
+        for name, func in cases.items():
+            seconds = best_of(func, repeats)
+            out[name] = {"value": n / seconds, "unit": "rows/s", "higher_is_better": True}
+    return out
+
+
+def bench_ui(quick: bool) -> Dict[str, dict]:
+    """
+    Headless Textual latency: one Iterate click until the screen has settled,
+    and one full refresh (form, counter, moments, correlations) with a long
+    history.
+    """
+    from app.app import HumeSim
+
+    clicks = 5 if quick else 20
+    history = 10_000 if quick else 100_000
+    out = {}
+
+    async def measure() -> None:
+        app = HumeSim()
+        async with app.run_test(size=(200, 50)) as pilot:
+            await pilot.pause()
+            controls = app.screen.query_one("#sim-controls")
+
+            times = []
+            for _ in range(clicks):
+                start = time.perf_counter()
+                await pilot.click("#iterate-button")
+                await pilot.pause()
+                times.append(time.perf_counter() - start)
+            out["ui.iterate"] = {"value": min(times) * 1e3, "unit": "ms", "higher_is_better": False}
+
+            controls.sync_engine()
+            controls.record(controls.engine.run(history))
+            times = []
+            for _ in range(clicks):
+                start = time.perf_counter()
+                controls.refresh_view()
+                await pilot.pause()
+                times.append(time.perf_counter() - start)
+            out[f"ui.refresh.N=1e{len(str(history)) - 1}"] = {
+                "value": min(times) * 1e3, "unit": "ms", "higher_is_better": False
+            }
+
+    asyncio.run(measure())
+    return out
+
+
+BENCHMARKS: Dict[str, Callable[[bool], Dict[str, dict]]] = {
+    "steps": bench_steps,
+    "stats": bench_stats,
+    "export": bench_export,
+    "ui": bench_ui,
+}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed cases."""
+    regressions = []
+    print(f"{'benchmark':<28} {'value':>14} {'baseline':>14}  {'change':>8}")
+    for name, result in results.items():
+        value, unit = result["value"], result["unit"]
+        base = baseline.get(name)
+        if base is None or base["unit"] != unit:
+            print(f"{name:<28} {value:>14.4g} {'-':>14}  {'new':>8}  {unit}")
+            continue
+
+        # Positive change = better, whichever direction the metric goes
+        ratio = value / base["value"] if base["value"] else float("inf")
+        change = ratio - 1 if result["higher_is_better"] else 1 / ratio - 1 if ratio else float("inf")
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<28} {value:>14.4g} {base['value']:>14.4g}  {change:>+8.1%}  {unit}{flag}")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--only", help=f"Comma-separated groups to run ({', '.join(GROUPS)})")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes and fewer repeats")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before reporting a regression")
+    args = parser.parse_args(argv)
+
+    groups = args.only.split(",") if args.only else GROUPS
+    unknown = [g for g in groups if g not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark group(s): {', '.join(unknown)}")
+
+    results: Dict[str, dict] = {}
+    for group in groups:
+        print(f"Running {group}...", file=sys.stderr)
+        results.update(BENCHMARKS[group](args.quick))
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text()).get("results", {})
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        stored = dict(baseline)
+        stored.update(results)
+        args.baseline.write_text(json.dumps({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "machine": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "processor": platform.processor() or platform.machine(),
+            },
+            "quick": args.quick,
+            "results": stored,
+        }, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())